@@ -64,6 +64,23 @@ EXIT 우선순위:
 import time
 import logging
 import os
+import sys
+import json
+import queue
+import signal
+import sqlite3
+import atexit
+import itertools
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import struct
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait as wait_futures
+from array import array
+from collections import Counter, deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from multiprocessing import resource_tracker, shared_memory
 from decimal import Decimal, ROUND_DOWN
 try:
     from binance.client import Client
@@ -72,13 +89,75 @@ except Exception:
     Client = None
     BinanceAPIException = Exception
     BinanceOrderException = Exception
+try:
+    from requests.adapters import HTTPAdapter
+    from requests import exceptions as requests_exc
+    from urllib3 import exceptions as urllib3_exc
+except Exception:
+    HTTPAdapter = requests_exc = urllib3_exc = None
+try:
+    import numpy as np   # 선택: 멀티 심볼 스크리너 전용
+except ImportError:
+    np = None
 
 ClientError = (BinanceAPIException, BinanceOrderException)
 
+
+class OrderNotPlaced(Exception):
+    """결과 불명 주문을 clientOrderId 조회로 확인한 결과 미접수."""
+
+
+OrderSubmitError = ClientError + (OrderNotPlaced,)
+
+
+class CallDeadlineExceeded(TimeoutError):
+    """읽기 호출이 CALL_DEADLINE_SEC 안에 응답하지 않음 (헤지 포함)."""
+
+
+ReadError = ClientError + (CallDeadlineExceeded,)   # 조회 실패 → 호출측 저하 경로
+
+
+class Clock:
+    """모듈 전역 시각 주입점: time() / sleep() 은 모두 여기로. 기본은 실제 time 모듈,
+    replay-calls 는 use() 로 가상 시계를 설치 (time 모듈 자체는 건드리지 않음)."""
+
+    def __init__(self):
+        self._src = time
+
+    def time(self) -> float:
+        return self._src.time()
+
+    def sleep(self, sec: float):
+        self._src.sleep(sec)
+
+    @contextmanager
+    def use(self, src):
+        prev, self._src = self._src, src
+        try:
+            yield src
+        finally:
+            self._src = prev
+
+
+_clock = Clock()
+
 # ============================================================
 # CFG
 # ============================================================
-CFG = {
+_account_ctx = threading.local()   # 스레드별 활성 계정 (name / client / cfg 오버라이드)
+
+
+class _RoutedCfg(dict):
+    """스레드별 오버라이드(_account_ctx.cfg) 우선 조회 — shadow 변형 전용. 쓰기는 기본 dict."""
+
+    def __getitem__(self, key):
+        overrides = getattr(_account_ctx, "cfg", None)
+        if overrides and key in overrides:
+            return overrides[key]
+        return dict.__getitem__(self, key)
+
+
+CFG = _RoutedCfg({
     # ── 10번대: 심볼 / 시간축 ──────────────────────────────
     "SYMBOL":              "SOLUSDT",       # v8.9: TIAUSDT → SOLUSDT
     "INTERVAL_TRIGGER":    "5m",
@@ -89,6 +168,18 @@ CFG = {
     "EMA_TRIGGER_LEN":    15,
     "HTF_FILTER_EMA_LEN": 15,
     "HTF_FILTER_ENABLE":  True,
+    "HTF_RESAMPLE_ENABLE":  True,      # 5m 완료봉으로 상위 봉 로컬 합성
+    "HTF_RESAMPLE_VERIFY":  True,      # 경계마다 거래소 상위 봉과 대조 (1회 조회)
+    "RESAMPLE_INTERVALS":   ["4h"],    # 합성할 상위 봉 (추가 시 REST 비용 없음)
+    "RESAMPLE_KEEP_BARS":   60,
+
+    # 멀티 심볼 스크리너 (numpy 필요): WATCHING 중 5m 마감마다 USDT 무기한 전체를
+    # 한 번에 평가 → 현재 심볼이 아닌 후보가 트리거되면 대상 심볼 전환 (단일 계정 / 자체 feed 전용, 사용 시 shadow 비활성)
+    "SCREENER_ENABLE":         False,
+    "SCREENER_SYMBOLS":        [],      # 비어 있으면 거래 중인 USDT 무기한 전체
+    "SCREENER_MAX_SYMBOLS":    250,
+    "SCREENER_WORKERS":        8,
+    "SCREENER_WEIGHT_PER_MIN": 1200,    # kline 조회 가중치 예산 (계정 한도 2400 의 절반)
 
     # ── 30번대: 자본 / 레버리지 / 마진 ───────────────────
     "TOTAL_CAPITAL_USDT": 6000.0,
@@ -104,6 +195,7 @@ CFG = {
         1.4, 1.0, 0.8, 0.6, 0.5
     ],
     "LADDER_INVALIDATION_MULT":    2.0,   # 비활성화됨
+    "LADDER_PLAN_REUSE_PCT":       0.001, # 미리 만든 거미줄 계획 재사용 허용 진입가 차 (0.1%)
     "LADDER_NO_FILL_TIMEOUT_BARS": 99999,
 
     # ── 50번대: TP / 트레일링 ─────────────────────────────
@@ -134,9 +226,103 @@ CFG = {
     # ── 80번대: 운영 / 루프 ───────────────────────────────
     "REENTRY_COOLDOWN_BARS":      8,
     "POLL_INTERVAL_SEC":          10,
-    "BAR_CHECK_MIN_INTERVAL_SEC": 40,
+    "BAR_CLOSE_DELAY_SEC":        1.0,   # 봉 마감 직후 조회 지연
+    "BAR_CLOSE_RETRY_SEC":        1.0,   # 새 완료봉 미반영 시 재조회 간격
+    "LEDGER_VERIFY_SEC":          60,    # 로컬 포지션 원장 ↔ positionRisk 대조 주기
     "LOG_LEVEL": "INFO",
-}
+    "ENGINE_TAG": "vr89",              # newClientOrderId 접두어
+
+    # 멀티 계정 팬아웃: 비어 있으면 단일 계정 모드
+    # 계정명 NAME → 환경변수 BINANCE_API_KEY_NAME / BINANCE_API_SECRET_NAME
+    "ACCOUNTS": [],
+
+    # 공유메모리 시장 데이터 버스: 이름이 비어 있으면 비활성 (엔진이 직접 REST 조회)
+    "MARKET_BUS_NAME":      "",
+    "MARKET_BUS_SLOTS":     8,
+    "MARKET_BUS_MAX_BARS":  64,
+    "MARKET_BUS_STALE_SEC": 30,
+
+    # 샘플링 프로파일러: SIGUSR1 또는 제어 파일 존재 시 on (재시작 불필요)
+    "PROFILE_HZ":           100,
+    "PROFILE_CONTROL_FILE": "vella_profile.on",
+    "PROFILE_OUT_DIR":      "profiles",
+    "PROFILE_TOP_N":        20,
+
+    # 거래 저널 (SQLite WAL): 경로가 비어 있으면 비활성
+    "JOURNAL_DB":        "vella_journal.db",
+    "JOURNAL_BATCH":     200,
+    "JOURNAL_FLUSH_SEC": 1.0,
+    "JOURNAL_QUEUE_MAX": 10000,
+
+    # 체결 품질 텔레메트리: 그룹(단계/청산 사유)별 최근 N건으로 백분위 산출
+    "EXEC_TELEMETRY_WINDOW": 500,
+    "EXEC_PENDING_MAX":      2000,     # 미완료 주문 추적 상한 (초과 시 오래된 것부터 폐기)
+
+    # 주문 실행 레인: 거미줄 배치 / EXIT 정정은 워커 스레드에서 제출, 결과는 다음 tick 에 반영
+    # 긴급(EXIT/SL) 워커와 일반(REPRICE/ENTRY) 워커 분리 → 저우선 적체가 청산을 지연시키지 않음
+    "EXEC_ASYNC":     True,
+    "EXEC_QUEUE_MAX": 64,      # 레인별 대기 작업 상한 (초과 시 제출 거부)
+
+    # 플라이트 레코더: 틱 스냅샷 / API 요약 / 상태 전이 / DEBUG 로그를 링버퍼에 상시 기록
+    # 예외(exc_info) · CRITICAL 로그 · SIGUSR2 시에만 디스크 덤프. 슬롯 0 이면 비활성
+    "FLIGHT_RECORDER_SLOTS":  20000,
+    "FLIGHT_DUMP_DIR":        "flight",
+    "FLIGHT_DUMP_MIN_SEC":    30,      # 연속 오류 시 덤프 최소 간격
+
+    # 상태 조회 엔드포인트 (읽기 전용, 로컬): 포트 0 이면 비활성
+    "STATUS_HTTP_HOST": "127.0.0.1",
+    "STATUS_HTTP_PORT": 8789,
+
+    # 설정 핫 리로드: JSON 파일의 CFG 키만 반영 (파일 없으면 비활성)
+    "CONFIG_FILE": "vella_cfg.json",
+
+    # shadow 변형: 이름 → CFG 오버라이드. 실주문 없이 live 가격으로 페이퍼 엔진 구동
+    # 트리거/HTF 판단은 live 결과 공유 → 거미줄/EXIT/트레일 관련 키만 의미 있음
+    "SHADOW_VARIANTS":     {},
+    "SHADOW_WORKERS":      2,
+    "SHADOW_SLIPPAGE_BPS": 2.0,        # 시장가 체결 불리 슬리피지
+    "SHADOW_LOG_LEVEL":    "WARNING",  # 페이퍼 엔진 로그 하한 (live 로그 오염 방지)
+    "SHADOW_REPORT_BARS":  12,         # N봉마다 변형별 성과 로그
+
+    # ── 90번대: 전송 / 시간 동기화 ────────────────────────
+    "TIME_SYNC_INTERVAL_SEC": 300,     # 서버 시간 오프셋 재측정 주기
+    "TIME_SYNC_SAMPLES":      3,       # 측정 샘플 수 (최소 RTT 채택)
+    "RECV_WINDOW_BASE_MS":    2000,
+    "RECV_WINDOW_RTT_MULT":   3.0,     # recvWindow = base + RTT * mult + drift
+    "RECV_WINDOW_MAX_MS":     10000,
+    "KEEPALIVE_PING_SEC":     20,      # 유휴 시 ping 으로 커넥션 유지
+    "HTTP_POOL_SIZE":         4,
+    "HTTP_TIMEOUT_SEC": {
+        "order":  3.0,
+        "cancel": 3.0,
+        "query":  5.0,
+        "market": 5.0,
+        "admin":  10.0,
+    },
+    # 호출 마감: 소켓 타임아웃과 별개로 호출 전체 상한. 멱등 읽기(market/query)만 적용
+    # 주문/취소는 소켓 타임아웃이 곧 마감 (중간 포기 = 결과 불명 → cid 조회로 확정)
+    "CALL_DEADLINE_SEC": {
+        "query":  2.5,
+        "market": 2.5,
+    },
+    # 헤지: 읽기 호출이 최근 p(HEDGE_QUANTILE) 지연 안에 응답 없으면 동일 요청 1회 추가, 먼저 온 응답 채택
+    "HEDGE_QUANTILE":     0.95,
+    "HEDGE_MIN_SAMPLES":  20,      # 표본 부족 시 헤지 없이 마감만 적용
+    "HEDGE_MIN_DELAY_MS": 50,
+    "HEDGE_WINDOW":       200,     # kind 별 최근 지연 표본 수
+    "HEDGE_WORKERS":      8,
+    # 거래소 호출 기록: 모든 BinanceFuturesCompat 호출/응답/지연을 JSONL 로 추가 기록 (비어 있으면 비활성)
+    # python app.py replay-calls <파일> 로 가상 시계 위에서 엔진 재생
+    "CALL_RECORD_FILE":   "",
+    # 과거 kline 백필: python app.py backfill <심볼> <5m,4h> <시작일> [종료일]
+    # BACKFILL_DIR/<심볼>_<interval>.vkl 에 페이지 단위로 바로 기록 → 중단 후 재실행 시 빈 구간만 조회
+    "BACKFILL_DIR":            "klines",
+    "BACKFILL_PAGE_BARS":      1000,    # 가중치 5 → 봉당 가중치 최소 (1500 은 가중치 10)
+    "BACKFILL_WORKERS":        6,
+    "BACKFILL_WEIGHT_PER_MIN": 1200,    # 라이브 엔진과 같은 IP 면 한도 2400 의 절반 이하 유지
+    "BACKFILL_RETRY_ROUNDS":   3,       # 실패 페이지 재조회 회차
+    "BACKFILL_FSYNC_PAGES":    20,      # 완료 페이지 N개마다 fsync (체크포인트 간격)
+})
 
 # ============================================================
 # 로거
@@ -151,6 +337,243 @@ logging.basicConfig(
 )
 log = logging.getLogger("VELLA_BR8_SOL")
 
+
+def apply_log_level():
+    # 출력 수준은 핸들러에서 제한 → 플라이트 레코더는 logger 단에서 DEBUG 까지 수신
+    level = getattr(logging, CFG["LOG_LEVEL"])
+    for h in logging.getLogger().handlers:
+        h.setLevel(level)
+
+# ============================================================
+# 설정 핫 리로드
+#   CONFIG_FILE(JSON) mtime 변경 시 tick 사이에서 검증 → diff → 반영
+#   - RESTART: 프로세스 구조에 묶인 키 → 거부 (기동 시 load_initial 에서만 반영)
+#     load_initial 은 이 위치(클라이언트 / 저널 / 플라이트 레코더 / 풀 생성 전)에서 실행
+#     → 파일의 RESTART 키가 모듈 수준 객체 생성에 반영됨 (CONFIG_FILE 자체는 파일로 변경 불가)
+#   - IDLE:    거미줄/포지션 구조 키 → 보유 중이면 보류, WATCHING/COOLDOWN 에서 반영
+#   - 그 외:   즉시 반영 (한 tick 사이에 일괄 교체)
+#   검증 실패 키가 하나라도 있으면 파일 전체 거부
+# ============================================================
+RELOAD_RESTART_KEYS = {
+    "SYMBOL", "INTERVAL_TRIGGER", "INTERVAL_EXEC", "INTERVAL_FILTER_HTF",
+    "ACCOUNTS", "MARKET_BUS_NAME", "MARKET_BUS_SLOTS", "MARKET_BUS_MAX_BARS",
+    "JOURNAL_DB", "JOURNAL_QUEUE_MAX", "STATUS_HTTP_HOST", "STATUS_HTTP_PORT",
+    "HTTP_POOL_SIZE", "ENGINE_TAG", "HTF_RESAMPLE_ENABLE", "RESAMPLE_INTERVALS",
+    "RESAMPLE_KEEP_BARS", "CONFIG_FILE", "SHADOW_VARIANTS", "SHADOW_WORKERS",
+    "FLIGHT_RECORDER_SLOTS", "EXEC_ASYNC", "EXEC_QUEUE_MAX", "HEDGE_WORKERS",
+    "CALL_RECORD_FILE", "SCREENER_ENABLE", "SCREENER_SYMBOLS", "SCREENER_MAX_SYMBOLS",
+    "SCREENER_WORKERS",
+}
+RELOAD_IDLE_KEYS = {
+    "LADDER_COUNT", "LADDER_GAP_PCT", "SIZE_WEIGHTS", "TOTAL_CAPITAL_USDT",
+    "MAX_CAPITAL_RATIO", "LEVERAGE", "MARGIN_TYPE",
+}
+
+
+def _validate_cfg_value(key: str, value, current) -> str | None:
+    is_num = lambda v: isinstance(v, (int, float)) and not isinstance(v, bool)
+    if isinstance(current, bool):
+        ok = isinstance(value, bool)
+    elif isinstance(current, (int, float)):
+        ok = is_num(value) and (isinstance(value, int) or isinstance(current, float))
+        if ok and value < 0:
+            return f"{key}: 음수 불가 ({value})"
+    elif isinstance(current, list):
+        numeric = bool(current) and all(is_num(c) for c in current)
+        ok = isinstance(value, list) and all(is_num(v) if numeric else isinstance(v, str) for v in value)
+    elif isinstance(current, dict):
+        ok = isinstance(value, dict) and set(value) == set(current)
+    else:
+        ok = isinstance(value, type(current))
+    return None if ok else f"{key}: 타입 불일치 ({type(current).__name__} 필요, {value!r})"
+
+
+def validate_cfg(new: dict) -> list:
+    errors = [f"{k}: 알 수 없는 키" for k in new if k not in CFG]
+    errors += [e for k, v in new.items() if k in CFG
+               for e in [_validate_cfg_value(k, v, CFG[k])] if e]
+    if errors:
+        return errors
+    merged = {**CFG, **new}
+    if len(merged["SIZE_WEIGHTS"]) < merged["LADDER_COUNT"]:
+        errors.append("SIZE_WEIGHTS 길이 < LADDER_COUNT")
+    if merged["CAPITAL_CHECK_MIN_RATIO"] > merged["CAPITAL_CHECK_MAX_RATIO"]:
+        errors.append("CAPITAL_CHECK_MIN_RATIO > CAPITAL_CHECK_MAX_RATIO")
+    if merged["LOG_LEVEL"] not in ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"):
+        errors.append(f"LOG_LEVEL 값 오류: {merged['LOG_LEVEL']}")
+    return errors
+
+
+class ConfigReloader:
+    def __init__(self, path: str):
+        self.path    = path
+        self.pending: dict = {}
+        self._mtime: float | None = None
+
+    def _read(self) -> dict | None:
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except (FileNotFoundError, TypeError):
+            return None
+        if mtime == self._mtime:
+            return None
+        self._mtime = mtime
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                new = json.load(f)
+        except (OSError, ValueError) as e:
+            log.error(f"[CFG RELOAD] 파일 읽기 실패 → 무시: {e}")
+            return None
+        if not isinstance(new, dict):
+            log.error("[CFG RELOAD] 최상위가 객체가 아님 → 무시")
+            return None
+        errors = validate_cfg(new)
+        if errors:
+            log.error(f"[CFG RELOAD] 검증 실패 → 전체 거부: {errors}")
+            return None
+        return {k: v for k, v in new.items() if CFG[k] != v}
+
+    def _apply(self, values: dict) -> set:
+        if not values:
+            return set()
+        for k, v in values.items():
+            log.info(f"[CFG RELOAD] {k}: {CFG[k]!r} → {v!r}")
+        CFG.update(values)
+        if "LOG_LEVEL" in values:
+            logging.getLogger().setLevel(getattr(logging, CFG["LOG_LEVEL"]))
+            apply_log_level()
+        return set(values)
+
+    def load_initial(self):
+        # 기동 전: 구조 키 포함 전체 반영
+        values = self._read() or {}
+        if values.pop("CONFIG_FILE", None) is not None:
+            log.warning(f"[CFG RELOAD] CONFIG_FILE 은 파일로 변경 불가 → 무시 ({self.path} 유지)")
+        self._apply(values)
+
+    def poll(self, idle: bool) -> set:
+        diff = self._read()
+        if diff is not None:
+            for k in sorted(set(diff) & RELOAD_RESTART_KEYS):
+                log.warning(f"[CFG RELOAD] {k} 는 재시작 필요 → 거부")
+            idle_part = {k: v for k, v in diff.items() if k in RELOAD_IDLE_KEYS}
+            if idle_part and not idle:
+                log.info(f"[CFG RELOAD] 거미줄 보유 중 → 보류: {sorted(idle_part)}")
+            dropped = sorted(set(self.pending) - set(idle_part))
+            if dropped:
+                log.info(f"[CFG RELOAD] 보류 취소 (파일에서 되돌림/변경): {dropped}")
+            # diff 는 현재 CFG 대비 파일 전체 상태 → 최신 파일 기준으로 보류분 재구성
+            self.pending = idle_part
+            safe = {k: v for k, v in diff.items()
+                    if k not in RELOAD_RESTART_KEYS and k not in RELOAD_IDLE_KEYS}
+        else:
+            safe = {}
+        if self.pending and idle:
+            safe.update(self.pending)
+            self.pending = {}
+        return self._apply(safe)
+
+
+config_reloader = ConfigReloader(CFG["CONFIG_FILE"])
+if __name__ == "__main__":   # 스크립트 실행 시에만 (import 하는 도구 / 테스트는 기본 CFG)
+    config_reloader.load_initial()
+
+# ============================================================
+# 플라이트 레코더
+#   고정 크기 슬롯 리스트를 미리 할당, 기록은 (ts, 스레드, 종류, 데이터) 튜플 대입 1회
+#   포맷/직렬화는 덤프 시에만. 덤프는 스냅샷 복사 후 백그라운드 스레드에서 기록
+#   종류: log(DEBUG 포함) / api / tick / state / stage
+# ============================================================
+
+class FlightRecorder:
+    def __init__(self, slots: int):
+        self.slots      = slots
+        self._ring: list = [None] * slots
+        self._seq        = itertools.count()
+        self._last_dump  = 0.0
+        self._dump_lock  = threading.Lock()
+
+    def record(self, kind: str, data):
+        if self.slots:
+            i = next(self._seq)
+            self._ring[i % self.slots] = (_clock.time(), threading.current_thread().name, kind, data)
+
+    def snapshot(self) -> list:
+        ring = list(self._ring)
+        head = next(self._seq) % self.slots   # 다음 기록 위치 = 가장 오래된 슬롯
+        return [e for e in ring[head:] + ring[:head] if e is not None]
+
+    def dump(self, reason: str, force: bool = False) -> str | None:
+        if not self.slots:
+            return None
+        with self._dump_lock:
+            now = _clock.time()
+            if not force and now - self._last_dump < CFG["FLIGHT_DUMP_MIN_SEC"]:
+                return None
+            self._last_dump = now
+        entries = self.snapshot()
+        os.makedirs(CFG["FLIGHT_DUMP_DIR"], exist_ok=True)
+        path = os.path.join(CFG["FLIGHT_DUMP_DIR"],
+                            f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}-{reason}.jsonl")
+        threading.Thread(target=self._write, args=(path, reason, entries),
+                         name="flight-dump", daemon=True).start()
+        return path
+
+    @staticmethod
+    def _write(path: str, reason: str, entries: list):
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"reason": reason, "dumped_at": _clock.time(), "entries": len(entries)}) + "\n")
+                for ts, thread, kind, data in entries:
+                    f.write(json.dumps({"ts": ts, "thread": thread, "kind": kind, "data": data},
+                                       ensure_ascii=False, default=str) + "\n")
+            log.warning(f"[FLIGHT] 덤프 완료: {path} ({len(entries)}건, 사유={reason})")
+        except Exception as e:
+            log.warning(f"[FLIGHT] 덤프 실패: {path} | {e}")
+
+    def install(self):
+        # 메인 스레드에서 호출: SIGUSR2 수동 덤프 + 미처리 예외 덤프
+        if hasattr(signal, "SIGUSR2") and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGUSR2, lambda *_: self.dump("signal", force=True))
+        prev_hook, prev_thread_hook = sys.excepthook, threading.excepthook
+
+        def excepthook(*args):
+            self.record("log", ("CRITICAL", "".join(traceback.format_exception(*args))))
+            self.dump("uncaught", force=True)
+            prev_hook(*args)
+
+        def thread_excepthook(hook_args):
+            self.record("log", ("CRITICAL", "".join(traceback.format_exception(
+                hook_args.exc_type, hook_args.exc_value, hook_args.exc_traceback))))
+            self.dump("uncaught-thread", force=True)
+            prev_thread_hook(hook_args)
+
+        sys.excepthook, threading.excepthook = excepthook, thread_excepthook
+
+
+class _FlightLogHandler(logging.Handler):
+    def __init__(self, recorder: FlightRecorder):
+        super().__init__(logging.DEBUG)
+        self.recorder = recorder
+
+    def emit(self, record):
+        msg = record.getMessage()
+        exc = record.exc_info if record.exc_info and record.exc_info[0] else None
+        if exc:
+            msg += "\n" + "".join(traceback.format_exception(*exc))
+        self.recorder.record("log", (record.levelname, msg))
+        if record.levelno >= logging.CRITICAL:
+            self.recorder.dump("critical", force=True)
+        elif record.levelno >= logging.ERROR and exc:
+            self.recorder.dump("exception")
+
+
+flight = FlightRecorder(CFG["FLIGHT_RECORDER_SLOTS"])
+if flight.slots:
+    apply_log_level()
+    log.setLevel(logging.DEBUG)
+    log.addHandler(_FlightLogHandler(flight))
+
 # ============================================================
 # 클라이언트
 # ============================================================
@@ -161,47 +584,515 @@ if Client is None:
     raise RuntimeError("python-binance missing")
 
 
+_API_SUMMARY_KEYS = ("orderId", "clientOrderId", "status", "side", "type", "price",
+                     "stopPrice", "origQty", "executedQty", "avgPrice", "positionAmt", "entryPrice")
+
+def _api_summary(result):
+    # 응답 요약: 주문/포지션 핵심 필드만, 목록은 길이 + 최대 5건
+    if isinstance(result, dict):
+        return {k: result[k] for k in _API_SUMMARY_KEYS if k in result} or f"dict[{len(result)}]"
+    if isinstance(result, list):
+        head = [_api_summary(r) if isinstance(r, dict) else None for r in result[:5]]
+        return {"len": len(result), "head": [h for h in head if h]}
+    return result
+
+
+# ------------------------------------------------------------
+# 호출 기록 (append-only JSONL, 호출 1건 = 1줄)
+#   open: 기록 시작 시 CFG 스냅샷 + 시간 오프셋
+#   sync: 서버 시간 재측정 결과
+#   호출: t(요청 시각) ms(지연) a(계정) k(kind) f(python-binance 함수명) p(파라미터) r(응답) | e(오류)
+# ------------------------------------------------------------
+class CallRecorder:
+    def __init__(self):
+        self._fh    = None
+        self._lock  = threading.Lock()
+        self.written = 0
+
+    def _ready(self, cli) -> bool:
+        if self._fh is not None:
+            return True
+        path = CFG["CALL_RECORD_FILE"]
+        if not path:
+            return False
+        with self._lock:
+            if self._fh is None:
+                self._fh = open(path, "a", encoding="utf-8")
+                log.info(f"[RECORD] 거래소 호출 기록 시작 → {path}")
+                self._write_locked({"f": "open", "t": _clock.time(), "cfg": dict(CFG.items()),
+                                    "off": cli.time_offset_ms, "rtt": cli.rtt_ms, "rw": cli.recv_window})
+        return True
+
+    def _write_locked(self, rec: dict):
+        self._fh.write(json.dumps(rec, separators=(",", ":"), ensure_ascii=False, default=str) + "\n")
+        self._fh.flush()
+        self.written += 1
+
+    def sync(self, cli):
+        if self._ready(cli):
+            with self._lock:
+                self._write_locked({"f": "sync", "t": _clock.time(), "off": cli.time_offset_ms,
+                                    "rtt": cli.rtt_ms, "rw": cli.recv_window})
+
+    def call(self, cli, kind: str, name: str, params: dict, t0: float, ms: float, result, err):
+        if not self._ready(cli):
+            return
+        rec = {"t": round(t0, 4), "ms": round(ms, 2), "a": getattr(_account_ctx, "name", None) or "main",
+               "k": kind, "f": name, "p": params}
+        if err is None:
+            rec["r"] = result
+        else:
+            rec["e"] = {"type": type(err).__name__, "code": getattr(err, "code", None),
+                        "status": getattr(err, "status_code", None),
+                        "msg": str(getattr(err, "message", err))}
+        with self._lock:
+            self._write_locked(rec)
+
+
+call_recorder = CallRecorder()
+
+
+# 헤지/마감 대상: 재전송해도 부작용 없는 GET 계열만 (order / cancel / admin 은 절대 헤지 안 함)
+HEDGE_SAFE_KINDS = frozenset({"market", "query"})
+_hedge_pool      = ThreadPoolExecutor(max_workers=CFG["HEDGE_WORKERS"], thread_name_prefix="hedge")
+_hedge_slots     = threading.BoundedSemaphore(CFG["HEDGE_WORKERS"])   # 빈 워커 수 → 풀 큐 대기 없음
+_budget_ctx      = threading.local()   # WeightBudget.acquire 가 남긴 (예산, 가중치) → 헤지도 같은 예산에서 차감
+
+
 class BinanceFuturesCompat:
-    def __init__(self, key: str, secret: str):
-        self._client = Client(key, secret)
+    def __init__(self, key: str, secret: str, transport=None):
+        # transport: futures_xxx 엔드포인트 제공 객체 (기본 python-binance Client, replay 는 스텁)
+        self._client = transport if transport is not None else Client(key, secret)
+
+        self.time_offset_ms: float = 0.0
+        self.rtt_ms:         float = 0.0
+        self.recv_window:    int   = CFG["RECV_WINDOW_BASE_MS"]
+        self._last_sync:     float = 0.0
+        self._last_call:     float = 0.0
+
+        # kind → (호출 수, 누적 ms, 최대 ms, 오류 수). 튜플 통째 교체 → 읽기측 락 불필요
+        self.stats: dict[str, tuple[int, float, float, int]] = {}
+        # kind → (헤지 발송, 헤지 승리, 마감 초과). 헤지 kind 별 최근 시도 지연(ms)
+        self.hedges:   dict[str, tuple[int, int, int]] = {}
+        self._latency: dict[str, deque] = {}
+
+        # python-binance 버전별 지원 엔드포인트 (생성 시 1회 확인 → 미지원이면 호출측이 단건/취소후재주문)
+        self.can_batch  = hasattr(self._client, "futures_place_batch_order")
+        self.can_modify = hasattr(self._client, "futures_modify_order")
+
+        self._tune_session()
+        self.sync_time()
+
+    # --------------------------------------------------------
+    # 전송 계층: keep-alive 풀 / 서버 시간 동기화
+    # --------------------------------------------------------
+    def _tune_session(self):
+        session = getattr(self._client, "session", None)
+        if session is None or HTTPAdapter is None:
+            return
+        size    = CFG["HTTP_POOL_SIZE"]
+        adapter = HTTPAdapter(pool_connections=size, pool_maxsize=size, max_retries=0)
+        session.mount("https://", adapter)
+        session.headers.update({"Connection": "keep-alive"})
+
+    def sync_time(self):
+        first = self._last_sync == 0.0
+        best  = None
+        for _ in range(max(1, CFG["TIME_SYNC_SAMPLES"])):
+            try:
+                t0        = _clock.time()
+                server_ms = float(self._client.futures_time()["serverTime"])
+                t1        = _clock.time()
+            except Exception as e:
+                log.warning(f"[TIME SYNC] 서버 시간 조회 실패: {e}")
+                continue
+            rtt_ms = (t1 - t0) * 1000
+            if best is None or rtt_ms < best[0]:
+                best = (rtt_ms, server_ms - (t0 + t1) / 2 * 1000)
+
+        self._last_sync = _clock.time()
+        if best is None:
+            return
+
+        rtt_ms, offset_ms = best
+        drift_ms = 0.0 if first else abs(offset_ms - self.time_offset_ms)
+
+        self.rtt_ms         = rtt_ms
+        self.time_offset_ms = offset_ms
+        self.recv_window    = int(min(
+            CFG["RECV_WINDOW_MAX_MS"],
+            CFG["RECV_WINDOW_BASE_MS"] + rtt_ms * CFG["RECV_WINDOW_RTT_MULT"] + drift_ms,
+        ))
+        self._client.timestamp_offset = int(offset_ms)
+        self._last_call = _clock.time()
+        call_recorder.sync(self)
+        log.info(
+            f"[TIME SYNC] offset={offset_ms:.1f}ms rtt={rtt_ms:.1f}ms "
+            f"drift={drift_ms:.1f}ms recvWindow={self.recv_window}"
+        )
+
+    def server_time_ms(self) -> float:
+        return _clock.time() * 1000 + self.time_offset_ms
+
+    def maintain(self):
+        now = _clock.time()
+        if now - self._last_sync >= CFG["TIME_SYNC_INTERVAL_SEC"]:
+            self.sync_time()
+        elif now - self._last_call >= CFG["KEEPALIVE_PING_SEC"]:
+            try:
+                self._client.futures_ping()
+                self._last_call = now
+            except Exception as e:
+                log.warning(f"[KEEPALIVE] ping 실패: {e}")
+
+    # --------------------------------------------------------
+    # 마감 / 헤지 (멱등 읽기 전용)
+    # --------------------------------------------------------
+    def _timed(self, kind: str, fn, kwargs: dict):
+        t0     = _clock.time()
+        result = fn(**kwargs)
+        self._latency[kind].append((_clock.time() - t0) * 1000)
+        return result
+
+    def _hedge_delay(self, kind: str) -> float | None:
+        samples = self._latency[kind]
+        if len(samples) < CFG["HEDGE_MIN_SAMPLES"]:
+            return None
+        p = _percentile(sorted(samples), CFG["HEDGE_QUANTILE"])
+        return max(CFG["HEDGE_MIN_DELAY_MS"], p) / 1000
+
+    def _note_hedge(self, kind: str, sent: int = 0, won: int = 0, missed: int = 0):
+        s, w, m = self.hedges.get(kind, (0, 0, 0))
+        self.hedges[kind] = (s + sent, w + won, m + missed)
+
+    def _pooled(self, kind: str, fn, kwargs: dict):
+        try:
+            return self._timed(kind, fn, kwargs)
+        finally:
+            _hedge_slots.release()
+
+    def _submit(self, kind: str, fn, kwargs: dict):
+        # 빈 워커가 있을 때만 제출 → 요청은 제출 즉시 시작 (마감 = 요청 시작 기준, 풀 큐 대기 없음)
+        if not _hedge_slots.acquire(blocking=False):
+            return None
+        return _hedge_pool.submit(self._pooled, kind, fn, kwargs)
+
+    def _invoke(self, kind: str, fn, kwargs: dict):
+        charge   = _budget_ctx.__dict__.pop("charge", None)
+        deadline = CFG["CALL_DEADLINE_SEC"].get(kind) if kind in HEDGE_SAFE_KINDS else None
+        if not deadline:
+            return fn(**kwargs)
+        if kind not in self._latency:
+            self._latency[kind] = deque(maxlen=CFG["HEDGE_WINDOW"])
+
+        delay    = self._hedge_delay(kind)
+        t_end    = _clock.time() + deadline
+        first    = self._submit(kind, fn, kwargs)
+        if first is None:
+            # 풀 포화 (거래소 지연으로 버려진 요청이 점유 중) → 호출 스레드에서 헤지 없이 직접 (소켓 타임아웃 ≤ 마감)
+            log.debug(f"[HEDGE] 워커 포화 → {fn.__name__} 직접 호출")
+            return self._timed(kind, fn, kwargs)
+        live     = {first}
+        hedged   = delay is None
+        last_err = None
+        while live:
+            remaining = t_end - _clock.time()
+            if remaining <= 0:
+                break
+            done, live = wait_futures(live, timeout=remaining if hedged else min(remaining, delay),
+                                      return_when=FIRST_COMPLETED)
+            for f in done:
+                if f.exception() is None:
+                    if f is not first:
+                        self._note_hedge(kind, won=1)
+                    return f.result()
+                last_err = f.exception()
+            if not done and not hedged and _clock.time() < t_end:
+                # p95 안에 응답 없음 → 같은 요청 1회 추가, 먼저 온 쪽 채택
+                hedged = True
+                if charge is not None and not charge[0].try_acquire(charge[1]):
+                    continue   # 가중치 예산 부족 → 헤지 생략, 원 요청만 대기
+                extra = self._submit(kind, fn, kwargs)
+                if extra is None:
+                    continue   # 워커 포화 → 헤지 생략
+                live.add(extra)
+                self._note_hedge(kind, sent=1)
+                log.debug(f"[HEDGE] {fn.__name__} {delay * 1000:.0f}ms 무응답 → 헤지 발송")
+
+        if last_err is not None and not live:
+            raise last_err
+        self._note_hedge(kind, missed=1)
+        raise CallDeadlineExceeded(f"{fn.__name__} ({kind}) 마감 {deadline}s 초과")
+
+    def _call(self, kind: str, fn, signed: bool = False, **kwargs):
+        timeout  = CFG["HTTP_TIMEOUT_SEC"][kind]
+        deadline = CFG["CALL_DEADLINE_SEC"].get(kind) if kind in HEDGE_SAFE_KINDS else None
+        # 마감 있는 읽기는 소켓 타임아웃도 마감 이내 → 마감 후 버려진 요청이 워커를 오래 점유하지 않음
+        kwargs["requests_params"] = {"timeout": min(timeout, deadline) if deadline else timeout}
+        if signed:
+            kwargs["recvWindow"] = self.recv_window
+        t0 = _clock.time()
+        ok = False
+        result = err = None
+        try:
+            try:
+                result = self._invoke(kind, fn, kwargs)
+            except BinanceAPIException as e:
+                if not signed or getattr(e, "code", None) != -1021:
+                    raise
+                log.warning(f"[TIME SYNC] -1021 timestamp 거부 → 재동기화 후 1회 재시도 | {e}")
+                self.sync_time()
+                kwargs["recvWindow"] = self.recv_window
+                result = self._invoke(kind, fn, kwargs)
+            ok = True
+        except Exception as e:
+            err = e
+            raise
+        finally:
+            self._last_call = _clock.time()
+            ms = (self._last_call - t0) * 1000
+            n, total, peak, errors = self.stats.get(kind, (0, 0.0, 0.0, 0))
+            self.stats[kind] = (n + 1, total + ms, max(peak, ms), errors + (not ok))
+            params = {k: v for k, v in kwargs.items() if k not in ("requests_params", "recvWindow")}
+            flight.record("api", (
+                fn.__name__, params, round(ms, 1), _api_summary(result) if ok else repr(err),
+            ))
+            call_recorder.call(self, kind, fn.__name__, params, t0, ms, result, err)
+        return result
 
+    # --------------------------------------------------------
+    # 엔드포인트
+    # --------------------------------------------------------
     def exchange_info(self):
-        return self._client.futures_exchange_info()
+        return self._call("admin", self._client.futures_exchange_info)
 
-    def klines(self, symbol: str, interval: str, limit: int = 500):
-        return self._client.futures_klines(symbol=symbol, interval=interval, limit=limit)
+    def klines(self, symbol: str, interval: str, limit: int = 500, start_time: int | None = None,
+               end_time: int | None = None):
+        params = {"startTime": start_time} if start_time is not None else {}
+        if end_time is not None:
+            params["endTime"] = end_time
+        return self._call("market", self._client.futures_klines,
+                          symbol=symbol, interval=interval, limit=limit, **params)
 
     def get_position_risk(self, symbol: str):
-        return self._client.futures_position_information(symbol=symbol)
+        return self._call("query", self._client.futures_position_information,
+                          signed=True, symbol=symbol)
+
+    def get_position_risk_all(self):
+        return self._call("query", self._client.futures_position_information, signed=True)
 
     def get_orders(self, symbol: str):
-        return self._client.futures_get_open_orders(symbol=symbol)
+        return self._call("query", self._client.futures_get_open_orders,
+                          signed=True, symbol=symbol)
 
     def cancel_order(self, symbol: str, orderId: int):
-        return self._client.futures_cancel_order(symbol=symbol, orderId=orderId)
+        return self._call("cancel", self._client.futures_cancel_order,
+                          signed=True, symbol=symbol, orderId=orderId)
 
     def cancel_open_orders(self, symbol: str):
-        return self._client.futures_cancel_all_open_orders(symbol=symbol)
+        return self._call("cancel", self._client.futures_cancel_all_open_orders,
+                          signed=True, symbol=symbol)
 
-    def query_order(self, symbol: str, orderId: int):
-        return self._client.futures_get_order(symbol=symbol, orderId=orderId)
+    def query_order(self, symbol: str, orderId: int | None = None,
+                    origClientOrderId: str | None = None):
+        if origClientOrderId is not None:
+            return self._call("query", self._client.futures_get_order,
+                              signed=True, symbol=symbol, origClientOrderId=origClientOrderId)
+        return self._call("query", self._client.futures_get_order,
+                          signed=True, symbol=symbol, orderId=orderId)
 
     def new_order(self, **kwargs):
+        if kwargs.get("newClientOrderId") is None:
+            kwargs.pop("newClientOrderId", None)
         if "reduceOnly" in kwargs and isinstance(kwargs["reduceOnly"], str):
             kwargs["reduceOnly"] = kwargs["reduceOnly"].lower() == "true"
-        return self._client.futures_create_order(**kwargs)
+        return self._call("order", self._client.futures_create_order, signed=True, **kwargs)
+
+    def new_orders_batch(self, orders: list[dict]):
+        # POST /fapi/v1/batchOrders — 최대 BATCH_ORDER_MAX 건, 결과는 주문별 dict 또는 {"code", "msg"}
+        batch = [{k: v for k, v in o.items() if v is not None} for o in orders]
+        return self._call("order", self._client.futures_place_batch_order, signed=True, batchOrders=batch)
+
+    def modify_order(self, symbol: str, orderId: int, side: str, quantity: str, price: str):
+        return self._call("order", self._client.futures_modify_order, signed=True, symbol=symbol, orderId=orderId,
+                          side=side, quantity=quantity, price=price)
 
     def change_leverage(self, symbol: str, leverage: int):
-        return self._client.futures_change_leverage(symbol=symbol, leverage=leverage)
+        return self._call("admin", self._client.futures_change_leverage,
+                          signed=True, symbol=symbol, leverage=leverage)
 
     def change_margin_type(self, symbol: str, marginType: str):
-        return self._client.futures_change_margin_type(symbol=symbol, marginType=marginType)
+        return self._call("admin", self._client.futures_change_margin_type,
+                          signed=True, symbol=symbol, marginType=marginType)
 
     def ticker_price(self, symbol: str):
-        return self._client.futures_symbol_ticker(symbol=symbol)
+        return self._call("market", self._client.futures_symbol_ticker, symbol=symbol)
+
+
+# ------------------------------------------------------------
+# 호출 재생: 기록 파일을 거래소 대신 응답 (네트워크 없음)
+#   엔드포인트 메서드(파라미터 정규화 포함)는 BinanceFuturesCompat 그대로, _call 만 교체
+#   python-binance 함수명별 FIFO 로 응답 → 엔진 변경으로 호출 순서가 일부 바뀌어도 재생 지속
+#   파라미터가 기록과 다르면 mismatches 집계 (응답은 기록값 그대로)
+#   가상 시계(VirtualClock)를 응답 시각으로 이동 → sleep 은 즉시 반환
+# ------------------------------------------------------------
+class ReplayExhausted(BaseException):
+    """기록 소진 — 엔진의 광범위한 except Exception 을 통과해 재생 루프를 종료."""
+
+
+class VirtualClock:
+    """time 모듈 대체: time() / sleep() 만 가상, 나머지는 실제 time 모듈에 위임."""
+
+    def __init__(self, real, start: float):
+        self._real = real
+        self.now   = start
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, sec: float):
+        self.now += max(0.0, sec)
+
+    def advance_to(self, t: float):
+        if t > self.now:
+            self.now = t
+
+    def __getattr__(self, name):
+        return getattr(self._real, name)
+
+
+class _ReplayEndpoints:
+    # self._client.futures_xxx 자리: 함수명만 제공 (_call 이 이름으로 기록 조회)
+    def __getattr__(self, name):
+        def endpoint(**kwargs):
+            raise RuntimeError(f"replay 엔드포인트 직접 호출: {name}")
+        endpoint.__name__ = name
+        return endpoint
+
+
+class ReplayClient(BinanceFuturesCompat):
+    def __init__(self, path: str, account: str = "main"):
+        self._syncs: deque = deque()
+        super().__init__("", "", transport=_ReplayEndpoints())
+
+        self.clock: VirtualClock | None = None
+        self.cfg: dict = {}
+        self.start_ts  = None
+        self.served = self.mismatches = 0
+        self._queues: dict[str, deque] = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                rec = json.loads(line)
+                if self.start_ts is None:
+                    self.start_ts = rec["t"]
+                if rec["f"] == "open":
+                    self.cfg = self.cfg or rec["cfg"]
+                    self._syncs.append(rec)
+                elif rec["f"] == "sync":
+                    self._syncs.append(rec)
+                elif rec.get("a", "main") == account:
+                    self._queues.setdefault(rec["f"], deque()).append(rec)
+        self.total = sum(len(q) for q in self._queues.values())
+        # 기록 당시 클라이언트가 쓴 엔드포인트 그대로 재현
+        self.can_batch  = "futures_place_batch_order" in self._queues
+        self.can_modify = "futures_modify_order" in self._queues
+        log.info(f"[REPLAY] {path} | 계정={account} | 호출 {self.total}건 | 엔드포인트 {len(self._queues)}종")
+
+    def remaining(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def _tune_session(self):
+        pass
+
+    def sync_time(self):
+        # 가상 시각까지의 sync 기록 반영
+        while self._syncs and self._syncs[0]["t"] <= _clock.time():
+            rec = self._syncs.popleft()
+            self.time_offset_ms, self.rtt_ms, self.recv_window = rec["off"], rec["rtt"], rec["rw"]
+        self._last_sync = _clock.time()
+
+    def maintain(self):
+        self.sync_time()
+
+    def _call(self, kind: str, fn, signed: bool = False, **kwargs):
+        q = self._queues.get(fn.__name__)
+        if not q:
+            raise ReplayExhausted(fn.__name__)
+        rec = q.popleft()
+        self.served += 1
+        params = json.loads(json.dumps(kwargs, default=str))
+        if params != rec["p"]:
+            self.mismatches += 1
+            level = logging.WARNING if self.mismatches <= 20 else logging.DEBUG
+            log.log(level, f"[REPLAY] 파라미터 불일치 {fn.__name__} | 기록={rec['p']} | 현재={params}")
+        if self.clock is not None:
+            self.clock.advance_to(rec["t"] + rec["ms"] / 1000)
+        n, total, peak, errors = self.stats.get(kind, (0, 0.0, 0.0, 0))
+        self.stats[kind] = (n + 1, total + rec["ms"], max(peak, rec["ms"]), errors + ("e" in rec))
+        if "e" not in rec:
+            return rec["r"]
+        e = rec["e"]
+        if e["code"] is not None:
+            err = PaperAPIError(e["code"], e["msg"])
+            err.status_code = e["status"] or 400
+            raise err
+        raise (TimeoutError if "Timeout" in e["type"] else ConnectionError)(e["msg"])
+
+
+# ------------------------------------------------------------
+# 계정 라우팅: 스레드별 활성 계정 클라이언트로 위임
+#   모듈 함수들은 전역 client 를 그대로 쓰고, 팬아웃 워커는
+#   use_account() 로 자기 계정을 바인딩한다.
+# ------------------------------------------------------------
+class _ClientRouter:
+    # 기본 클라이언트는 첫 사용 시 생성 → import 만으로는 네트워크/argv 부작용 없음
+    def __init__(self, factory):
+        self._factory = factory
+        self._client: BinanceFuturesCompat | None = None
+        self._lock    = threading.Lock()
+
+    @property
+    def _default(self) -> BinanceFuturesCompat:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._factory()
+        return self._client
+
+    def install(self, cli: BinanceFuturesCompat) -> BinanceFuturesCompat:
+        self._client = cli
+        return cli
+
+    def __getattr__(self, name):
+        return getattr(getattr(_account_ctx, "client", None) or self._default, name)
+
+
+@contextmanager
+def use_account(name: str, cli: BinanceFuturesCompat, cfg: dict | None = None):
+    prev = (getattr(_account_ctx, "name", None), getattr(_account_ctx, "client", None),
+            getattr(_account_ctx, "cfg", None))
+    _account_ctx.name, _account_ctx.client, _account_ctx.cfg = name, cli, cfg
+    try:
+        yield cli
+    finally:
+        _account_ctx.name, _account_ctx.client, _account_ctx.cfg = prev
+
+
+class _AccountLogFilter(logging.Filter):
+    def filter(self, record):
+        name = getattr(_account_ctx, "name", None)
+        if name:
+            if name.startswith("shadow:") and \
+                    record.levelno < getattr(logging, CFG["SHADOW_LOG_LEVEL"]):
+                return False
+            record.msg = f"[{name}] {record.msg}"
+        return True
+
 
+log.addFilter(_AccountLogFilter())
 
-client = BinanceFuturesCompat(API_KEY, API_SECRET)
+# replay-calls 모드는 엔트리포인트에서 ReplayClient 를 install() (가상 시계는 run_call_replay)
+client = _ClientRouter(lambda: BinanceFuturesCompat(API_KEY, API_SECRET))
 
 # ============================================================
 # 심볼 필터 캐시
@@ -264,13 +1155,18 @@ def fmt_qty(qty: float, sym: str) -> str:
         return _quantize(qty, f["step_size"], f["qty_prec"])
     return f"{round(qty, f['qty_prec']):.{f['qty_prec']}f}"
 
-def is_order_valid(price: float, qty: float, sym: str) -> bool:
+def order_invalid_reason(price: float, qty: float, sym: str) -> str | None:
     f = _SYM_FILTERS[sym]
     if f["min_qty"] and qty < f["min_qty"]:
-        log.warning(f"주문 스킵: qty {qty} < minQty {f['min_qty']}")
-        return False
+        return f"qty {qty} < minQty {f['min_qty']}"
     if f["min_notional"] and price * qty < f["min_notional"]:
-        log.warning(f"주문 스킵: notional {price*qty:.2f} < minNotional {f['min_notional']}")
+        return f"notional {price*qty:.2f} < minNotional {f['min_notional']}"
+    return None
+
+def is_order_valid(price: float, qty: float, sym: str) -> bool:
+    reason = order_invalid_reason(price, qty, sym)
+    if reason:
+        log.warning(f"주문 스킵: {reason}")
         return False
     return True
 
@@ -294,34 +1190,177 @@ def calc_ema(values: list, period: int) -> list:
 # ============================================================
 
 def get_closed_bar_ts_with_closes(symbol: str, interval: str, limit: int = 60):
-    raw    = client.klines(symbol, interval, limit=limit + 1)
-    closed = raw[:-1]
-    closes = [float(k[4]) for k in closed]
-    ts     = int(closed[-1][0]) if closed else 0
-    return closes, ts
+    w = kline_feed.window(symbol, interval, limit)
+    w.refresh()
+    return w.tail("close", limit), w.last_ts
 
-def get_closed_bar_open_ts(symbol: str, interval: str) -> int:
-    raw = client.klines(symbol, interval, limit=2)
-    return int(raw[-2][0])
+def get_closed_bar_open_ts(symbol: str, interval: str) -> int | None:
+    bar = get_closed_bar(symbol, interval)
+    return int(bar[0]) if bar else None
+
+def get_closed_bar(symbol: str, interval: str) -> list | None:
+    # [open_ts, open, high, low, close] — 창이 비어 있으면 (조회 실패 / 신규 상장) None
+    w = kline_feed.window(symbol, interval, 2)
+    w.refresh()
+    rows = w.rows(1)
+    return rows[-1] if rows else None
+
+# ============================================================
+# 봉 시계 (서버 시간 기준 마감 스케줄)
+# ============================================================
+INTERVAL_SEC = {
+    "1m": 60, "3m": 180, "5m": 300, "15m": 900, "30m": 1800,
+    "1h": 3600, "2h": 7200, "4h": 14400, "6h": 21600, "8h": 28800,
+    "12h": 43200, "1d": 86400,
+}
+
+class BarClock:
+    def __init__(self, interval: str):
+        self.interval    = interval
+        self.interval_ms = INTERVAL_SEC[interval] * 1000
+
+    def last_closed_open_ms(self, now_ms: float | None = None) -> int:
+        now_ms = client.server_time_ms() if now_ms is None else now_ms
+        return int(now_ms // self.interval_ms - 1) * self.interval_ms
+
+    def sec_to_next_close(self, now_ms: float | None = None) -> float:
+        now_ms = client.server_time_ms() if now_ms is None else now_ms
+        return ((now_ms // self.interval_ms + 1) * self.interval_ms - now_ms) / 1000
+
+# ============================================================
+# 공용 kline 윈도우: (symbol, interval) 당 1개, 모든 소비자 공유
+#   완료봉만 보관. 마지막 open_ts 이후 봉만 startTime 으로 증분 조회
+#   컬럼은 array('d') → 소비자에게 memoryview 슬라이스로 복사 없이 전달
+#   갱신 시 새 array 묶음으로 참조 교체 → 이미 넘긴 view 는 이전 스냅샷 그대로
+# ============================================================
+KLINE_MAX_LIMIT = 1500
+_KLINE_COLS     = ("ts", "open", "high", "low", "close")
+
+
+class KlineWindow:
+    def __init__(self, symbol: str, interval: str, size: int):
+        self.symbol      = symbol
+        self.interval    = interval
+        self.clock       = BarClock(interval)
+        self.size        = size
+        self.fetches     = 0
+        self._cols       = (array("q"), array("d"), array("d"), array("d"), array("d"))
+        self._last_fetch = 0.0
+        self._lock       = threading.Lock()
+
+    @property
+    def last_ts(self) -> int:
+        ts = self._cols[0]
+        return ts[-1] if ts else 0
+
+    def __len__(self) -> int:
+        return len(self._cols[0])
+
+    def refresh(self):
+        with self._lock:
+            target = self.clock.last_closed_open_ms()
+            if len(self) >= self.size and self.last_ts >= target:
+                return
+            now = _clock.time()
+            if now - self._last_fetch < CFG["BAR_CLOSE_RETRY_SEC"]:
+                return   # 거래소 완료봉 미반영 → 재시도 간격 유지
+            self._last_fetch = now
+            self.fetches    += 1
+
+            missing = (target - self.last_ts) // self.clock.interval_ms
+            if len(self) >= self.size and missing + 1 <= KLINE_MAX_LIMIT:
+                raw = client.klines(self.symbol, self.interval, limit=missing + 1,
+                                    start_time=self.last_ts + self.clock.interval_ms)
+                if self._append(raw[:-1]):   # 마지막(진행 중) 봉 제외
+                    return
+                log.warning(f"[KLINE] {self.symbol} {self.interval} 불연속 → 전체 재조회")
+            raw = client.klines(self.symbol, self.interval, limit=min(self.size + 1, KLINE_MAX_LIMIT))
+            self._append(raw[:-1], reset=True)
+
+    def _append(self, closed: list, reset: bool = False) -> bool:
+        base = tuple(array(c.typecode) for c in self._cols) if reset else self._cols
+        last = base[0][-1] if base[0] else 0
+        rows = [k for k in closed if int(k[0]) > last]
+        if not rows:
+            return True
+        if last and int(rows[0][0]) != last + self.clock.interval_ms:
+            return False
+        cols = tuple(c[-self.size:] for c in base)   # 새 array (기존 view 영향 없음)
+        cols[0].extend(int(k[0]) for k in rows)
+        for i in range(1, 5):
+            cols[i].extend(float(k[i]) for k in rows)
+        self._cols = tuple(c[-self.size:] for c in cols)
+        return True
+
+    def tail(self, col: str, n: int) -> memoryview:
+        arr = self._cols[_KLINE_COLS.index(col)]
+        return memoryview(arr)[max(0, len(arr) - n):]
+
+    def rows(self, n: int) -> list:
+        cols = self._cols
+        return [list(r) for r in zip(*(c[-n:] for c in cols))]
+
+
+class KlineFeed:
+    def __init__(self):
+        self._windows: dict[tuple[str, str], KlineWindow] = {}
+        self._lock = threading.Lock()
+
+    def window(self, symbol: str, interval: str, size: int) -> KlineWindow:
+        with self._lock:
+            w = self._windows.get((symbol, interval))
+            if w is None:
+                w = self._windows[(symbol, interval)] = KlineWindow(symbol, interval, size)
+            elif size > w.size:
+                w.size        = size   # 다음 refresh 에서 확장 재조회 1회
+                w._last_fetch = 0.0
+            return w
+
+    def stats(self) -> dict:
+        return {f"{s}:{iv}": {"bars": len(w), "fetches": w.fetches}
+                for (s, iv), w in self._windows.items()}
+
+
+kline_feed = KlineFeed()
 
 # ============================================================
 # BarCache
 # ============================================================
 
 class BarCache:
-    def __init__(self, min_interval_sec: float = 0):
+    """interval 지정 시 다음 봉 마감 전까지 캐시 유효 (마감 직후 새 봉 확인까지 재조회).
+    미지정 시 기존 방식: min_interval_sec 벽시계 만료."""
+
+    def __init__(self, min_interval_sec: float = 0, interval: str | None = None):
         self._last_ts: int         = 0
         self._cached_result        = None
         self._last_api_time: float = 0.0
         self._min_interval         = min_interval_sec
+        self._clock                = BarClock(interval) if interval else None
+        self.last_data             = None
+
+    def invalidate(self):
+        self._cached_result = None
+        self._last_api_time = 0.0
+
+    def is_fresh(self) -> bool:
+        return (self._cached_result is not None and self._clock is not None
+                and self._last_ts >= self._clock.last_closed_open_ms())
 
     def query(self, fetch_fn, compute_fn):
-        now = time.time()
+        now = _clock.time()
+        if self._clock is not None:
+            if self.is_fresh():
+                return self._cached_result, self._last_ts
+            min_interval = CFG["BAR_CLOSE_RETRY_SEC"]
+        else:
+            min_interval = self._min_interval
         if self._cached_result is not None and \
-                (now - self._last_api_time) < self._min_interval:
+                (now - self._last_api_time) < min_interval:
             return self._cached_result, self._last_ts
         closes, ts          = fetch_fn()
         self._last_api_time = now
+        self.last_data      = closes
         if ts != self._last_ts or self._cached_result is None:
             self._cached_result = compute_fn(closes)
             self._last_ts       = ts
@@ -342,16 +1381,17 @@ def _compute_4h_filter(closes: list) -> bool:
     log.info(f"[HTF FILTER {label}] 4H close {closes[-1]:.4f} {'<' if ok else '>='} EMA{period} {ema_s[-1]:.4f}")
     return ok
 
-def check_4h_short_filter(symbol: str, cache: BarCache) -> bool:
+def check_4h_short_filter(symbol: str, cache: BarCache, resampler=None) -> bool:
     if not CFG["HTF_FILTER_ENABLE"]:
         return True
     period = CFG["HTF_FILTER_EMA_LEN"]
-    result, _ = cache.query(
-        fetch_fn=lambda: get_closed_bar_ts_with_closes(
+    if resampler is not None:
+        fetch_fn = lambda: resampler.closes_with_ts(period + 10)
+    else:
+        fetch_fn = lambda: get_closed_bar_ts_with_closes(
             symbol, CFG["INTERVAL_FILTER_HTF"], limit=period + 10
-        ),
-        compute_fn=_compute_4h_filter,
-    )
+        )
+    result, _ = cache.query(fetch_fn=fetch_fn, compute_fn=_compute_4h_filter)
     return result
 
 # ============================================================
@@ -369,38 +1409,279 @@ def _compute_5m_trigger(closes: list, highs: list) -> bool:
     cond3   = closes[-1] < closes[-2]
     triggered = cond1 and cond2 and cond2_b and cond3
     if triggered:
-        log.info(
-            f"[5M TRIGGER V8.2] EMA 이탈 + 고가 억제(0.3%) + 1봉 하락 | "
-            f"close={closes[-1]:.4f}<ema={ema_s[-1]:.4f} | "
-            f"high[-2]={highs[-2]:.4f}>ema[-2]={ema_s[-2]:.4f} | "
-            f"high[-1]={highs[-1]:.4f}<ema[-1]*1.003={(ema_s[-1]*1.003):.4f} | "
-            f"closes={closes[-2]:.4f}->{closes[-1]:.4f}"
-        )
+        _log_5m_trigger(closes[-1], closes[-2], highs[-1], highs[-2], ema_s[-1], ema_s[-2])
     return triggered
 
+def _log_5m_trigger(close: float, close_prev: float, high: float, high_prev: float,
+                    ema: float, ema_prev: float):
+    log.info(
+        f"[5M TRIGGER V8.2] EMA 이탈 + 고가 억제(0.3%) + 1봉 하락 | "
+        f"close={close:.4f}<ema={ema:.4f} | "
+        f"high[-2]={high_prev:.4f}>ema[-2]={ema_prev:.4f} | "
+        f"high[-1]={high:.4f}<ema[-1]*1.003={(ema*1.003):.4f} | "
+        f"closes={close_prev:.4f}->{close:.4f}"
+    )
+
+def trigger_window_len() -> int:
+    return CFG["EMA_TRIGGER_LEN"] + 10
+
+
+class TriggerArm:
+    """형성 중 봉 동안 다음 마감의 트리거 조건을 미리 계산.
+    마감 후 윈도우 = 현재 윈도우[1:] + 새 봉 → EMA 는 직전값에서 1스텝만 진행하므로
+    마감 시에는 새 봉 close/high 로 비교 몇 번이면 _compute_5m_trigger 와 동일한 결과.
+      cond2 (직전봉 high > 직전 EMA) 는 무장 시 확정
+      close < min(ema_prev, close_prev) 근방, high < ema_new * 1.003"""
+
+    def __init__(self):
+        self.base_ts:    int | None = None   # 무장 기준 = 마지막 완료봉 ts
+        self.armed:      bool  = False       # False → 다음 마감에 트리거 불가
+        self.period:     int   = 0
+        self.limit:      int   = 0
+        self.ema_prev:   float = 0.0
+        self.close_prev: float = 0.0
+        self.high_prev:  float = 0.0
+        self.close_max:  float = 0.0         # 참고용 임계값 (close 가 이 미만이어야 함)
+
+    def arm(self, closes, highs, base_ts: int):
+        period, limit = CFG["EMA_TRIGGER_LEN"], trigger_window_len()
+        self.base_ts, self.period, self.limit = base_ts, period, limit
+        ema_s = calc_ema(closes[1:], period) if len(closes) == limit else []
+        if len(ema_s) < 2:
+            self.armed = False
+            return
+        self.ema_prev, self.close_prev, self.high_prev = ema_s[-1], closes[-1], highs[-1]
+        self.close_max = min(self.ema_prev, self.close_prev)
+        self.armed     = self.high_prev > self.ema_prev
+        log.debug(
+            f"[TRIGGER ARM] base_ts={base_ts} armed={self.armed} | "
+            f"close<{self.close_max:.4f} high<ema_new*1.003 (ema_prev={self.ema_prev:.4f})"
+        )
+
+    def ready_for(self, ts: int, interval_ms: int) -> bool:
+        return (self.base_ts is not None and ts == self.base_ts + interval_ms
+                and self.period == CFG["EMA_TRIGGER_LEN"] and self.limit == trigger_window_len())
+
+    def evaluate(self, close: float, high: float) -> bool:
+        if not self.armed:
+            return False
+        k   = 2 / (self.period + 1)
+        ema = close * k + self.ema_prev * (1 - k)   # calc_ema 와 같은 연산 순서
+        triggered = close < ema and high < ema * 1.003 and close < self.close_prev
+        if triggered:
+            _log_5m_trigger(close, self.close_prev, high, self.high_prev, ema, self.ema_prev)
+        return triggered
+
 def _fetch_5m_trigger_inputs(symbol: str, limit: int):
-    raw    = client.klines(symbol, CFG["INTERVAL_TRIGGER"], limit=limit + 1)
-    closed = raw[:-1]
-    closes = [float(k[4]) for k in closed]
-    highs  = [float(k[2]) for k in closed]
-    ts     = int(closed[-1][0]) if closed else 0
-    return closes, highs, ts
-
-def calc_ema15_trigger(symbol: str, cache: BarCache) -> tuple[bool, int]:
-    period = CFG["EMA_TRIGGER_LEN"]
-    limit  = period + 10
+    w = kline_feed.window(symbol, CFG["INTERVAL_TRIGGER"], limit)
+    w.refresh()
+    return w.tail("close", limit), w.tail("high", limit), w.last_ts
+
+def calc_ema15_trigger(symbol: str, cache: BarCache, arm: TriggerArm | None = None) -> tuple[bool, int]:
+    limit       = trigger_window_len()
+    interval_ms = INTERVAL_SEC[CFG["INTERVAL_TRIGGER"]] * 1000
 
     def fetch():
         closes, highs, ts = _fetch_5m_trigger_inputs(symbol, limit)
-        return (closes, highs), ts
+        return (closes, highs, ts), ts
 
     def compute(data):
-        closes, highs = data
+        closes, highs, ts = data
+        if arm is not None and len(closes) == limit and arm.ready_for(ts, interval_ms):
+            return arm.evaluate(closes[-1], highs[-1])   # 사전 무장 → 비교만
         return _compute_5m_trigger(closes, highs)
 
     result, ts = cache.query(fetch_fn=fetch, compute_fn=compute)
     return result, ts
 
+# ============================================================
+# 멀티 심볼 스크리너 (numpy)
+#   심볼 × 봉 2-D 배열(close / high)을 interval 별로 보유, 마감마다 증분 봉만 일괄 반영
+#   EMA 는 봉 축으로 진행하며 심볼 축 전체를 한 번에 계산
+#     → 열 순서 합산 / calc_ema 와 같은 연산 순서라 단일 심볼 계산과 비트 단위 동일
+#   조회: 워커 풀 + kline 가중치 토큰 버킷 (증분 1봉 = 가중치 1)
+#   후보 확정은 전환 후 엔진 자체 feed 가 단일 심볼 경로로 재평가 (로그 / 저널 동일)
+# ============================================================
+def kline_weight(limit: int) -> int:
+    return 1 if limit < 100 else 2 if limit < 500 else 5 if limit <= 1000 else 10
+
+
+class WeightBudget:
+    def __init__(self, per_min: float):
+        self.rate   = per_min / 60.0
+        self.tokens = float(per_min) / 4       # 버스트 15초분 (증분 스캔 1회가 대기 없이 통과)
+        self.cap    = self.tokens
+        self._t     = _clock.time()
+        self._lock  = threading.Lock()
+
+    def try_acquire(self, weight: int) -> bool:
+        with self._lock:
+            now         = _clock.time()
+            self.tokens = min(self.cap, self.tokens + (now - self._t) * self.rate)
+            self._t     = now
+            if self.tokens >= weight:
+                self.tokens -= weight
+                return True
+            return False
+
+    def acquire(self, weight: int):
+        while not self.try_acquire(weight):
+            with self._lock:
+                wait = (weight - self.tokens) / self.rate
+            _clock.sleep(max(wait, 0.0))
+        _budget_ctx.charge = (self, weight)   # 이 스레드의 다음 호출 헤지도 같은 예산에서 차감
+
+
+class ScreenWindow:
+    def __init__(self, symbols: list, interval: str, bars: int):
+        self.interval = interval
+        self.clock    = BarClock(interval)
+        self.bars     = bars
+        self.close    = np.full((len(symbols), bars), np.nan)
+        self.high     = np.full((len(symbols), bars), np.nan)
+        self.last_ts  = np.zeros(len(symbols), dtype=np.int64)
+        self.count    = np.zeros(len(symbols), dtype=np.int64)
+
+    def stale(self, target: int) -> "np.ndarray":
+        return np.flatnonzero((self.count < self.bars) | (self.last_ts < target))
+
+    def apply(self, updates: dict):
+        # row → (closes, highs, last_ts, reset). 1봉 증분은 행 묶음으로 한 번에 시프트
+        ones = [i for i, u in updates.items() if len(u[0]) == 1 and not u[3]]
+        if ones:
+            idx = np.array(ones)
+            self.close[idx, :-1] = self.close[idx, 1:]
+            self.high[idx, :-1]  = self.high[idx, 1:]
+            self.close[idx, -1]  = [updates[i][0][0] for i in ones]
+            self.high[idx, -1]   = [updates[i][1][0] for i in ones]
+            self.last_ts[idx]    = [updates[i][2] for i in ones]
+            self.count[idx]      = np.minimum(self.count[idx] + 1, self.bars)
+        done = set(ones)
+        for i, (closes, highs, ts, reset) in updates.items():
+            if i in done or not closes:
+                continue
+            k = min(len(closes), self.bars)
+            if reset:
+                self.close[i] = self.high[i] = np.nan
+                self.count[i] = 0
+            if k < self.bars:
+                self.close[i, :-k] = self.close[i, k:]
+                self.high[i, :-k]  = self.high[i, k:]
+            self.close[i, -k:] = closes[-k:]
+            self.high[i, -k:]  = highs[-k:]
+            self.last_ts[i]    = ts
+            self.count[i]      = min(self.count[i] + len(closes), self.bars)
+
+
+def ema_last2(closes: "np.ndarray", period: int) -> tuple:
+    # calc_ema 를 심볼 축으로 벡터화 → (ema[-1], ema[-2])
+    k = 2 / (period + 1)
+    e = closes[:, 0].copy()
+    for j in range(1, period):
+        e = e + closes[:, j]
+    e = e / period
+    prev = e
+    for j in range(period, closes.shape[1]):
+        prev, e = e, closes[:, j] * k + e * (1 - k)
+    return e, prev
+
+
+class SymbolScreener:
+    def __init__(self):
+        if np is None:
+            raise RuntimeError("SCREENER_ENABLE 에는 numpy 필요")
+        self.symbols = self._universe()
+        self.trig    = ScreenWindow(self.symbols, CFG["INTERVAL_TRIGGER"], trigger_window_len())
+        self.htf     = ScreenWindow(self.symbols, CFG["INTERVAL_FILTER_HTF"], CFG["HTF_FILTER_EMA_LEN"] + 10)
+        self.budget  = WeightBudget(CFG["SCREENER_WEIGHT_PER_MIN"])
+        self._pool   = ThreadPoolExecutor(max_workers=CFG["SCREENER_WORKERS"], thread_name_prefix="screener")
+        self.last: dict = {}
+        log.info(f"[SCREENER] 대상 {len(self.symbols)}심볼 | {self.trig.interval}×{self.trig.bars} "
+                 f"{self.htf.interval}×{self.htf.bars}")
+
+    def _universe(self) -> list:
+        if CFG["SCREENER_SYMBOLS"]:
+            return list(CFG["SCREENER_SYMBOLS"])[:CFG["SCREENER_MAX_SYMBOLS"]]
+        symbols = [
+            s["symbol"] for s in client.exchange_info()["symbols"]
+            if s.get("quoteAsset") == "USDT" and s.get("contractType") == "PERPETUAL"
+            and s.get("status") == "TRADING"
+        ]
+        return symbols[:CFG["SCREENER_MAX_SYMBOLS"]]
+
+    def _fetch(self, win: ScreenWindow, i: int, target: int):
+        symbol, last = self.symbols[i], int(win.last_ts[i])
+        missing = (target - last) // win.clock.interval_ms
+        if win.count[i] >= win.bars and 0 < missing + 1 <= KLINE_MAX_LIMIT:
+            self.budget.acquire(kline_weight(missing + 1))
+            raw = client.klines(symbol, win.interval, limit=missing + 1, start_time=last + win.clock.interval_ms)
+            rows = [k for k in raw[:-1] if int(k[0]) > last]
+            if not rows or int(rows[0][0]) == last + win.clock.interval_ms:
+                return i, self._cols(rows, last, False)
+        limit = min(win.bars + 1, KLINE_MAX_LIMIT)
+        self.budget.acquire(kline_weight(limit))
+        return i, self._cols(client.klines(symbol, win.interval, limit=limit)[:-1], last, True)
+
+    @staticmethod
+    def _cols(rows: list, last: int, reset: bool) -> tuple:
+        ts = int(rows[-1][0]) if rows else last
+        return [float(k[4]) for k in rows], [float(k[2]) for k in rows], ts, reset
+
+    def _refresh(self, win: ScreenWindow) -> int:
+        target  = win.clock.last_closed_open_ms()
+        stale   = win.stale(target)
+        futures = [self._pool.submit(self._fetch, win, int(i), target) for i in stale]
+        updates = {}
+        for f in futures:
+            try:
+                i, cols = f.result()
+                updates[i] = cols
+            except Exception as e:
+                log.debug(f"[SCREENER] 조회 실패: {e}")
+        win.apply(updates)
+        return len(stale) - len(updates)
+
+    def scan(self) -> list:
+        """HTF 통과 + 트리거 심볼 목록 (EMA 대비 이탈폭 큰 순)."""
+        t0     = _clock.time()
+        failed = self._refresh(self.trig)
+        if CFG["HTF_FILTER_ENABLE"]:
+            failed += self._refresh(self.htf)
+
+        period   = CFG["EMA_TRIGGER_LEN"]
+        target   = self.trig.clock.last_closed_open_ms()
+        c, h     = self.trig.close, self.trig.high
+        ema, ema_prev = ema_last2(c, period)
+        with np.errstate(invalid="ignore"):
+            hit = ((self.trig.count >= self.trig.bars) & (self.trig.last_ts == target)
+                   & (c[:, -1] < ema) & (h[:, -2] > ema_prev)
+                   & (h[:, -1] < ema * 1.003) & (c[:, -1] < c[:, -2]))
+            if CFG["HTF_FILTER_ENABLE"]:
+                hc       = self.htf.close
+                h_ema, _ = ema_last2(hc, CFG["HTF_FILTER_EMA_LEN"])
+                hit     &= ((self.htf.count >= self.htf.bars)
+                            & (self.htf.last_ts == self.htf.clock.last_closed_open_ms())
+                            & (hc[:, -1] < h_ema))
+        rows = np.flatnonzero(hit)
+        depth = (ema[rows] - c[rows, -1]) / ema[rows]
+        picks = [self.symbols[i] for i in rows[np.argsort(-depth)]]
+
+        ms = (_clock.time() - t0) * 1000
+        self.last = {"ts": target, "symbols": len(self.symbols), "failed": failed,
+                     "scan_ms": round(ms, 1), "candidates": picks[:10]}
+        status_board.publish("screener", self.last)
+        log.info(f"[SCREENER] {len(self.symbols)}심볼 스캔 {ms:.0f}ms | 조회 실패 {failed} | 후보 {picks[:5]}")
+        return picks
+
+    def held_short(self) -> str | None:
+        # 재시작 시: 스크리너 대상 중 숏 보유 심볼 (있으면 해당 심볼로 동기화)
+        universe = set(self.symbols)
+        for p in client.get_position_risk_all():
+            if p["symbol"] in universe and float(p["positionAmt"]) < -0.0001:
+                return p["symbol"]
+        return None
+
+
 # ============================================================
 # 포지션
 # ============================================================
@@ -414,6 +1695,285 @@ def get_position(symbol: str) -> dict:
 def has_short_position(pos: dict) -> bool:
     return pos["amt"] < -0.0001
 
+def read_position(symbol: str) -> dict | None:
+    # 실행 레인용: 조회 실패는 None → 호출측이 재시도 판단
+    try:
+        return get_position(symbol)
+    except Exception as e:
+        log.warning(f"[POSITION] 조회 실패 ({symbol}): {e!r}")
+        return None
+
+# ------------------------------------------------------------
+# 로컬 포지션 원장 (체결 기반)
+#   amt / avg_price 는 positionRisk 의 positionAmt / entryPrice 와 동일 의미
+#   - SELL 체결: 숏 증가, 평균가 가중 갱신
+#   - BUY 체결:  숏 감소, 평균가 유지, 실현손익 누적
+#   - 0 도달 시 평균가 0
+#   주문별 executedQty / avgPrice 누적값의 증분만 반영 → 중복 반영 없음
+# ------------------------------------------------------------
+FINAL_ORDER_STATUSES = ("FILLED", "CANCELED", "EXPIRED", "REJECTED")
+
+class PositionLedger:
+    def __init__(self):
+        self.amt:          float = 0.0
+        self.avg_price:    float = 0.0
+        self.realized_pnl: float = 0.0
+        self.dirty:        bool  = True     # True → 다음 조회 시 positionRisk 대조
+        self.verified_at:  float = 0.0
+        self._applied: dict[int, tuple[float, float]] = {}   # orderId → (qty, notional)
+        self._status:  dict[int, str] = {}
+        self.watching: set[int] = set()
+        self.on_fill = None   # (order_id, side, qty, price) 콜백
+
+    def position(self) -> dict:
+        return {"amt": self.amt, "avg_price": self.avg_price}
+
+    def is_open(self, order_id: int) -> bool:
+        return order_id in self.watching and self._status.get(order_id) in ("NEW", "PARTIALLY_FILLED")
+
+    def status(self, order_id: int) -> str | None:
+        return self._status.get(order_id)
+
+    def executed_qty(self, order_id: int) -> float:
+        return self._applied.get(order_id, (0.0, 0.0))[0]
+
+    def _fill(self, side: str, qty: float, price: float):
+        if side == "SELL":
+            short = -self.amt
+            self.avg_price = (short * self.avg_price + qty * price) / (short + qty)
+            self.amt      -= qty
+        else:
+            self.realized_pnl += (self.avg_price - price) * qty
+            self.amt          += qty
+            if abs(self.amt) < 1e-9:
+                self.amt, self.avg_price = 0.0, 0.0
+
+    def apply_order(self, order: dict, baseline: bool = False):
+        # baseline=True → 이미 포지션에 반영된 체결분으로 등록만 (재시작 sync)
+        oid      = int(order["orderId"])
+        status   = order.get("status", "NEW")
+        executed = float(order.get("executedQty", 0) or 0)
+        avg      = float(order.get("avgPrice", 0) or 0) or float(order.get("price", 0) or 0)
+        notional = executed * avg
+
+        prev_qty, prev_notional = self._applied.get(oid, (0.0, 0.0))
+        delta = executed - prev_qty
+        if delta > 1e-12 and not baseline:
+            self._fill(order["side"], delta, (notional - prev_notional) / delta)
+            if self.on_fill is not None:
+                self.on_fill(oid, order["side"], delta, (notional - prev_notional) / delta)
+            log.info(
+                f"[LEDGER] 체결 반영 orderId={oid} {order['side']} +{delta:.4f} "
+                f"@{(notional - prev_notional) / delta:.4f} → amt={self.amt:.4f} avg={self.avg_price:.4f}"
+            )
+        self._applied[oid] = (max(executed, prev_qty), max(notional, prev_notional))
+        self._status[oid]  = status
+        if status in FINAL_ORDER_STATUSES:
+            self.watching.discard(oid)
+        else:
+            self.watching.add(oid)
+
+    def reconcile(self, pos: dict):
+        drift = (abs(pos["amt"] - self.amt) > 0.0001
+                 or (pos["amt"] != 0 and abs(pos["avg_price"] - self.avg_price) > pos["avg_price"] * 0.0005))
+        if drift:
+            log.warning(
+                f"[LEDGER DRIFT] local amt={self.amt:.4f} avg={self.avg_price:.4f} | "
+                f"exchange amt={pos['amt']:.4f} avg={pos['avg_price']:.4f} → 거래소 기준 보정"
+            )
+        self.amt, self.avg_price = pos["amt"], pos["avg_price"]
+        self.dirty       = False
+        self.verified_at = _clock.time()
+
+    def clear_watch(self):
+        self.watching.clear()
+        self._applied.clear()
+        self._status.clear()
+
+
+# ------------------------------------------------------------
+# 거미줄 주문 장부
+#   단계(stage) = 슬롯 인덱스 (1부터) → 컬럼 array 에 orderId / 가격 / 수량 / 상태
+#   orderId → stage 색인 dict 로 양방향 O(1) 조회
+#   체결 / 취소 표시는 거미줄 밖 주문(EXIT BUY, SL)도 _marks 에 함께 기록
+#   exit_ids: 현재 BUY EXIT 주문 orderId 목록
+# ------------------------------------------------------------
+BOOK_EMPTY, BOOK_OPEN, BOOK_FILLED, BOOK_CANCELED = 0, 1, 2, 3
+BOOK_MAGIC = b"VLB1"
+
+class LadderBook:
+    __slots__ = ("order_id", "price", "qty", "status", "exit_ids", "_by_oid", "_marks")
+
+    def __init__(self, size: int = 0):
+        self._alloc(size)
+        self.exit_ids: list[int] = []
+        self._marks:   dict[int, int] = {}   # orderId → BOOK_FILLED / BOOK_CANCELED
+
+    def _alloc(self, size: int):
+        self.order_id = array("q", bytes(8 * (size + 1)))
+        self.price    = array("d", bytes(8 * (size + 1)))
+        self.qty      = array("d", bytes(8 * (size + 1)))
+        self.status   = array("b", bytes(size + 1))
+        self._by_oid: dict[int, int] = {}    # 거미줄 orderId → stage
+
+    def _grow(self, stage: int):
+        extra = stage + 1 - len(self.status)
+        if extra > 0:
+            self.order_id.frombytes(bytes(8 * extra))
+            self.price.frombytes(bytes(8 * extra))
+            self.qty.frombytes(bytes(8 * extra))
+            self.status.frombytes(bytes(extra))
+
+    # ── 기록 ──
+    def add(self, stage: int, order_id: int, price: float, qty: float, filled: bool = False):
+        self._grow(stage)
+        prev = self.order_id[stage]
+        if prev and self._by_oid.get(prev) == stage:
+            del self._by_oid[prev]
+        self.order_id[stage] = order_id
+        self.price[stage]    = price
+        self.qty[stage]      = qty
+        self.status[stage]   = BOOK_OPEN
+        self._by_oid[order_id] = stage
+        if filled:
+            self.mark_filled(order_id)
+        elif order_id in self._marks:
+            self.status[stage] = self._marks[order_id]
+
+    def mark_filled(self, order_id: int):
+        self._marks[order_id] = BOOK_FILLED
+        stage = self._by_oid.get(order_id)
+        if stage is not None:
+            self.status[stage] = BOOK_FILLED
+
+    def mark_canceled(self, order_id: int):
+        # 체결 표시가 우선 (취소 응답 전 체결된 주문)
+        if self._marks.get(order_id) == BOOK_FILLED:
+            return
+        self._marks[order_id] = BOOK_CANCELED
+        stage = self._by_oid.get(order_id)
+        if stage is not None:
+            self.status[stage] = BOOK_CANCELED
+
+    # ── 조회 ──
+    def __len__(self) -> int:
+        return len(self._by_oid)
+
+    def stage_of(self, order_id: int) -> int | None:
+        return self._by_oid.get(order_id)
+
+    def price_of(self, stage: int) -> float | None:
+        if 0 < stage < len(self.status) and self.status[stage] != BOOK_EMPTY:
+            return self.price[stage]
+        return None
+
+    def is_filled(self, order_id: int) -> bool:
+        return self._marks.get(order_id) == BOOK_FILLED
+
+    def is_done(self, order_id: int) -> bool:
+        return order_id in self._marks
+
+    def stages(self) -> list[int]:
+        return [s for s, st in enumerate(self.status) if st != BOOK_EMPTY]
+
+    def order_ids(self) -> list[int]:
+        return [self.order_id[s] for s in self.stages()]
+
+    def unfilled_ids(self) -> list[int]:
+        return [self.order_id[s] for s, st in enumerate(self.status) if st in (BOOK_OPEN, BOOK_CANCELED)]
+
+    def pending_ids(self) -> list[int]:
+        return [self.order_id[s] for s, st in enumerate(self.status) if st == BOOK_OPEN]
+
+    def filled_count(self) -> int:
+        return self.status.count(BOOK_FILLED)
+
+    def pending_count(self) -> int:
+        return self.status.count(BOOK_OPEN)
+
+    # ── 집계 (컬럼 단위) ──
+    #   numpy 있으면 컬럼 array 버퍼 위 복사 없는 view 로 마스크 연산, 없으면 같은 식의 순회
+    #   view 는 호출 안에서만 사용 (버퍼 export 가 남으면 _grow 의 array 확장이 BufferError)
+    def _views(self):
+        return (np.frombuffer(self.price, dtype=np.float64), np.frombuffer(self.qty, dtype=np.float64),
+                np.frombuffer(self.status, dtype=np.int8))
+
+    def filled_qty(self) -> float:
+        if np is None:
+            return sum(q for q, st in zip(self.qty, self.status) if st == BOOK_FILLED)
+        _, qty, status = self._views()
+        return float(qty[status == BOOK_FILLED].sum())
+
+    def pending_notional(self) -> float:
+        if np is None:
+            return sum(p * q for p, q, st in zip(self.price, self.qty, self.status) if st == BOOK_OPEN)
+        price, qty, status = self._views()
+        mask = status == BOOK_OPEN
+        return float(np.dot(price[mask], qty[mask]))
+
+    def expected_avg(self) -> float:
+        # 체결 + 대기 단계가 모두 체결될 때의 평균가 (취소분 제외)
+        if np is None:
+            qty = notional = 0.0
+            for p, q, st in zip(self.price, self.qty, self.status):
+                if st in (BOOK_OPEN, BOOK_FILLED):
+                    qty      += q
+                    notional += p * q
+            return notional / qty if qty > 0 else 0.0
+        price, qtys, status = self._views()
+        mask = (status == BOOK_OPEN) | (status == BOOK_FILLED)
+        qty  = float(qtys[mask].sum())
+        return float(np.dot(price[mask], qtys[mask])) / qty if qty > 0 else 0.0
+
+    # ── 초기화 ──
+    def clear_ladder(self):
+        # TP1 이후: 거미줄 단계와 체결 표시만 비움 (취소 표시는 유지 → 재취소 방지)
+        self._alloc(len(self.status) - 1)
+        self._marks = {oid: m for oid, m in self._marks.items() if m == BOOK_CANCELED}
+
+    def reset(self, size: int | None = None):
+        self._alloc(len(self.status) - 1 if size is None else size)
+        self.exit_ids = []
+        self._marks   = {}
+
+    # ── 스냅샷 / 직렬화 ──
+    def snapshot(self) -> dict:
+        return {
+            "stages":           [[s, self.order_id[s], self.price[s], self.qty[s], self.status[s]]
+                                 for s in self.stages()],
+            "exit_ids":         list(self.exit_ids),
+            "filled_qty":       round(self.filled_qty(), 8),
+            "pending_notional": round(self.pending_notional(), 4),
+            "expected_avg":     round(self.expected_avg(), 8),
+        }
+
+    def to_bytes(self) -> bytes:
+        # MAGIC | u32 슬롯 수 | u32 EXIT 수 | u32 표시 수 | 컬럼 바이트 | exit_ids | 표시 (orderId, 코드)
+        marks = array("q", itertools.chain.from_iterable(self._marks.items()))
+        return b"".join((
+            BOOK_MAGIC,
+            struct.pack("<III", len(self.status), len(self.exit_ids), len(self._marks)),
+            self.order_id.tobytes(), self.price.tobytes(), self.qty.tobytes(), self.status.tobytes(),
+            array("q", self.exit_ids).tobytes(), marks.tobytes(),
+        ))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "LadderBook":
+        if data[:len(BOOK_MAGIC)] != BOOK_MAGIC:
+            raise ValueError("LadderBook 직렬화 형식 아님")
+        slots, n_exit, n_marks = struct.unpack_from("<III", data, len(BOOK_MAGIC))
+        pos  = len(BOOK_MAGIC) + 12
+        book = cls(slots - 1)
+        for col, width in ((book.order_id, 8), (book.price, 8), (book.qty, 8), (book.status, 1)):
+            col[:] = array(col.typecode, data[pos:pos + slots * width])
+            pos += slots * width
+        book.exit_ids = array("q", data[pos:pos + 8 * n_exit]).tolist()
+        pos += 8 * n_exit
+        flat = array("q", data[pos:pos + 16 * n_marks])
+        book._marks  = dict(zip(flat[::2], flat[1::2]))
+        book._by_oid = {book.order_id[s]: s for s in book.stages()}
+        return book
+
 # ============================================================
 # 주문 유틸
 # ============================================================
@@ -421,7 +1981,7 @@ def has_short_position(pos: dict) -> bool:
 def get_open_orders(symbol: str) -> list:
     try:
         return client.get_orders(symbol=symbol)
-    except ClientError as e:
+    except ReadError as e:
         log.error(f"주문 조회 실패: {e}")
         return []
 
@@ -434,100 +1994,250 @@ def cancel_order(symbol: str, order_id: int) -> bool:
         log.warning(f"주문 취소 실패 ({order_id}): {e}")
         return False
 
-def cancel_all_orders(symbol: str):
+def cancel_all_orders(symbol: str) -> bool:
     try:
         client.cancel_open_orders(symbol=symbol)
         log.info("미체결 전체 취소")
+        return True
     except ClientError as e:
         log.warning(f"전체 취소 실패: {e}")
+        return False
+
+def cancel_orders(symbol: str, order_ids: list) -> list:
+    return [oid for oid in order_ids if cancel_order(symbol, oid)]
 
 def query_order_status(symbol: str, order_id: int) -> str:
     try:
         return client.query_order(symbol=symbol, orderId=order_id).get("status", "UNKNOWN")
-    except ClientError as e:
+    except ReadError as e:
         log.warning(f"query_order 실패 ({order_id}): {e}")
         return "UNKNOWN"
 
-def place_limit_short(symbol: str, price: float, qty: float) -> dict | None:
-    if not is_order_valid(price, qty, symbol):
+# ------------------------------------------------------------
+# clientOrderId 기반 멱등 주문
+#   cid = {ENGINE_TAG}{ladder_id}-{kind}{stage}-{attempt}
+#   kind: E=1단 시장가, L=거미줄, X=지정가 EXIT, S=SL, T=TP1, C=최종청산
+# ------------------------------------------------------------
+AMBIGUOUS_ERROR_CODES = {-1000, -1001, -1006, -1007, -4116}
+ORDER_NOT_FOUND_CODE  = -2013
+
+def make_client_order_id(ladder_id: str, kind: str, stage: int, attempt: int = 0) -> str:
+    return f"{CFG['ENGINE_TAG']}{ladder_id}-{kind}{stage}-{attempt}"[:36]
+
+def parse_ladder_id(client_order_id: str) -> str | None:
+    tag = CFG["ENGINE_TAG"]
+    if not client_order_id or not client_order_id.startswith(tag):
         return None
+    return client_order_id[len(tag):].split("-")[0] or None
+
+# 전송 계층 오류 (요청이 거래소에 닿았는지 알 수 없음). CallDeadlineExceeded 는 TimeoutError 하위
+TRANSPORT_ERRORS = (TimeoutError, ConnectionError) + (
+    (requests_exc.ConnectionError, requests_exc.Timeout, requests_exc.ChunkedEncodingError,
+     urllib3_exc.ProtocolError, urllib3_exc.TimeoutError)
+    if requests_exc is not None else ()
+)
+
+def _is_ambiguous(e: Exception) -> bool:
+    if isinstance(e, ClientError):
+        status = getattr(e, "status_code", 0) or 0
+        return getattr(e, "code", None) in AMBIGUOUS_ERROR_CODES or status >= 500
+    return isinstance(e, TRANSPORT_ERRORS)   # 그 외 (파라미터 / 코드 오류) → 미접수로 확정
+
+def resolve_client_order(symbol: str, client_id: str) -> dict | None:
     try:
-        order = client.new_order(
-            symbol=symbol, side="SELL", type="LIMIT", timeInForce="GTC",
-            price=fmt_price(price, symbol), quantity=fmt_qty(qty, symbol),
-        )
-        log.info(f"[ENTRY LADDER] SELL LIMIT price={fmt_price(price, symbol)} qty={fmt_qty(qty, symbol)}")
-        return order
+        order = client.query_order(symbol=symbol, origClientOrderId=client_id)
     except ClientError as e:
-        log.error(f"숏 주문 실패: {e}")
+        if getattr(e, "code", None) == ORDER_NOT_FOUND_CODE:
+            log.info(f"[CID RESOLVE] 미접수 확인 → 재시도 안전 | cid={client_id}")
+        else:
+            log.error(f"[CID RESOLVE] 조회 실패 | cid={client_id} | {e}")
         return None
+    except Exception as e:
+        log.error(f"[CID RESOLVE] 조회 실패 | cid={client_id} | {e}")
+        return None
+    if order.get("status") == "REJECTED":
+        return None
+    log.info(
+        f"[CID RESOLVE] 접수 확인 | cid={client_id} orderId={order.get('orderId')} "
+        f"status={order.get('status')}"
+    )
+    return order
 
-def place_market_short(symbol: str, qty: float) -> dict | None:
+def _submit_order(**params) -> dict:
+    cid      = params.get("newClientOrderId")
+    t_submit = _clock.time()
+    try:
+        order = client.new_order(**params)
+    except Exception as e:
+        if cid is None or not _is_ambiguous(e):
+            raise
+        log.warning(f"[CID RESOLVE] 주문 결과 불명 → clientOrderId 조회 | cid={cid} | {e}")
+        order = resolve_client_order(params["symbol"], cid)
+        if order is None:
+            raise OrderNotPlaced(f"cid={cid} 미접수: {e}") from e
+    exec_telemetry.on_ack(cid, t_submit, _clock.time(), order)
+    return order
+
+BATCH_ORDER_MAX = 5   # /fapi/v1/batchOrders 1회 최대 주문 수
+
+def submit_order_batch(orders: list[dict]) -> list[dict | None]:
+    """_submit_order 와 같은 파라미터 목록을 batchOrders 로 제출. 결과는 입력 순서대로 주문 또는 None.
+    호출 단위 결과 불명 / 항목별 불명 코드는 cid 조회로 확정."""
+    results: list[dict | None] = []
+    if not client.can_batch:
+        for params in orders:
+            try:
+                results.append(_submit_order(**params))
+            except OrderSubmitError as e:
+                log.error(f"숏 주문 실패: {e}")
+                results.append(None)
+        return results
+    for i in range(0, len(orders), BATCH_ORDER_MAX):
+        chunk    = orders[i:i + BATCH_ORDER_MAX]
+        t_submit = _clock.time()
+        try:
+            resp = client.new_orders_batch(chunk)
+        except Exception as e:
+            if not _is_ambiguous(e):
+                log.error(f"배치 주문 실패 ({len(chunk)}건): {e}")
+                results += [None] * len(chunk)
+                continue
+            log.warning(f"[CID RESOLVE] 배치 결과 불명 → clientOrderId 조회 | {e}")
+            resp = [{"code": -1007, "msg": str(e)}] * len(chunk)   # 항목 전부 조회 대상
+        t_ack = _clock.time()
+        for params, r in zip(chunk, resp):
+            cid = params.get("newClientOrderId")
+            if r and "orderId" not in r and cid and r.get("code") in AMBIGUOUS_ERROR_CODES:
+                r = resolve_client_order(params["symbol"], cid)
+            if r and "orderId" in r:
+                exec_telemetry.on_ack(cid, t_submit, t_ack, r)
+                results.append(r)
+            else:
+                log.error(f"숏 주문 실패: cid={cid} | {r}")
+                results.append(None)
+    return results
+
+def place_market_short(symbol: str, qty: float, client_id: str | None = None) -> dict | None:
     q_str = fmt_qty(abs(qty), symbol)
     if float(q_str) <= 0:
         log.warning(f"시장가 숏 스킵: qty={q_str}")
         return None
     try:
-        order = client.new_order(
+        order = _submit_order(
             symbol=symbol, side="SELL", type="MARKET",
-            quantity=q_str,
+            quantity=q_str, newClientOrderId=client_id, newOrderRespType="RESULT",
         )
         log.info(f"[ENTRY LADDER] SELL MARKET qty={q_str}")
         return order
-    except ClientError as e:
+    except OrderSubmitError as e:
         log.error(f"시장가 숏 실패: {e}")
         return None
 
-def place_limit_exit(symbol: str, price: float, qty: float) -> dict | None:
+def place_limit_exit(symbol: str, price: float, qty: float,
+                     client_id: str | None = None) -> dict | None:
     if not is_order_valid(price, qty, symbol):
         return None
     try:
-        order = client.new_order(
+        order = _submit_order(
             symbol=symbol, side="BUY", type="LIMIT", timeInForce="GTC",
             price=fmt_price(price, symbol), quantity=fmt_qty(qty, symbol),
-            reduceOnly="true",
+            reduceOnly="true", newClientOrderId=client_id,
         )
         log.info(f"[EXIT/SL] BUY EXIT LIMIT price={fmt_price(price, symbol)} qty={fmt_qty(qty, symbol)}")
         return order
-    except ClientError as e:
+    except OrderSubmitError as e:
         log.error(f"청산 주문 실패: {e}")
         return None
 
-def place_stop_limit_sl(symbol: str, stop_price: float, limit_price: float, qty: float) -> dict | None:
+def place_stop_limit_sl(symbol: str, stop_price: float, limit_price: float, qty: float,
+                        client_id: str | None = None) -> dict | None:
     if not is_order_valid(stop_price, qty, symbol):
         return None
     try:
-        order = client.new_order(
+        order = _submit_order(
             symbol=symbol, side="BUY", type="STOP", timeInForce="GTC",
             stopPrice=fmt_price(stop_price, symbol),
             price=fmt_price(limit_price, symbol),
             quantity=fmt_qty(qty, symbol),
-            reduceOnly="true",
+            reduceOnly="true", newClientOrderId=client_id,
         )
         log.info(
             f"[EXIT/SL] BUY SL STOP_LIMIT stopPrice={fmt_price(stop_price, symbol)} "
             f"price={fmt_price(limit_price, symbol)} qty={fmt_qty(qty, symbol)} reduceOnly=True"
         )
         return order
-    except ClientError as e:
+    except OrderSubmitError as e:
         log.error(f"SL 주문 실패: {e}")
         return None
 
-def market_close_short(symbol: str, qty: float) -> bool:
+def market_close_short(symbol: str, qty: float, client_id: str | None = None) -> dict | None:
     q_str = fmt_qty(abs(qty), symbol)
     if float(q_str) <= 0:
         log.warning(f"시장가 청산 스킵: qty={q_str}")
-        return False
+        return None
     try:
-        client.new_order(
+        order = _submit_order(
             symbol=symbol, side="BUY", type="MARKET",
-            quantity=q_str, reduceOnly="true",
+            quantity=q_str, reduceOnly="true", newClientOrderId=client_id,
+            newOrderRespType="RESULT",
         )
         log.info(f"[EXIT/SL] BUY MARKET 시장가 청산 qty={q_str}")
-        return True
-    except ClientError as e:
+        return order
+    except OrderSubmitError as e:
         log.error(f"시장가 청산 실패: {e}")
-        return False
+        return None
+
+# ------------------------------------------------------------
+# 주문 정정 (PUT /fapi/v1/order) — LIMIT 만 지원, 그 외는 호출측에서 취소 후 재주문
+#   qty 는 주문 총수량 (거래소가 체결분 포함 총량으로 설정) → 부분 체결 주문은 호출측이 체결분 가산
+# ------------------------------------------------------------
+MODIFY_NOOP_CODE = -5027   # 가격/수량 동일 → 정정 불필요
+
+def amend_limit_order(symbol: str, order_id: int, side: str, price: float, qty: float) -> dict | None:
+    if not client.can_modify:
+        log.info("정정 미지원 (python-binance futures_modify_order 없음) → 취소/재주문")
+        return None
+    if not is_order_valid(price, qty, symbol):
+        return None
+    p_str, q_str = fmt_price(price, symbol), fmt_qty(qty, symbol)
+    try:
+        order = client.modify_order(symbol=symbol, orderId=order_id, side=side,
+                                    quantity=q_str, price=p_str)
+        log.info(f"[EXIT/SL] AMEND {side} LIMIT orderId={order_id} price={p_str} qty={q_str}")
+        return order
+    except ClientError as e:
+        if getattr(e, "code", None) == MODIFY_NOOP_CODE:
+            # 변경 없음 → 주문 상태는 모름 (부분 체결일 수 있음). 원장 / 저널에 반영하지 않도록 표시만
+            return {"orderId": order_id, "side": side, "noop": True}
+        log.warning(f"정정 실패 ({order_id}) → 취소/재주문: {e}")
+        return None
+
+def replace_exit_order(symbol: str, old_ids: list, price: float, qty: float,
+                       client_order_id: str) -> tuple[list, dict | None]:
+    # 실행 레인 워커용: 기존 EXIT 취소 후 재주문 (엔진 상태는 건드리지 않음)
+    canceled = [oid for oid in old_ids if cancel_order(symbol, oid)]
+    return canceled, place_limit_exit(symbol, price, qty, client_order_id)
+
+def replace_sl_order(symbol: str, old_id: int | None, stop_price: float, limit_price: float,
+                     qty: float, client_order_id: str) -> tuple[bool, dict | None]:
+    # 실행 레인 워커용: SL 은 STOP 타입 → 거래소 정정 미지원 → 취소 후 재주문, 실패 시 1회 재시도
+    canceled = old_id is None or cancel_order(symbol, old_id)
+    order    = place_stop_limit_sl(symbol, stop_price, limit_price, qty, client_order_id)
+    if order is None:
+        # 결과 불명은 _submit_order 에서 이미 확정됨 → 동일 cid 재시도는 중복 불가
+        # 대기는 워커 스레드에서만 (결정 스레드 tick 은 막지 않음)
+        log.warning("[SL RESET] 1차 실패 → 0.1초 후 재시도")
+        _clock.sleep(0.1)
+        order = place_stop_limit_sl(symbol, stop_price, limit_price, qty, client_order_id)
+    return canceled, order
+
+def close_short_and_read(symbol: str, qty: float, client_id: str) -> tuple[dict | None, dict | None]:
+    # 실행 레인 워커용 (TP1 부분청산): RESULT 응답에 체결 미확정이면 잠시 뒤 잔량 조회까지 워커에서
+    order = market_close_short(symbol, qty, client_id)
+    if not order or order.get("status") == "FILLED":
+        return order, None
+    _clock.sleep(0.2)
+    return order, read_position(symbol)
 
 def set_leverage(symbol: str, leverage: int):
     try:
@@ -578,63 +2288,848 @@ def calc_ladder_quantities_per_stage(
         qtys.append(capital_i / price_i)
     return qtys
 
-def calc_avg_full(prices: list, qtys: list) -> float:
-    total_notional = sum(p * q for p, q in zip(prices, qtys))
-    total_qty      = sum(qtys)
-    return total_notional / total_qty if total_qty > 0 else 0.0
+def calc_avg_full(prices: list, qtys: list) -> float:
+    total_notional = sum(p * q for p, q in zip(prices, qtys))
+    total_qty      = sum(qtys)
+    return total_notional / total_qty if total_qty > 0 else 0.0
+
+def _ladder_plan_key() -> tuple:
+    # 계획 계산에 쓰인 설정 → 리로드로 바뀌면 재계산
+    return (CFG["LADDER_COUNT"], CFG["LADDER_GAP_PCT"], tuple(CFG["SIZE_WEIGHTS"]),
+            CFG["TOTAL_CAPITAL_USDT"], CFG["LEVERAGE"], CFG["MAX_CAPITAL_RATIO"])
+
+def ladder_plan_fits(plan: dict | None, entry_price: float) -> bool:
+    return (
+        plan is not None
+        and plan["key"] == _ladder_plan_key()
+        and abs(entry_price - plan["entry"]) <= plan["entry"] * CFG["LADDER_PLAN_REUSE_PCT"]
+    )
+
+def build_ladder_plan(symbol: str, entry_price: float) -> dict:
+    """거미줄 배치에 필요한 계산·검증·포맷을 한 번에. 형성 중 봉에서 미리 만들어 두고
+    배치 시 진입가가 LADDER_PLAN_REUSE_PCT 이내면 그대로 사용 (벗어나면 배치 시점에 재계산)."""
+    count   = CFG["LADDER_COUNT"]
+    weights = normalize_weights(CFG["SIZE_WEIGHTS"], count)
+    prices  = build_ladder_prices(entry_price, count, CFG["LADDER_GAP_PCT"])
+    qtys    = calc_ladder_quantities_per_stage(
+        CFG["TOTAL_CAPITAL_USDT"], CFG["LEVERAGE"], weights, prices, entry_price
+    )
+    effective = CFG["TOTAL_CAPITAL_USDT"] * CFG["MAX_CAPITAL_RATIO"] * CFG["LEVERAGE"]
+    planned   = entry_price * qtys[0] + sum(prices[i] * qtys[i] for i in range(1, count))
+    ratio     = planned / effective
+
+    error = None
+    if not (CFG["CAPITAL_CHECK_MIN_RATIO"] <= ratio <= CFG["CAPITAL_CHECK_MAX_RATIO"]):
+        error = f"[CAPITAL CHECK] 범위 이탈 ratio={ratio:.3f} → 배치 중단"
+    for i in range(1, count):
+        if error is None and prices[i] < entry_price * 0.999:
+            error = f"[SHORT SAFETY] stage={i+1} price={prices[i]:.4f} → 배치 중단"
+
+    avg_full = calc_avg_full([entry_price] + prices[1:], qtys)
+    limits, skipped = [], []
+    for i in range(1, count):
+        reason = order_invalid_reason(prices[i], qtys[i], symbol)
+        if reason:
+            skipped.append((i + 1, reason))
+            continue
+        limits.append((i + 1, prices[i], qtys[i], {
+            "symbol": symbol, "side": "SELL", "type": "LIMIT", "timeInForce": "GTC",
+            "price": fmt_price(prices[i], symbol), "quantity": fmt_qty(qtys[i], symbol),
+        }))
+    return {
+        "key": _ladder_plan_key(), "entry": entry_price, "prices": prices, "qtys": qtys,
+        "effective": effective, "planned": planned, "ratio": ratio, "error": error,
+        "avg_full": avg_full, "sl_price": avg_full * (1 + CFG["HARD_SL_PCT"]),
+        "limits": limits, "skipped": skipped,
+    }
+
+def get_stage_target_pct(stage: int) -> float:
+    if stage <= 3: return CFG["TARGET_PROFIT_STAGE_1_3"]
+    if stage <= 5: return CFG["TARGET_PROFIT_STAGE_4_5"]
+    if stage <= 7: return CFG["TARGET_PROFIT_STAGE_6_7"]
+    if stage <= 9: return CFG["TARGET_PROFIT_STAGE_8_9"]
+    return CFG["TARGET_PROFIT_STAGE_10"]
+
+def calc_exit_price(avg_price: float, stage: int) -> float:
+    return avg_price * (1 - CFG["FEE_PCT_ONEWAY"] * 2 - get_stage_target_pct(stage))
+
+# ============================================================
+# 5분 완료봉 감지
+# ============================================================
+
+class BarTracker:
+    def __init__(self, symbol: str, interval: str):
+        self.symbol        = symbol
+        self.interval      = interval
+        self.clock         = BarClock(interval)
+        self.last_ts       = None
+        self.last_bar: list | None = None
+        self._cached_ts    = None
+        self._last_checked = 0.0
+
+    def awaiting_close(self) -> bool:
+        # 시계상 마감됐으나 거래소 완료봉 미반영
+        return self.last_ts is None or self.last_ts < self.clock.last_closed_open_ms()
+
+    def new_bar_closed(self) -> bool:
+        now = _clock.time()
+        if self.awaiting_close() and now - self._last_checked >= CFG["BAR_CLOSE_RETRY_SEC"]:
+            bar = get_closed_bar(self.symbol, self.interval)
+            if bar is not None:   # 빈 창 → 아직 마감 미확인, 다음 재시도에서 재조회
+                self.last_bar   = bar
+                self._cached_ts = int(bar[0])
+            self._last_checked = now
+        return self.observe(self._cached_ts)
+
+    def observe(self, ts: int | None) -> bool:
+        if ts is None:
+            return False
+        if self.last_ts is None:
+            self.last_ts = ts
+            return False
+        if ts > self.last_ts:
+            self.last_ts = ts
+            return True
+        return False
+
+# ============================================================
+# 상위 봉 리샘플링 (5m 완료봉 → 4h 등, 거래소 경계 정렬)
+# ============================================================
+
+class BarResampler:
+    """하위 완료봉을 받아 상위 봉을 로컬 합성.
+    - 최초 사용 시 거래소 상위 봉으로 1회 seed
+    - 버킷의 마지막 하위봉 도착 즉시 확정 (다음 버킷 대기 없음)
+    - 누락봉(재시작/지연) 있는 버킷은 거래소 봉으로 대체
+    - HTF_RESAMPLE_VERIFY: 확정 시 거래소 봉과 대조 후 불일치면 거래소 기준"""
+
+    def __init__(self, symbol: str, interval: str, base_interval: str, keep: int = 0):
+        self.symbol      = symbol
+        self.interval    = interval
+        self.interval_ms = INTERVAL_SEC[interval] * 1000
+        self.base_ms     = INTERVAL_SEC[base_interval] * 1000
+        self.bars: deque = deque(maxlen=keep or CFG["RESAMPLE_KEEP_BARS"])
+        self._bucket: list | None = None   # [open_ts, o, h, l, c]
+        self._bucket_complete     = False
+        self._bucket_last_ts      = 0
+        self._pending_ts          = 0      # 거래소 확인 대기 중인 버킷
+
+    @property
+    def last_ts(self) -> int:
+        return self.bars[-1][0] if self.bars else 0
+
+    def _seed(self):
+        w = kline_feed.window(self.symbol, self.interval, self.bars.maxlen)
+        w.refresh()
+        self.bars.extend(w.rows(self.bars.maxlen))
+        log.info(f"[RESAMPLE] {self.interval} seed {len(self.bars)}봉 | last_ts={self.last_ts}")
+
+    def closes_with_ts(self, limit: int) -> tuple[list, int]:
+        if not self.bars:
+            self._seed()
+        if self._pending_ts:
+            self._confirm(None)
+        closes = [b[4] for b in list(self.bars)[-limit:]]
+        return closes, self.last_ts
+
+    def add_base_bar(self, row: list):
+        ts     = int(row[0])
+        o, h, l, c = (float(x) for x in row[1:5])
+        bucket_ts  = ts - ts % self.interval_ms
+
+        if self._bucket is not None and bucket_ts != self._bucket[0]:
+            self._bucket_complete = False   # 마지막 하위봉 누락 → 미완성 버킷 확정
+            self._finalize()
+        if self._bucket is None:
+            self._bucket          = [bucket_ts, o, h, l, c]
+            self._bucket_complete = ts == bucket_ts
+        else:
+            if ts != self._bucket_last_ts + self.base_ms:
+                self._bucket_complete = False
+            self._bucket[2] = max(self._bucket[2], h)
+            self._bucket[3] = min(self._bucket[3], l)
+            self._bucket[4] = c
+        self._bucket_last_ts = ts
+
+        if ts + self.base_ms == bucket_ts + self.interval_ms:
+            self._finalize()
+
+    def _finalize(self):
+        bucket, complete = self._bucket, self._bucket_complete
+        self._bucket = None
+        if not self.bars or bucket[0] <= self.last_ts:
+            return   # seed 전이거나 이미 보유한 봉
+        if complete and not CFG["HTF_RESAMPLE_VERIFY"]:
+            self.bars.append(bucket)
+            return
+        self._pending_ts = bucket[0]
+        self._confirm(bucket if complete else None)
+
+    def _confirm(self, local: list | None):
+        w = kline_feed.window(self.symbol, self.interval, self.bars.maxlen)
+        w.refresh()
+        remote = {b[0]: b for b in w.rows(3) if b[0] > self.last_ts}
+        target = remote.get(self._pending_ts)
+
+        if target is None and local is not None:
+            target = local   # 거래소 미반영 → 로컬 봉 우선 사용
+        elif target is not None and local is not None and target[1:] != local[1:]:
+            log.warning(f"[RESAMPLE MISMATCH] {self.interval} ts={target[0]} local={local[1:]} exchange={target[1:]}")
+
+        if target is None:
+            return   # 미완성 + 거래소 미반영 → 다음 조회 시 재시도
+        for ts in sorted(remote):
+            if ts < target[0]:
+                self.bars.append(remote[ts])   # 누락 구간 보충
+        self.bars.append(target)
+        self._pending_ts = 0
+
+# ============================================================
+# 시장 데이터 피드 (틱 단위 가격 / 완료봉 / 필터 / 트리거)
+# ============================================================
+
+class MarketFeed:
+    """틱당 1회 poll. 필터·트리거는 poll 주기 안에서 최초 요청 시 1회만 계산."""
+
+    def __init__(self, symbol: str):
+        self.symbol      = symbol
+        self.bar_tracker = BarTracker(symbol, CFG["INTERVAL_EXEC"])
+
+        self._htf_cache     = BarCache(interval=CFG["INTERVAL_FILTER_HTF"])
+        self._trigger_cache = BarCache(interval=CFG["INTERVAL_TRIGGER"])
+
+        intervals = CFG["RESAMPLE_INTERVALS"] if CFG["HTF_RESAMPLE_ENABLE"] else []
+        self.resamplers = {
+            iv: BarResampler(symbol, iv, CFG["INTERVAL_EXEC"]) for iv in intervals
+        }
+
+        self.current_price: float = 0.0
+        self.new_bar:       bool  = False
+        self._htf_ok:  bool | None             = None
+        self._trigger: tuple[bool, int] | None = None
+        self.trigger_arm = TriggerArm()
+
+    def poll(self):
+        ticker = client.ticker_price(symbol=self.symbol)
+        self.current_price = float(ticker["price"])
+        self.new_bar       = self.bar_tracker.new_bar_closed()
+        self._htf_ok       = None
+        self._trigger      = None
+        if self.new_bar:
+            for r in self.resamplers.values():
+                r.add_base_bar(self.bar_tracker.last_bar)
+        else:
+            self.pre_arm()
+
+    def pre_arm(self):
+        # 형성 중 봉: 보유 윈도우로만 계산 (조회 없음)
+        limit = trigger_window_len()
+        w = kline_feed.window(self.symbol, CFG["INTERVAL_TRIGGER"], limit)
+        if len(w) >= limit and w.last_ts != self.trigger_arm.base_ts:
+            self.trigger_arm.arm(w.tail("close", limit), w.tail("high", limit), w.last_ts)
+
+    def htf_ok(self) -> bool:
+        if self._htf_ok is None:
+            resampler = self.resamplers.get(CFG["INTERVAL_FILTER_HTF"])
+            self._htf_ok = check_4h_short_filter(self.symbol, self._htf_cache, resampler)
+        return self._htf_ok
+
+    def trigger(self) -> tuple[bool, int]:
+        if self._trigger is None:
+            self._trigger = calc_ema15_trigger(self.symbol, self._trigger_cache, self.trigger_arm)
+        return self._trigger
+
+    def sleep_hint(self) -> float:
+        # 완료봉 확인 대기 중이면 짧게, 아니면 다음 마감 직후에 깨도록 poll 간격 단축
+        if self.bar_tracker.awaiting_close():
+            return CFG["BAR_CLOSE_RETRY_SEC"]
+        to_close = self.bar_tracker.clock.sec_to_next_close() + CFG["BAR_CLOSE_DELAY_SEC"]
+        return max(0.2, min(CFG["POLL_INTERVAL_SEC"], to_close))
+
+    def invalidate(self):
+        self._htf_cache.invalidate()
+        self._trigger_cache.invalidate()
+        self._htf_ok     = None
+        self._trigger    = None
+        self.trigger_arm = TriggerArm()
+
+    def prepare_decision(self):
+        # 팬아웃 전에 공용 판단을 미리 확정 → 워커 스레드는 결과만 읽음
+        if self.htf_ok():
+            self.trigger()
+
+# ============================================================
+# 샘플링 프로파일러
+#   토글: kill -USR1 <pid>  또는  PROFILE_CONTROL_FILE 생성/삭제
+#   출력: <ts>.folded (collapsed stack — flamegraph.pl / speedscope 호환)
+#         <ts>.top.txt (self / inclusive 상위 N 함수)
+# ============================================================
+
+class SamplingProfiler:
+    def __init__(self, thread_ids: set | None = None):
+        # thread_ids=None → 프로파일러 자신을 제외한 전체 스레드
+        self.thread_ids = thread_ids
+        self._thread: threading.Thread | None = None
+        self._stop     = threading.Event()
+        self._counts: Counter = Counter()
+        self._started  = 0.0
+        self._samples  = 0
+        self._by_file  = False
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        if self.running:
+            return
+        self._by_file = False
+        self._counts  = Counter()
+        self._samples = 0
+        self._started = _clock.time()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample_loop, name="profiler", daemon=True)
+        self._thread.start()
+        log.info(f"[PROFILE] 시작 | {CFG['PROFILE_HZ']}Hz")
+
+    def stop(self):
+        if not self.running:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._dump()
+
+    def toggle(self, *_):
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+
+    def install_signal(self):
+        if hasattr(signal, "SIGUSR1") and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGUSR1, self.toggle)
+
+    def poll_control(self):
+        # 제어 파일로 켠 세션만 파일 삭제로 종료 (시그널 세션은 시그널로 종료)
+        wanted = os.path.exists(CFG["PROFILE_CONTROL_FILE"])
+        if wanted and not self.running:
+            self.start()
+            self._by_file = True
+        elif not wanted and self.running and self._by_file:
+            self.stop()
+
+    def _sample_loop(self):
+        interval = 1.0 / CFG["PROFILE_HZ"]
+        me       = threading.get_ident()
+        names    = {}
+        while not self._stop.wait(interval):
+            for tid, frame in sys._current_frames().items():
+                if tid == me or (self.thread_ids is not None and tid not in self.thread_ids):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(
+                        f"{getattr(code, 'co_qualname', code.co_name)} "
+                        f"({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                    )
+                    frame = frame.f_back
+                if self.thread_ids is None:
+                    if tid not in names:
+                        names = {t.ident: t.name for t in threading.enumerate()}
+                    stack.append(names.get(tid, str(tid)))
+                self._counts[";".join(reversed(stack))] += 1
+            self._samples += 1
+
+    def _dump(self):
+        os.makedirs(CFG["PROFILE_OUT_DIR"], exist_ok=True)
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        base  = os.path.join(CFG["PROFILE_OUT_DIR"], f"profile_{stamp}")
+
+        with open(base + ".folded", "w", encoding="utf-8") as f:
+            for stack, n in self._counts.most_common():
+                f.write(f"{stack} {n}\n")
+
+        self_cnt, incl_cnt = Counter(), Counter()
+        for stack, n in self._counts.items():
+            frames = stack.split(";")
+            self_cnt[frames[-1]] += n
+            for fn in set(frames):
+                incl_cnt[fn] += n
+
+        total = sum(self._counts.values()) or 1
+        top_n = CFG["PROFILE_TOP_N"]
+        lines = [
+            f"duration={_clock.time() - self._started:.1f}s samples={self._samples} "
+            f"stacks={total} hz={CFG['PROFILE_HZ']}",
+            "", f"[SELF top {top_n}]",
+        ]
+        lines += [f"{n*100/total:6.2f}%  {n:7d}  {fn}" for fn, n in self_cnt.most_common(top_n)]
+        lines += ["", f"[INCLUSIVE top {top_n}]"]
+        lines += [f"{n*100/total:6.2f}%  {n:7d}  {fn}" for fn, n in incl_cnt.most_common(top_n)]
+        with open(base + ".top.txt", "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+        log.info(f"[PROFILE] 종료 → {base}.folded / .top.txt | samples={self._samples}")
+        for fn, n in self_cnt.most_common(min(5, top_n)):
+            log.info(f"[PROFILE] self {n*100/total:5.1f}% {fn}")
+
+# ============================================================
+# 거래 저널 (SQLite WAL, 백그라운드 배치 기록)
+#   tick 경로는 큐에 put 만 — 디스크 I/O 는 writer 스레드 전담
+# ============================================================
+_JOURNAL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ladders (
+    account TEXT NOT NULL, ladder_id TEXT NOT NULL, symbol TEXT,
+    opened_at REAL, day TEXT, entry_price REAL, avg_full REAL, sl_price REAL,
+    max_filled_stage INTEGER DEFAULT 0, closed_at REAL, close_reason TEXT,
+    realized_pnl REAL,
+    PRIMARY KEY (account, ladder_id)
+);
+CREATE TABLE IF NOT EXISTS orders (
+    ts REAL, account TEXT, ladder_id TEXT, order_id INTEGER, client_order_id TEXT,
+    kind TEXT, stage INTEGER, side TEXT, type TEXT, price REAL, qty REAL, status TEXT
+);
+CREATE TABLE IF NOT EXISTS fills (
+    ts REAL, account TEXT, ladder_id TEXT, order_id INTEGER, side TEXT, qty REAL, price REAL
+);
+CREATE TABLE IF NOT EXISTS stage_transitions (
+    ts REAL, account TEXT, ladder_id TEXT, from_stage INTEGER, to_stage INTEGER
+);
+CREATE TABLE IF NOT EXISTS executions (
+    ts REAL, account TEXT, ladder_id TEXT, order_id INTEGER, client_order_id TEXT,
+    grp TEXT, decision TEXT, t_origin REAL, t_decision REAL, t_submit REAL, t_ack REAL,
+    t_fill REAL, intended REAL, realized REAL, qty REAL, slippage_bps REAL
+);
+CREATE INDEX IF NOT EXISTS ix_ladders_stage  ON ladders (max_filled_stage);
+CREATE INDEX IF NOT EXISTS ix_ladders_reason ON ladders (close_reason);
+CREATE INDEX IF NOT EXISTS ix_ladders_day    ON ladders (day);
+CREATE INDEX IF NOT EXISTS ix_orders_ladder  ON orders (account, ladder_id);
+CREATE INDEX IF NOT EXISTS ix_fills_ladder   ON fills (account, ladder_id);
+CREATE INDEX IF NOT EXISTS ix_stage_ladder   ON stage_transitions (account, ladder_id);
+CREATE INDEX IF NOT EXISTS ix_exec_grp       ON executions (grp);
+"""
+
+
+class Journal:
+    def __init__(self, path: str):
+        self.path     = path
+        self.dropped  = 0
+        self._q: queue.Queue = queue.Queue(maxsize=CFG["JOURNAL_QUEUE_MAX"])
+        self._thread: threading.Thread | None = None
+        self._lock    = threading.Lock()
+
+    def _put(self, sql: str, params: tuple):
+        if not self.path:
+            return
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._writer, name="journal", daemon=True)
+                    self._thread.start()
+        try:
+            self._q.put_nowait((sql, params))
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                log.warning(f"[JOURNAL] 큐 포화 → 기록 누락 {self.dropped}건")
+
+    def _writer(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_JOURNAL_SCHEMA)
+        while True:
+            item  = self._q.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = _clock.time() + CFG["JOURNAL_FLUSH_SEC"]
+            while len(batch) < CFG["JOURNAL_BATCH"]:
+                try:
+                    item = self._q.get(timeout=max(0.0, deadline - _clock.time()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    break
+                batch.append(item)
+            try:
+                with conn:
+                    for sql, params in batch:
+                        conn.execute(sql, params)
+            except sqlite3.Error as e:
+                log.error(f"[JOURNAL] 기록 실패 ({len(batch)}건): {e}")
+            if item is None:
+                break
+        conn.close()
+
+    def close(self):
+        if self._thread is not None:
+            self._q.put(None)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    # ── 기록 API ──
+    @staticmethod
+    def _account() -> str:
+        return getattr(_account_ctx, "name", None) or "main"
+
+    def ladder_open(self, ladder_id: str, symbol: str, entry: float, avg_full: float, sl_price: float):
+        now = _clock.time()
+        self._put(
+            "INSERT OR REPLACE INTO ladders (account, ladder_id, symbol, opened_at, day, "
+            "entry_price, avg_full, sl_price) VALUES (?, ?, ?, ?, date(?, 'unixepoch'), ?, ?, ?)",
+            (self._account(), ladder_id, symbol, now, now, entry, avg_full, sl_price),
+        )
+
+    def ladder_close(self, ladder_id: str, reason: str, max_stage: int, realized_pnl: float):
+        self._put(
+            "UPDATE ladders SET closed_at = ?, close_reason = ?, max_filled_stage = ?, "
+            "realized_pnl = ? WHERE account = ? AND ladder_id = ?",
+            (_clock.time(), reason, max_stage, realized_pnl, self._account(), ladder_id),
+        )
+
+    def order(self, ladder_id: str, order: dict):
+        cid = order.get("clientOrderId", "") or ""
+        tag = cid.rsplit("-", 2)
+        kind, stage = (tag[1][:1], int(tag[1][1:] or 0)) if len(tag) == 3 and tag[1][1:].isdigit() else ("", 0)
+        self._put(
+            "INSERT INTO orders VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (_clock.time(), self._account(), ladder_id, int(order["orderId"]), cid, kind, stage,
+             order.get("side"), order.get("type"), float(order.get("price", 0) or 0),
+             float(order.get("origQty", 0) or 0), order.get("status")),
+        )
+
+    def fill(self, ladder_id: str, order_id: int, side: str, qty: float, price: float):
+        self._put(
+            "INSERT INTO fills VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (_clock.time(), self._account(), ladder_id, order_id, side, qty, price),
+        )
+
+    def stage(self, ladder_id: str, from_stage: int, to_stage: int):
+        self._put(
+            "INSERT INTO stage_transitions VALUES (?, ?, ?, ?, ?)",
+            (_clock.time(), self._account(), ladder_id, from_stage, to_stage),
+        )
+        self._put(
+            "UPDATE ladders SET max_filled_stage = MAX(max_filled_stage, ?) "
+            "WHERE account = ? AND ladder_id = ?",
+            (to_stage, self._account(), ladder_id),
+        )
+
+    def execution(self, rec: dict):
+        self._put(
+            "INSERT INTO executions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (_clock.time(), rec["account"], rec["ladder_id"], rec["order_id"], rec["cid"],
+             rec["group"], rec["decision"], rec["t_origin"], rec["t_decision"], rec["t_submit"],
+             rec["t_ack"], rec["t_fill"], rec["intended"], rec["realized"], rec["qty"],
+             rec["slippage_bps"]),
+        )
+
+
+journal = Journal(CFG["JOURNAL_DB"])
+atexit.register(journal.close)
+
+# ============================================================
+# 체결 품질 텔레메트리
+#   결정(트리거 평가 / TP1·트레일 조건 / _final_close 진입) → 제출 → ack → 체결
+#   시각과 의도가 vs 실현가를 주문(cid) 단위로 추적, 완료 시 그룹별 집계
+#   그룹: 진입 stage{n} / 청산 사유 (TP1, TRAIL, DEEP_TRAIL, HARD_SL, TIMEOUT, LIMIT_EXIT, SL)
+#   슬리피지 bps 는 불리한 방향이 양수 (SELL 은 낮게, BUY 는 높게 체결)
+#   shadow 계정(페이퍼 체결)은 집계 제외
+# ============================================================
+EXEC_METRICS = (
+    "origin_to_decision_ms",   # 봉 마감 → 트리거 평가 (TRIGGER 만)
+    "decision_to_submit_ms",
+    "submit_to_ack_ms",
+    "ack_to_fill_ms",
+    "decision_to_fill_ms",
+    "slippage_bps",
+)
+EXEC_EXIT_GROUPS = {"X": "LIMIT_EXIT", "S": "SL", "T": "TP1"}
+
+
+def _percentile(sorted_vals: list, q: float) -> float:
+    return sorted_vals[min(len(sorted_vals) - 1, int(q * len(sorted_vals)))]
+
+
+class ExecTelemetry:
+    def __init__(self):
+        self._pending: dict[tuple[str, str], dict] = {}   # (account, cid) → 기록
+        self._samples: dict[str, dict[str, deque]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _account() -> str:
+        return getattr(_account_ctx, "name", None) or "main"
+
+    def intent(self, ladder_id: str, cid: str, kind: str, stage: int,
+               decision: dict, intended: float | None):
+        group = f"stage{stage}" if kind in ("E", "L") else EXEC_EXIT_GROUPS.get(kind, decision["event"])
+        rec = {
+            "account": self._account(), "ladder_id": ladder_id, "cid": cid, "order_id": None,
+            "group": group, "decision": decision["event"],
+            "t_origin": decision["t_origin"], "t_decision": decision["t"],
+            "t_submit": None, "t_ack": None, "t_fill": None,
+            "intended": intended if intended is not None else decision["ref"],
+            "realized": None, "qty": 0.0, "slippage_bps": None,
+        }
+        with self._lock:
+            self._pending[(rec["account"], cid)] = rec
+            while len(self._pending) > CFG["EXEC_PENDING_MAX"]:
+                self._pending.pop(next(iter(self._pending)))
+
+    def on_ack(self, cid: str | None, t_submit: float, t_ack: float, order: dict):
+        rec = self._pending.get((self._account(), cid)) if cid else None
+        if rec is None:
+            return
+        if rec["t_submit"] is None:   # 재시도 → 최초 제출 시각 유지
+            rec["t_submit"] = t_submit
+        rec["t_ack"]    = t_ack
+        rec["order_id"] = int(order["orderId"])
+        self.on_order(order)
+
+    def on_order(self, order: dict):
+        rec = self._pending.get((self._account(), order.get("clientOrderId")))
+        if rec is None or rec["t_ack"] is None:
+            return
+        executed = float(order.get("executedQty", 0) or 0)
+        if executed > 0 and rec["t_fill"] is None:
+            upd = order.get("updateTime")
+            t_fill = (int(upd) - client.time_offset_ms) / 1000 if upd else _clock.time()
+            rec["t_fill"] = max(t_fill, rec["t_submit"])   # 오프셋 오차로 제출 이전이 되지 않게
+        if order.get("type") == "LIMIT" and float(order.get("price", 0) or 0) > 0:
+            rec["intended"] = float(order["price"])   # 정정 반영: 지정가 주문은 현재 지정가 기준
+        if order.get("status") not in FINAL_ORDER_STATUSES:
+            return
+        with self._lock:
+            self._pending.pop((rec["account"], rec["cid"]), None)
+        if executed <= 0:
+            return
+        realized = float(order.get("avgPrice", 0) or 0) or float(order.get("price", 0) or 0)
+        rec["realized"], rec["qty"] = realized, executed
+        if rec["intended"]:
+            sign = 1 if order.get("side") == "SELL" else -1
+            rec["slippage_bps"] = sign * (rec["intended"] - realized) / rec["intended"] * 10000
+        self._record(rec)
+
+    def _record(self, rec: dict):
+        journal.execution(rec)
+        if rec["account"].startswith("shadow:"):
+            return
+
+        def ms(a, b):
+            return (rec[b] - rec[a]) * 1000 if rec[a] and rec[b] else None
+
+        values = {
+            "origin_to_decision_ms": ms("t_origin", "t_decision"),
+            "decision_to_submit_ms": ms("t_decision", "t_submit"),
+            "submit_to_ack_ms":      ms("t_submit", "t_ack"),
+            "ack_to_fill_ms":        max(0.0, ms("t_ack", "t_fill") or 0.0) if rec["t_fill"] else None,
+            "decision_to_fill_ms":   ms("t_decision", "t_fill"),
+            "slippage_bps":          rec["slippage_bps"],
+        }
+        with self._lock:
+            group = self._samples.setdefault(rec["group"], {
+                m: deque(maxlen=CFG["EXEC_TELEMETRY_WINDOW"]) for m in EXEC_METRICS
+            })
+            for m, v in values.items():
+                if v is not None:
+                    group[m].append(v)
+        status_board.publish("exec", {"ts": _clock.time(), "groups": self.report()})
+
+    def report(self) -> dict:
+        with self._lock:
+            snap = {g: {m: sorted(d) for m, d in ms.items() if d} for g, ms in self._samples.items()}
+        return {
+            g: {m: {"n": len(v), "avg": round(sum(v) / len(v), 2),
+                    "p50": round(_percentile(v, 0.5), 2), "p90": round(_percentile(v, 0.9), 2),
+                    "p99": round(_percentile(v, 0.99), 2)}
+                for m, v in ms.items()}
+            for g, ms in snap.items()
+        }
+
+    def log_report(self):
+        for group, ms in sorted(self.report().items()):
+            parts = [f"{m.removesuffix('_ms')}=p50 {v['p50']}/p90 {v['p90']}" for m, v in ms.items()]
+            n = max(v["n"] for v in ms.values())
+            log.info(f"[EXEC] {group:<11} n={n} | " + " | ".join(parts))
+
+
+exec_telemetry = ExecTelemetry()
+
+# ============================================================
+# 상태 조회 엔드포인트 (읽기 전용)
+#   게시자(엔진 / 스크리너 / shadow / exec)마다 전용 슬롯 1개 → 자기 스레드만 기록
+#   tick 끝 게시 = 슬롯의 스냅샷 참조 교체 1회 (락 없음). 락은 이름 최초 등록 시에만
+#   HTTP 스레드는 현재 참조를 읽어 직렬화만 수행
+#   GET /status  → {"ts", "engines": {이름: 스냅샷}}
+#   GET /healthz → 마지막 tick 경과 초
+# ============================================================
+
+class StatusSlot:
+    __slots__ = ("snap",)
+
+    def __init__(self):
+        self.snap: dict | None = None
+
+
+class StatusBoard:
+    def __init__(self):
+        self._slots: dict[str, StatusSlot] = {}
+        self._lock = threading.Lock()   # 슬롯 등록 직렬화 전용 (게시 / 읽기 경로에는 없음)
+
+    def slot(self, name: str) -> StatusSlot:
+        slot = self._slots.get(name)
+        if slot is None:
+            with self._lock:
+                slot = self._slots.get(name)
+                if slot is None:
+                    slot = StatusSlot()
+                    self._slots = {**self._slots, name: slot}   # copy-on-write 등록
+        return slot
+
+    def publish(self, name: str, snap: dict):
+        self.slot(name).snap = snap
+
+    def read(self) -> dict:
+        return {name: s.snap for name, s in self._slots.items() if s.snap is not None}
+
 
-def get_stage_target_pct(stage: int) -> float:
-    if stage <= 3: return CFG["TARGET_PROFIT_STAGE_1_3"]
-    if stage <= 5: return CFG["TARGET_PROFIT_STAGE_4_5"]
-    if stage <= 7: return CFG["TARGET_PROFIT_STAGE_6_7"]
-    if stage <= 9: return CFG["TARGET_PROFIT_STAGE_8_9"]
-    return CFG["TARGET_PROFIT_STAGE_10"]
+status_board = StatusBoard()
 
-def calc_exit_price(avg_price: float, stage: int) -> float:
-    return avg_price * (1 - CFG["FEE_PCT_ONEWAY"] * 2 - get_stage_target_pct(stage))
+
+class _StatusHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        snaps = status_board.read()
+        if self.path.startswith("/status"):
+            body = {"ts": _clock.time(), "engines": snaps}
+        elif self.path.startswith("/healthz"):
+            body = {name: round(_clock.time() - s.get("ts", 0), 1) for name, s in snaps.items()}
+        else:
+            self.send_error(404)
+            return
+        data = json.dumps(body, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass   # 폴링 요청으로 엔진 로그 오염 방지
+
+
+def start_status_server():
+    port = CFG["STATUS_HTTP_PORT"]
+    if not port:
+        return None
+    try:
+        server = ThreadingHTTPServer((CFG["STATUS_HTTP_HOST"], port), _StatusHandler)
+    except OSError as e:
+        log.warning(f"[STATUS] 엔드포인트 기동 실패 → 비활성: {e}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="status-http", daemon=True).start()
+    log.info(f"[STATUS] http://{CFG['STATUS_HTTP_HOST']}:{port}/status")
+    return server
 
 # ============================================================
-# 5분 완료봉 감지
+# 주문 실행 레인
+#   결정 스레드(_tick)는 의도만 넣고 다음 가격 감시로 복귀
+#   워커는 REST 호출만 수행 → 결과를 완료 큐에 적재
+#   엔진 상태 반영(on_done)은 결정 스레드의 drain() 에서만 → 엔진 상태는 단일 스레드 유지
+#   우선순위: EXIT > SL > REPRICE > ENTRY
+#     urgent 워커: EXIT/SL 전용 (일반 워커가 느린 호출에 묶여 있어도 즉시 실행)
+#     normal 워커: REPRICE 가 ENTRY 보다 먼저
+#   EXEC_ASYNC=False (shadow 페이퍼 등) → 제출 즉시 동기 실행 + on_done 즉시 호출
 # ============================================================
+EXEC_PRIO = {"EXIT": 0, "SL": 1, "REPRICE": 2, "ENTRY": 3}
+EXIT_RECONCILE_ATTEMPTS = 3   # 청산 후 잔량 조회 재시도 횟수
+
+
+class ExecutionLane:
+    def __init__(self, name: str):
+        self.name     = name
+        self._urgent  = queue.PriorityQueue(maxsize=CFG["EXEC_QUEUE_MAX"])
+        self._normal  = queue.PriorityQueue(maxsize=CFG["EXEC_QUEUE_MAX"])
+        self._done: queue.Queue = queue.Queue()
+        self._seq     = itertools.count()
+        self.inflight = Counter()   # 결정 스레드 전용 (submit / drain)
+        self._threads: list[threading.Thread] = []
+
+    def _start(self):
+        for label, q in (("urgent", self._urgent), ("normal", self._normal)):
+            t = threading.Thread(target=self._worker, args=(q,), name=f"exec-{label}:{self.name}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def submit(self, prio: str, fn, on_done, *args) -> bool:
+        if not CFG["EXEC_ASYNC"]:
+            on_done(fn(*args))
+            return True
+        if not self._threads:
+            self._start()
+        ctx  = (getattr(_account_ctx, "name", None), getattr(_account_ctx, "client", None),
+                getattr(_account_ctx, "cfg", None))
+        item = (EXEC_PRIO[prio], next(self._seq), prio, ctx, fn, args, on_done, _clock.time())
+        q    = self._urgent if EXEC_PRIO[prio] <= EXEC_PRIO["SL"] else self._normal
+        try:
+            q.put_nowait(item)
+        except queue.Full:
+            level = logging.CRITICAL if q is self._urgent else logging.ERROR
+            log.log(level, f"[EXEC] {prio} 큐 가득 참 ({q.qsize()}) → 제출 거부")
+            return False
+        self.inflight[prio] += 1
+        return True
 
-class BarTracker:
-    def __init__(self, symbol: str, interval: str):
-        self.symbol        = symbol
-        self.interval      = interval
-        self.last_ts       = None
-        self._cached_ts    = None
-        self._last_checked = 0.0
+    def _worker(self, q: queue.PriorityQueue):
+        while True:
+            _, _, prio, ctx, fn, args, on_done, t_enq = q.get()
+            wait_ms = (_clock.time() - t_enq) * 1000
+            if wait_ms > 1000:
+                log.warning(f"[EXEC] {prio} 대기 {wait_ms:.0f}ms")
+            with use_account(*ctx):
+                try:
+                    result, err = fn(*args), None
+                except Exception as e:
+                    result, err = None, e
+            self._done.put((prio, on_done, result, err))
+
+    def drain(self):
+        # 결정 스레드에서 tick 시작 시 호출: 완료된 작업의 상태 반영
+        while True:
+            try:
+                prio, on_done, result, err = self._done.get_nowait()
+            except queue.Empty:
+                return
+            self.inflight[prio] -= 1
+            if err is not None:
+                log.error(f"[EXEC] {prio} 작업 예외 → 실패로 처리: {err!r}", exc_info=err)
+            on_done(result)   # 실패 시 None → 각 핸들러가 실패 경로로 처리
+
+    def busy(self, prio: str) -> bool:
+        return self.inflight[prio] > 0
+
+    def depth(self) -> dict:
+        return {"urgent": self._urgent.qsize(), "normal": self._normal.qsize(),
+                "inflight": {k: v for k, v in self.inflight.items() if v}}
 
-    def new_bar_closed(self) -> bool:
-        now = time.time()
-        if now - self._last_checked >= CFG["BAR_CHECK_MIN_INTERVAL_SEC"]:
-            self._cached_ts    = get_closed_bar_open_ts(self.symbol, self.interval)
-            self._last_checked = now
-        ts = self._cached_ts
-        if ts is None:
-            return False
-        if self.last_ts is None:
-            self.last_ts = ts
-            return False
-        if ts > self.last_ts:
-            self.last_ts = ts
-            return True
-        return False
 
 # ============================================================
 # 상태 머신
 # ============================================================
 
 class RangeShortEngine:
-    def __init__(self):
+    def __init__(self, feed: MarketFeed | None = None, poll_feed: bool = True):
         self.state  = "WATCHING"
         self.symbol = CFG["SYMBOL"]
 
-        self.ladder_orders: list[dict] = []
+        self.book = LadderBook(CFG["LADDER_COUNT"])
         self.entry_price_base = None
 
         self.max_filled_stage = 0
-        self.exit_order_ids: list[int] = []
         self.last_exit_qty   = 0.0
         self.last_exit_price = 0.0
         self.last_stage      = 0
@@ -645,11 +3140,25 @@ class RangeShortEngine:
         # v8.9: deep trail 상태변수
         self.trail_entry_ref: float | None = None
 
-        self._filled_order_ids:   set[int] = set()
-        self._canceled_order_ids: set[int] = set()
-        self._last_position_amt            = 0.0
-
-        self._closing_in_progress: bool = False
+        self._last_position_amt = 0.0
+
+        self.ledger = PositionLedger()
+
+        self.name = getattr(_account_ctx, "name", None) or "main"
+        self.on_ladder_close = None   # (reason, max_stage, pnl) 콜백 — shadow 비교용
+        self.exec_lane = ExecutionLane(self.name)
+        self.screener: SymbolScreener | None = None
+        self._tick_count  = 0
+        self._tick_ms_sum = 0.0
+        self._tick_ms_max = 0.0
+        self._tick_ms_last = 0.0
+        self.ledger.on_fill = lambda oid, side, qty, price: journal.fill(self.ladder_id, oid, side, qty, price)
+        self._decision: dict = {"event": "STARTUP", "t": _clock.time(), "ref": 0.0, "t_origin": None}
+        self._plan: dict | None = None   # 형성 중 봉에서 미리 만든 거미줄 계획
+        self._ladder_pnl_base = 0.0
+
+        self._closing_in_progress: bool = False   # 시장가 청산(TP1 / 최종) 결과 대기 중
+        self._sl_dirty:            bool = False   # SL 재설정 필요 (진행 중 재설정 / 실패) → 다음 tick
         self._last_filled_check_ts: int  = 0
 
         self.bars_after_deep  = 0
@@ -658,33 +3167,110 @@ class RangeShortEngine:
 
         self.last_trigger_bar_ts: int = 0
 
+        # clientOrderId: 거미줄 단위 식별자 + (kind, stage) 별 시도 번호
+        # 기본값은 기동 시각 → 재기동 간 cid 충돌 방지 (sync 에서 기존 거미줄 id 로 복구)
+        self.ladder_id: str = f"{int(_clock.time()):x}"
+        self._cid_attempts: dict[tuple[str, int], int] = {}
+
         self.avg_full:    float | None = None
         self.sl_price:    float | None = None
         self.sl_order_id: int   | None = None
 
-        self.bar_tracker = BarTracker(self.symbol, CFG["INTERVAL_EXEC"])
-
-        min_iv = CFG["BAR_CHECK_MIN_INTERVAL_SEC"]
-        self._htf_cache     = BarCache(min_interval_sec=min_iv)
-        self._trigger_cache = BarCache(min_interval_sec=min_iv)
+        # poll_feed=False → 팬아웃 러너가 공용 feed 를 대신 poll
+        self._poll_feed = poll_feed
+        self.feed       = feed or MarketFeed(self.symbol)
 
         load_symbol_filters(self.symbol)
 
+    # --------------------------------------------------------
+    # clientOrderId 발급
+    # --------------------------------------------------------
+    def _next_cid(self, kind: str, stage: int = 0, intended: float | None = None) -> str:
+        # intended=None → 현재 결정의 기준가 (시장가 주문)
+        attempt = self._cid_attempts.get((kind, stage), 0)
+        self._cid_attempts[(kind, stage)] = attempt + 1
+        cid = make_client_order_id(self.ladder_id, kind, stage, attempt)
+        exec_telemetry.intent(self.ladder_id, cid, kind, stage, self._decision, intended)
+        return cid
+
+    def _decide(self, event: str, ref_price: float, t_origin: float | None = None):
+        self._decision = {"event": event, "t": _clock.time(), "ref": ref_price, "t_origin": t_origin}
+
+    # --------------------------------------------------------
+    # 포지션 원장
+    # --------------------------------------------------------
+    def _track(self, order: dict | None):
+        if order:
+            journal.order(self.ladder_id, order)
+            self.ledger.apply_order(order)
+            exec_telemetry.on_order(order)
+
+    def _set_stage(self, stage: int):
+        journal.stage(self.ladder_id, self.max_filled_stage, stage)
+        flight.record("stage", (self.name, self.ladder_id, self.max_filled_stage, stage))
+        self.max_filled_stage = stage
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    @state.setter
+    def state(self, value: str):
+        prev = getattr(self, "_state", None)
+        if value != prev:
+            flight.record("state", (getattr(self, "name", None), prev, value))
+        self._state = value
+
+    def _journal_close(self, reason: str):
+        pnl = self.ledger.realized_pnl - self._ladder_pnl_base
+        journal.ladder_close(self.ladder_id, reason, self.max_filled_stage, pnl)
+        if not self.name.startswith("shadow:"):
+            exec_telemetry.log_report()
+        if self.on_ladder_close is not None:
+            self.on_ladder_close(reason, self.max_filled_stage, pnl)
+
+    def _poll_fills(self):
+        # 감시 주문이 있을 때만: 미체결 목록 1회 + 목록에서 사라진 주문만 개별 조회
+        if not self.ledger.watching:
+            return
+        try:
+            open_by_id = {int(o["orderId"]): o for o in client.get_orders(symbol=self.symbol)}
+        except ReadError as e:
+            log.warning(f"[LEDGER] 미체결 조회 실패 → positionRisk 대조 예약: {e}")
+            self.ledger.dirty = True
+            return
+        for oid in list(self.ledger.watching):
+            order = open_by_id.get(oid)
+            if order is None:
+                try:
+                    order = client.query_order(symbol=self.symbol, orderId=oid)
+                except ReadError as e:
+                    log.warning(f"[LEDGER] query_order 실패 ({oid}): {e}")
+                    self.ledger.dirty = True
+                    continue
+            self.ledger.apply_order(order)
+            exec_telemetry.on_order(order)
+            if order.get("status") == "FILLED":
+                self.book.mark_filled(oid)
+
+    def _position(self) -> dict:
+        if self.ledger.dirty or _clock.time() - self.ledger.verified_at >= CFG["LEDGER_VERIFY_SEC"]:
+            self.ledger.reconcile(get_position(self.symbol))
+        return self.ledger.position()
+
     # --------------------------------------------------------
     # 안전 취소
     # --------------------------------------------------------
     def _safe_cancel(self, order_id: int):
-        if order_id in self._filled_order_ids:
-            return
-        if order_id in self._canceled_order_ids:
+        if self.book.is_done(order_id):
             return
         success = cancel_order(self.symbol, order_id)
         if success:
-            self._canceled_order_ids.add(order_id)
+            self.book.mark_canceled(order_id)
 
     def _cancel_ladder_orders(self):
-        for o in self.ladder_orders:
-            self._safe_cancel(o["order_id"])
+        for oid in self.book.order_ids():
+            self._safe_cancel(oid)
 
     def cancel_buy_exit_orders(self, exit_order_ids: list):
         for oid in exit_order_ids:
@@ -697,56 +3283,64 @@ class RangeShortEngine:
         if self.sl_price is None:
             log.error("[SL RESET] sl_price 없음 → 재설정 불가")
             return
+        if self.exec_lane.busy("SL"):
+            self._sl_dirty = True   # 진행 중 재설정 완료 후 최신 수량으로 다시
+            return
+        self._sl_dirty = False
 
-        if self.sl_order_id is not None:
-            self._safe_cancel(self.sl_order_id)
-            self.sl_order_id = None
-
-        time.sleep(0.05)
-
+        # 취소 / 재주문은 긴급 SL 레인에서 → 결정 스레드는 대기 없이 복귀
+        # 기존 sl_order_id 는 취소 확인(_on_sl_replaced)까지 유지 → 그 사이 청산도 취소 대상에 포함
         stop_price  = self.sl_price
         limit_price = self.sl_price * (1 + CFG["SL_TICK_BUFFER"])
-
-        order = place_stop_limit_sl(self.symbol, stop_price, limit_price, abs(new_qty))
-
-        if order is None:
-            log.warning("[SL RESET] 1차 실패 → 0.1초 후 재시도")
-            time.sleep(0.1)
-            order = place_stop_limit_sl(self.symbol, stop_price, limit_price, abs(new_qty))
-
+        qty         = abs(new_qty)
+        self._decide("SL", stop_price)
+        cid         = self._next_cid("S", intended=stop_price)
+        old_id      = self.sl_order_id
+        if old_id is not None and self.book.is_done(old_id):
+            old_id = None
+        ladder_id   = self.ladder_id
+        on_done     = lambda res: self._on_sl_replaced(ladder_id, old_id, res, stop_price, limit_price, qty)
+        if not self.exec_lane.submit("SL", replace_sl_order, on_done,
+                                     self.symbol, old_id, stop_price, limit_price, qty, cid):
+            on_done(None)
+
+    def _on_sl_replaced(self, ladder_id: str, old_id: int | None, res: tuple | None,
+                        stop_price: float, limit_price: float, qty: float):
+        canceled, order = res or (False, None)
+        if ladder_id != self.ladder_id or self.state not in ("LADDER_ACTIVE", "POSITION_HOLD"):
+            if order:
+                # 결과 대기 중 청산 완료 → 늦게 접수된 SL 은 즉시 취소
+                journal.order(ladder_id, order)
+                log.warning(f"[EXEC] 종료된 거미줄({ladder_id}) SL 접수 → 취소 | orderId={order['orderId']}")
+                self.exec_lane.submit("EXIT", cancel_order, lambda ok: None,
+                                      order.get("symbol", self.symbol), int(order["orderId"]))
+            return
+        if canceled and old_id is not None:
+            self.book.mark_canceled(old_id)
+            if self.sl_order_id == old_id:
+                self.sl_order_id = None
+        self._track(order)
         if order:
             self.sl_order_id = int(order["orderId"])
             log.info(
                 f"[SL ORDER] stopPrice={fmt_price(stop_price, self.symbol)} "
                 f"price={fmt_price(limit_price, self.symbol)} "
-                f"qty={fmt_qty(abs(new_qty), self.symbol)} reduceOnly=True"
+                f"qty={fmt_qty(qty, self.symbol)} reduceOnly=True"
             )
         else:
-            log.critical("[SL RESET FAIL] 재시도 실패 → SL 없는 상태, 엔진 중단")
-            raise RuntimeError("SL NOT PLACED")
+            log.critical("[SL RESET FAIL] 재시도 실패 → SL 없는 상태, 다음 tick 재설정")
+            self._sl_dirty = True
 
     # --------------------------------------------------------
     # FILLED 캐시 기반 체결 단계 카운트
     # --------------------------------------------------------
     def _count_filled_stages(self) -> int:
-        for o in self.ladder_orders:
-            oid = o["order_id"]
-            if oid in self._filled_order_ids:
-                continue
+        for oid in self.book.unfilled_ids():
+            if self.ledger.is_open(oid):
+                continue  # 이번 poll 에서 미체결 확인됨 → 조회 생략
             if query_order_status(self.symbol, oid) == "FILLED":
-                self._filled_order_ids.add(oid)
-        return sum(1 for o in self.ladder_orders
-                   if o["order_id"] in self._filled_order_ids)
-
-    # --------------------------------------------------------
-    # pending SELL 잔존 조회
-    # --------------------------------------------------------
-    def _get_pending_sell(self) -> list:
-        return [
-            o for o in self.ladder_orders
-            if o["order_id"] not in self._filled_order_ids
-            and o["order_id"] not in self._canceled_order_ids
-        ]
+                self.book.mark_filled(oid)
+        return self.book.filled_count()
 
     # --------------------------------------------------------
     # 재시작 동기화
@@ -755,6 +3349,10 @@ class RangeShortEngine:
         pos         = get_position(self.symbol)
         open_orders = get_open_orders(self.symbol)
 
+        self.ledger.reconcile(pos)
+        for o in open_orders:
+            self.ledger.apply_order(o, baseline=True)
+
         sell_orders = [o for o in open_orders if o["side"] == "SELL" and o["status"] == "NEW"]
         sell_sorted = sorted(sell_orders, key=lambda x: float(x["price"]))
 
@@ -772,6 +3370,13 @@ class RangeShortEngine:
             and o.get("type") in ("STOP", "STOP_MARKET", "STOP_LIMIT")
         ]
 
+        for o in sell_sorted + buy_normal + sl_orders:
+            restored = parse_ladder_id(o.get("clientOrderId", ""))
+            if restored:
+                self.ladder_id = restored
+                log.info(f"[SYNC] ladder_id 복구: {restored}")
+                break
+
         log.info(f"[SYNC] 전체 주문 목록:")
         for o in open_orders:
             log.info(
@@ -785,16 +3390,11 @@ class RangeShortEngine:
             self.state = "POSITION_HOLD"
 
             for i, o in enumerate(sell_sorted):
-                self.ladder_orders.append({
-                    "stage":    i + 1,
-                    "order_id": int(o["orderId"]),
-                    "price":    float(o["price"]),
-                    "qty":      float(o["origQty"]),
-                })
+                self.book.add(i + 1, int(o["orderId"]), float(o["price"]), float(o["origQty"]))
             self.entry_price_base   = pos["avg_price"]
             self._last_position_amt = pos["amt"]
 
-            self.exit_order_ids = [int(o["orderId"]) for o in buy_normal]
+            self.book.exit_ids = [int(o["orderId"]) for o in buy_normal]
 
             self.max_filled_stage = self._count_filled_stages()
             self.last_stage       = self.max_filled_stage
@@ -826,12 +3426,7 @@ class RangeShortEngine:
             log.info("[SYNC] 포지션 없음 + SELL 주문 존재 → LADDER_ACTIVE 복구")
             self.state = "LADDER_ACTIVE"
             for i, o in enumerate(sell_sorted):
-                self.ladder_orders.append({
-                    "stage":    i + 1,
-                    "order_id": int(o["orderId"]),
-                    "price":    float(o["price"]),
-                    "qty":      float(o["origQty"]),
-                })
+                self.book.add(i + 1, int(o["orderId"]), float(o["price"]), float(o["origQty"]))
             self.entry_price_base = float(sell_sorted[0]["price"])
             log.info(f"[SYNC] entry_price_base = {self.entry_price_base:.4f} (min SELL price)")
 
@@ -859,31 +3454,152 @@ class RangeShortEngine:
                  f"DROP: {CFG['DEEP_TRAIL_ACTIVATE_DROP_PCT']*100:.1f}% | "
                  f"REBOUND: {CFG['TRAILING_REBOUND_STAGE_DEEP']*100:.1f}%")
         log.info("=" * 60)
+        profiler = SamplingProfiler({threading.get_ident()})
+        profiler.install_signal()
+        start_status_server()
+        if CFG["SCREENER_ENABLE"]:
+            if type(self.feed) is MarketFeed:
+                self.screener = SymbolScreener()
+            else:
+                log.warning("[SCREENER] 외부 feed(버스) 사용 중 → 스크리너 비활성")
+        self._startup()
+        shadow = None
+        if CFG["SHADOW_VARIANTS"]:
+            if self.screener is not None:
+                # 페이퍼 거래소는 CFG["SYMBOL"] 고정 → 스크리너가 심볼을 바꾸면 다른 심볼 가격/트리거가 섞임
+                log.warning("[SHADOW] 스크리너 사용 중 (심볼 전환) → shadow 비활성")
+            else:
+                shadow = ShadowRunner({self.name: self}, CFG["SHADOW_VARIANTS"])
+        while True:
+            try:
+                profiler.poll_control()
+                changed = config_reloader.poll(idle=self._is_idle())
+                if changed:
+                    self._on_config_change(changed)
+                client.maintain()
+                self._timed_tick()
+                if shadow is not None:
+                    shadow.submit(self.feed)
+            except Exception as e:
+                log.error(f"루프 오류: {e}", exc_info=True)
+            _clock.sleep(self.feed.sleep_hint())
+
+    def _screen(self) -> bool:
+        # 현재 심볼이 후보면 기존 경로로 확정, 아니면 1순위 후보로 전환 → 다음 tick 에 단일 심볼 재평가
+        picks = self.screener.scan()
+        if not picks or self.symbol in picks:
+            return False
+        self._switch_symbol(picks[0])
+        set_margin_type(self.symbol, CFG["MARGIN_TYPE"])
+        set_leverage(self.symbol, CFG["LEVERAGE"])
+        return True
+
+    def _switch_symbol(self, symbol: str):
+        log.info(f"[SCREENER] 대상 심볼 전환: {self.symbol} → {symbol}")
+        self.symbol = symbol
+        self.feed   = MarketFeed(symbol)
+        self._plan  = None
+        load_symbol_filters(symbol)
+
+    def _is_idle(self) -> bool:
+        return self.state in ("WATCHING", "COOLDOWN") and not has_short_position(self.ledger.position())
+
+    def _on_config_change(self, changed: set):
+        self._plan = None
+        if changed & {"EMA_TRIGGER_LEN", "HTF_FILTER_EMA_LEN", "HTF_FILTER_ENABLE"}:
+            self.feed.invalidate()
+        if "MARGIN_TYPE" in changed:
+            set_margin_type(self.symbol, CFG["MARGIN_TYPE"])
+        if "LEVERAGE" in changed:
+            set_leverage(self.symbol, CFG["LEVERAGE"])
+
+    def _startup(self):
+        if self.screener is not None:
+            held = self.screener.held_short()
+            if held and held != self.symbol:
+                log.info(f"[SCREENER] 보유 포지션 심볼로 동기화: {held}")
+                self._switch_symbol(held)
         self._sync_on_start()
         set_margin_type(self.symbol, CFG["MARGIN_TYPE"])
         set_leverage(self.symbol, CFG["LEVERAGE"])
 
-        _, bar_ts = calc_ema15_trigger(self.symbol, self._trigger_cache)
+        _, bar_ts = self.feed.trigger()
         self.last_trigger_bar_ts = bar_ts
         log.info(f"[INIT] 시작 봉 ts 세팅 완료: last_trigger_bar_ts={bar_ts}")
-        while True:
+
+    # --------------------------------------------------------
+    # 틱 + 상태 게시
+    # --------------------------------------------------------
+    def _timed_tick(self):
+        t0 = _clock.time()
+        try:
+            self._tick()
+        finally:
+            ms = (_clock.time() - t0) * 1000
+            self._tick_count  += 1
+            self._tick_ms_sum += ms
+            self._tick_ms_max  = max(self._tick_ms_max, ms)
+            self._tick_ms_last = ms
             try:
-                self._tick()
+                self._publish_status()
             except Exception as e:
-                log.error(f"루프 오류: {e}", exc_info=True)
-            time.sleep(CFG["POLL_INTERVAL_SEC"])
+                # 상태 게시 실패가 tick 예외를 덮지 않도록 여기서 종결
+                log.error(f"[STATUS] 상태 게시 오류: {e}", exc_info=True)
+
+    def _publish_status(self):
+        req = {
+            kind: {"count": n, "avg_ms": round(total / n, 1) if n else 0.0,
+                   "max_ms": round(peak, 1), "errors": err}
+            for kind, (n, total, peak, err) in dict(client.stats).items()
+        }
+        snap = {
+            "ts":               _clock.time(),
+            "state":            self.state,
+            "symbol":           self.symbol,
+            "ladder_id":        self.ladder_id,
+            "price":            self.feed.current_price,
+            "max_filled_stage": self.max_filled_stage,
+            "tp1_done":         self.tp1_done,
+            "trail_low":        self.trail_low,
+            "trail_entry_ref":  self.trail_entry_ref,
+            "avg_full":         self.avg_full,
+            "sl_price":         self.sl_price,
+            "sl_order_id":      self.sl_order_id,
+            "exit_order_ids":   list(self.book.exit_ids),
+            "pending_sell":     self.book.pending_count(),
+            "ladder":           self.book.snapshot(),
+            "cooldown_bars":    self.cooldown_bars,
+            "no_fill_bars":     self.no_fill_bars,
+            "exec_lane":        self.exec_lane.depth(),
+            "position":         {**self.ledger.position(), "realized_pnl": self.ledger.realized_pnl},
+            "tick": {
+                "count":   self._tick_count,
+                "last_ms": round(self._tick_ms_last, 1),
+                "avg_ms":  round(self._tick_ms_sum / self._tick_count, 1),
+                "max_ms":  round(self._tick_ms_max, 1),
+            },
+            "requests": req,
+            "hedges":   {kind: {"sent": h, "won": w, "deadline_exceeded": m}
+                         for kind, (h, w, m) in dict(client.hedges).items()},
+            "klines":   kline_feed.stats(),
+        }
+        status_board.publish(self.name, snap)
+        flight.record("tick", snap)
 
     # --------------------------------------------------------
     # 틱
     # --------------------------------------------------------
     def _tick(self):
         symbol = self.symbol
-        ticker = client.ticker_price(symbol=symbol)
-        current_price = float(ticker["price"])
+        if self._poll_feed:
+            self.feed.poll()
+        current_price = self.feed.current_price
 
-        pos     = get_position(symbol)
+        self.exec_lane.drain()
+        self._poll_fills()
+        pos     = self._position()
         has_pos = has_short_position(pos)
-        new_bar = self.bar_tracker.new_bar_closed()
+        new_bar = self.feed.new_bar
 
         # ── COOLDOWN ──
         if self.state == "COOLDOWN":
@@ -902,10 +3618,13 @@ class RangeShortEngine:
                 self.state = "POSITION_HOLD"
                 return
 
-            if not check_4h_short_filter(symbol, self._htf_cache):
+            if self.screener is not None and new_bar and self._screen():
+                return
+
+            if not self.feed.htf_ok():
                 return
 
-            triggered, bar_ts = calc_ema15_trigger(symbol, self._trigger_cache)
+            triggered, bar_ts = self.feed.trigger()
 
             if triggered and bar_ts == self.last_trigger_bar_ts:
                 log.debug(f"동일 5M 봉 재트리거 차단: ts={bar_ts}")
@@ -913,7 +3632,18 @@ class RangeShortEngine:
 
             if triggered:
                 self.last_trigger_bar_ts = bar_ts
+                bar_close_ms = bar_ts + INTERVAL_SEC[CFG["INTERVAL_TRIGGER"]] * 1000
+                self._decide("TRIGGER", current_price, (bar_close_ms - client.time_offset_ms) / 1000)
                 self._deploy_ladder(current_price)
+                return
+
+            # 다음 마감에 트리거 가능 → 현재가 기준 거미줄 계획 미리 준비
+            arm = self.feed.trigger_arm
+            if arm.armed and arm.base_ts == bar_ts:
+                if not ladder_plan_fits(self._plan, current_price):
+                    self._plan = build_ladder_plan(self.symbol, current_price)
+            else:
+                self._plan = None
             return
 
         # ── LADDER_ACTIVE ──
@@ -942,10 +3672,19 @@ class RangeShortEngine:
 
         # ── POSITION_HOLD ──
         if self.state == "POSITION_HOLD":
+            if self._closing_in_progress:
+                return   # 시장가 청산 결과 대기 (EXIT 레인) → 완료 콜백에서 종료 / 재시도 결정
+
             if not has_pos:
                 log.info("포지션 청산 감지 → 쿨다운")
-                self.cancel_buy_exit_orders(self.exit_order_ids)
-                self.exit_order_ids = []
+                if any(self.ledger.status(oid) == "FILLED" for oid in self.book.exit_ids):
+                    self._journal_close("LIMIT_EXIT")
+                elif self.sl_order_id is not None and self.ledger.status(self.sl_order_id) == "FILLED":
+                    self._journal_close("EXCHANGE_SL")
+                else:
+                    self._journal_close("EXTERNAL")
+                self.cancel_buy_exit_orders(self.book.exit_ids)
+                self.book.exit_ids = []
                 self._cancel_ladder_orders()
                 if self.sl_order_id is not None:
                     self._safe_cancel(self.sl_order_id)
@@ -957,7 +3696,7 @@ class RangeShortEngine:
             position_qty = pos["amt"]
 
             amt_changed = abs(position_qty - self._last_position_amt) > 0.0001
-            cur_bar_ts  = self.bar_tracker.last_ts or 0
+            cur_bar_ts  = self.feed.bar_tracker.last_ts or 0
             need_check  = (
                 amt_changed
                 or (new_bar and cur_bar_ts != self._last_filled_check_ts)
@@ -967,14 +3706,13 @@ class RangeShortEngine:
                 filled = self._count_filled_stages()
                 if filled > self.max_filled_stage:
                     log.info(f"체결 단계 갱신: {self.max_filled_stage} → {filled}")
-                    self.max_filled_stage = filled
+                    self._set_stage(filled)
                 self._last_position_amt    = position_qty
                 self._last_filled_check_ts = cur_bar_ts
 
-                pending_sell = self._get_pending_sell()
                 log.debug(
                     f"[POSITION STATUS] "
-                    f"pending_sell_count={len(pending_sell)} | "
+                    f"pending_sell_count={self.book.pending_count()} | "
                     f"max_filled_stage={self.max_filled_stage} | "
                     f"sl_order_id={self.sl_order_id} | "
                     f"sl_price={self.sl_price}"
@@ -984,6 +3722,9 @@ class RangeShortEngine:
                         and self.max_filled_stage >= CFG["LADDER_COUNT"]):
                     self._reset_sl_order(new_qty=position_qty)
 
+            if self._sl_dirty and not self.exec_lane.busy("SL"):
+                self._reset_sl_order(new_qty=position_qty)
+
             log.debug(
                 f"HOLD | avg={avg_price:.4f} | price={current_price:.4f} | "
                 f"stage={self.max_filled_stage} | qty={position_qty:.4f} | "
@@ -1001,6 +3742,7 @@ class RangeShortEngine:
                 log.warning(
                     f"[HARD SL] engine-side 발동 | 10단 완료 후 손실 {pnl_pct*100:.2f}%"
                 )
+                self._decide("HARD_SL", current_price)
                 self._final_close(symbol, position_qty, "HARD_SL")
                 return
 
@@ -1010,11 +3752,13 @@ class RangeShortEngine:
                     self.bars_after_deep += 1
                 if self.bars_after_deep >= CFG["TIMEOUT_BARS_AFTER_DEEP"]:
                     log.warning(f"TIMEOUT 발동 | {self.bars_after_deep}봉")
+                    self._decide("TIMEOUT", current_price)
                     self._final_close(symbol, position_qty, "TIMEOUT")
                     return
 
             # 3. TP1
             if not self.tp1_done and pnl_pct >= CFG["TP1_PROFIT_PCT"]:
+                self._decide("TP1", current_price)
                 self._handle_tp1(symbol, position_qty, current_price)
                 return
 
@@ -1024,11 +3768,7 @@ class RangeShortEngine:
                 # trail_entry_ref = stage8 주문가 기준 (고정)
                 # trail_low       = 현재가 기준 시작 (sync 복구 왜곡 방지)
                 if self.trail_entry_ref is None:
-                    deep_stage_order = next(
-                        (o for o in self.ladder_orders
-                         if o["stage"] == CFG["STAGE_TRAILING_FROM"]), None
-                    )
-                    ref_price = deep_stage_order["price"] if deep_stage_order else current_price
+                    ref_price = self.book.price_of(CFG["STAGE_TRAILING_FROM"]) or current_price
                     self.trail_entry_ref = ref_price
                     self.trail_low       = current_price  # 초기 저점은 현재가 기준 (sync 복구 왜곡 방지)
                     log.info(
@@ -1057,6 +3797,7 @@ class RangeShortEngine:
                 # 0.8% 이상 하락 후 0.6% 반등 시 탈출 (노이즈 보정)
                 if drop_from_entry >= CFG["DEEP_TRAIL_ACTIVATE_DROP_PCT"]:
                     if current_price >= self.trail_low * (1 + CFG["TRAILING_REBOUND_STAGE_DEEP"]):
+                        self._decide("DEEP_TRAIL", current_price)
                         log.info(
                             f"[DEEP TRAIL EXIT] "
                             f"entry_ref={self.trail_entry_ref:.4f} | "
@@ -1078,6 +3819,7 @@ class RangeShortEngine:
                 self.trail_low = min(self.trail_low, current_price)
 
                 if current_price >= self.trail_low * (1 + CFG["TRAILING_REBOUND_PCT"]):
+                    self._decide("TRAIL", current_price)
                     log.info(
                         f"[TRAIL EXIT] 저점={self.trail_low:.4f} 대비 +0.5% 반등 "
                         f"(current={current_price:.4f})"
@@ -1096,18 +3838,34 @@ class RangeShortEngine:
         partial_qty = abs(position_qty) * CFG["TP1_PARTIAL_RATIO"]
         log.info(f"[EXIT/SL] BUY TP1 MARKET 50% 부분청산 시도 qty={partial_qty:.4f}")
 
-        success = market_close_short(symbol, partial_qty)
+        # 시장가 + (체결 미확정 시) 잔량 조회는 EXIT 레인에서 → 결과는 _on_tp1_closed
+        self._closing_in_progress = True
+        ladder_id = self.ladder_id
+        on_done   = lambda res: self._on_tp1_closed(ladder_id, res)
+        if not self.exec_lane.submit("EXIT", close_short_and_read, on_done,
+                                     symbol, partial_qty, self._next_cid("T")):
+            on_done(None)
+
+    def _on_tp1_closed(self, ladder_id: str, res: tuple | None):
+        order, pos = res or (None, None)
+        self._track(order)
+        if ladder_id != self.ladder_id or self.state != "POSITION_HOLD":
+            return
+        self._closing_in_progress = False
 
-        if success:
-            time.sleep(0.2)
-            pos = get_position(symbol)
+        if order:
+            if pos is not None:
+                # RESULT 응답에 체결 미확정 → 워커가 조회한 잔량으로 대조
+                self.ledger.reconcile(pos)
+            elif self.ledger.status(int(order["orderId"])) != "FILLED":
+                self.ledger.dirty = True   # 잔량 조회 실패 → 다음 poll 에서 재대조
+            pos = self.ledger.position()
 
-            self.cancel_buy_exit_orders(self.exit_order_ids)
-            self.exit_order_ids = []
+            self.cancel_buy_exit_orders(self.book.exit_ids)
+            self.book.exit_ids = []
 
             self._cancel_ladder_orders()
-            self.ladder_orders     = []
-            self._filled_order_ids = set()
+            self.book.clear_ladder()
 
             self._last_position_amt = pos["amt"]
             self.tp1_done  = True
@@ -1129,27 +3887,77 @@ class RangeShortEngine:
     def _final_close(self, symbol: str, position_qty: float, reason: str):
         log.info(f"[FINAL CLOSE] 사유={reason} | qty={position_qty:.4f}")
         self._closing_in_progress = True
+        if self._decision["event"] != reason:
+            self._decide(reason, self.feed.current_price)   # 조건 표시 없이 진입 → 진입 시각이 결정 시각
+
+        # 빠른 경로: reduceOnly 시장가 청산을 긴급 EXIT 레인에 먼저 보내고(≈ 1 RTT), 접수 확인 후에만
+        # 미체결 전체 취소(거미줄 SELL / EXIT BUY / SL)를 같은 레인에 넣음
+        #   → 청산 실패 시 SL / EXIT / 거미줄이 그대로 남아 POSITION_HOLD 보호 유지
+        # 청산과 취소 사이에 체결된 거미줄 SELL 잔량은 취소 완료 후 _reconcile_after_exit 에서 정리
+        ladder_id = self.ladder_id
+        on_done   = lambda order: self._on_final_closed(ladder_id, reason, order)
+        if not self.exec_lane.submit("EXIT", market_close_short, on_done,
+                                     symbol, abs(position_qty), self._next_cid("C")):
+            on_done(None)
+
+    def _on_final_closed(self, ladder_id: str, reason: str, order: dict | None):
+        self._track(order)
+        if ladder_id != self.ladder_id or self.state != "POSITION_HOLD":
+            return
+        self._closing_in_progress = False
 
-        self.cancel_buy_exit_orders(self.exit_order_ids)
-        self.exit_order_ids = []
-        self._cancel_ladder_orders()
-
-        if self.sl_order_id is not None:
-            self._safe_cancel(self.sl_order_id)
-            self.sl_order_id = None
-
-        success = market_close_short(symbol, abs(position_qty))
-
-        if success:
-            self._closing_in_progress = False
+        if order:
+            open_ids = self.book.pending_ids() + list(self.book.exit_ids)
+            if self.sl_order_id is not None:
+                open_ids.append(self.sl_order_id)
+            self.exec_lane.submit("EXIT", cancel_all_orders,
+                                  lambda ok: self._on_exit_cancelled(ladder_id, open_ids, ok), self.symbol)
+            self._journal_close(reason)
             self._start_cooldown()
         else:
-            self._closing_in_progress = False  # 다음 tick 재시도 허용
             log.error(
                 f"[FINAL CLOSE] 청산 실패 → POSITION_HOLD 유지, 다음 tick 재시도 "
                 f"(사유={reason})"
             )
 
+    def _on_exit_cancelled(self, ladder_id: str, open_ids: list, ok: bool | None):
+        if not ok:
+            log.warning(f"[FINAL CLOSE] 전체 취소 실패 → 개별 취소 {len(open_ids)}건")
+            self.exec_lane.submit("EXIT", cancel_orders,
+                                  lambda ids: self._reconcile_after_exit(ladder_id), self.symbol, open_ids)
+            return
+        self._reconcile_after_exit(ladder_id)
+
+    def _reconcile_after_exit(self, ladder_id: str, attempt: int = 1):
+        # 새 거미줄이 시작됐으면 해당 경로가 처리
+        if ladder_id != self.ladder_id or self.state not in ("COOLDOWN", "WATCHING"):
+            return
+        # 잔량 조회는 EXIT 레인에서 → 조회 지연 / 예외가 결정 스레드(drain)로 번지지 않음
+        self.exec_lane.submit("EXIT", read_position,
+                              lambda pos: self._on_exit_position(ladder_id, pos, attempt), self.symbol)
+
+    def _on_exit_position(self, ladder_id: str, pos: dict | None, attempt: int):
+        if ladder_id != self.ladder_id or self.state not in ("COOLDOWN", "WATCHING"):
+            return
+        if pos is None:
+            self.ledger.dirty = True
+            if attempt < EXIT_RECONCILE_ATTEMPTS:
+                log.warning(f"[FINAL CLOSE] 잔량 조회 실패 → 재조회 ({attempt}/{EXIT_RECONCILE_ATTEMPTS})")
+                self._reconcile_after_exit(ladder_id, attempt + 1)
+            else:
+                log.error(f"[FINAL CLOSE] 잔량 조회 {attempt}회 실패 → 잔량 미확인, 원장 재대조 예약")
+            return
+        self.ledger.reconcile(pos)
+        if not has_short_position(pos):
+            return
+        log.warning(f"[FINAL CLOSE] 취소 전 체결된 잔량 감지 amt={pos['amt']:.4f} → 시장가 정리")
+        self.exec_lane.submit("EXIT", market_close_short, self._on_residual_closed,
+                              self.symbol, abs(pos["amt"]), self._next_cid("C"))
+
+    def _on_residual_closed(self, order: dict | None):
+        self._track(order)
+        self.ledger.dirty = True
+
     # --------------------------------------------------------
     # 거미줄 배치
     # --------------------------------------------------------
@@ -1158,41 +3966,37 @@ class RangeShortEngine:
             log.warning(f"_deploy_ladder 차단: state={self.state} (WATCHING 아님)")
             return
 
-        symbol  = self.symbol
-        count   = CFG["LADDER_COUNT"]
-        gap     = CFG["LADDER_GAP_PCT"]
-        weights = normalize_weights(CFG["SIZE_WEIGHTS"], count)
-        prices  = build_ladder_prices(current_price, count, gap)
-        qtys    = calc_ladder_quantities_per_stage(
-            CFG["TOTAL_CAPITAL_USDT"], CFG["LEVERAGE"], weights, prices, current_price
-        )
+        symbol = self.symbol
+        count  = CFG["LADDER_COUNT"]
+        gap    = CFG["LADDER_GAP_PCT"]
 
-        # CAPITAL CHECK
-        effective_capital  = CFG["TOTAL_CAPITAL_USDT"] * CFG["MAX_CAPITAL_RATIO"] * CFG["LEVERAGE"]
-        total_planned      = current_price * qtys[0] + sum(prices[i] * qtys[i] for i in range(1, count))
-        ratio              = total_planned / effective_capital
+        # 형성 중 봉에서 준비한 계획 재사용 (진입가 허용 오차 이내), 아니면 지금 계산
+        plan = self._plan
+        if not ladder_plan_fits(plan, current_price):
+            plan = build_ladder_plan(symbol, current_price)
+        self._plan = None
+        qtys = plan["qtys"]
 
+        # CAPITAL CHECK / 숏 안전밸브
         log.info(
-            f"[CAPITAL CHECK] planned={total_planned:.2f} effective={effective_capital:.2f} "
-            f"ratio={ratio:.3f}"
+            f"[CAPITAL CHECK] planned={plan['planned']:.2f} effective={plan['effective']:.2f} "
+            f"ratio={plan['ratio']:.3f}"
         )
-        if not (CFG["CAPITAL_CHECK_MIN_RATIO"] <= ratio <= CFG["CAPITAL_CHECK_MAX_RATIO"]):
-            log.error(f"[CAPITAL CHECK] 범위 이탈 ratio={ratio:.3f} → 배치 중단")
+        if plan["error"]:
+            log.error(plan["error"])
             return
 
-        # 숏 안전밸브
-        for i in range(1, count):
-            if prices[i] < current_price * 0.999:
-                log.error(f"[SHORT SAFETY] stage={i+1} price={prices[i]:.4f} → 배치 중단")
-                return
-
         cancel_all_orders(symbol)
         self._reset_ladder()
         self.entry_price_base = current_price
+        self.ladder_id        = f"{self.last_trigger_bar_ts // 1000:x}"
+        self._cid_attempts    = {}
 
-        all_prices    = [current_price] + prices[1:]
-        self.avg_full = calc_avg_full(all_prices, qtys)
-        self.sl_price = self.avg_full * (1 + CFG["HARD_SL_PCT"])
+        self.avg_full = plan["avg_full"]
+        self.sl_price = plan["sl_price"]
+
+        self._ladder_pnl_base = self.ledger.realized_pnl
+        journal.ladder_open(self.ladder_id, symbol, current_price, self.avg_full, self.sl_price)
 
         log.info(
             f"[EXPECTED FULL AVG] avg_full={self.avg_full:.6f} "
@@ -1203,44 +4007,21 @@ class RangeShortEngine:
         success   = 0
         order_1st = None
 
-        order_1st = place_market_short(symbol, qtys[0])
+        order_1st = place_market_short(symbol, qtys[0], self._next_cid("E", 1))
+        self._track(order_1st)
         if order_1st:
-            self.ladder_orders.append({
-                "stage":    1,
-                "order_id": int(order_1st["orderId"]),
-                "price":    current_price,
-                "qty":      qtys[0],
-            })
-            self._filled_order_ids.add(int(order_1st["orderId"]))
-            self.max_filled_stage = 1
+            self.book.add(1, int(order_1st["orderId"]), current_price, qtys[0], filled=True)
+            self._set_stage(1)
             success += 1
             log.info(f"[ENTRY LADDER] SELL stage=1 MARKET qty={fmt_qty(qtys[0], symbol)}")
         else:
             log.error("[ENTRY LADDER] 1차 시장가 진입 실패")
 
-        for i in range(1, count):
-            order = place_limit_short(symbol, prices[i], qtys[i])
-            if order:
-                self.ladder_orders.append({
-                    "stage":    i + 1,
-                    "order_id": int(order["orderId"]),
-                    "price":    prices[i],
-                    "qty":      qtys[i],
-                })
-                success += 1
-            time.sleep(0.15)
-
-        if success == 0:
-            log.error("거미줄 주문 0개 성공 → WATCHING 복귀")
-            self.state = "WATCHING"
-            return
-
-        log.info(f"거미줄 배치 완료: {success}/{count}개 → LADDER_ACTIVE")
-        self.no_fill_bars = 0
-        self.state = "LADDER_ACTIVE"
+        for stage, reason in plan["skipped"]:
+            log.warning(f"주문 스킵: stage={stage} {reason}")
 
         if order_1st and self.max_filled_stage >= CFG["LADDER_COUNT"]:
-            pos_now = get_position(symbol)
+            pos_now = self.ledger.position()
             if self.avg_full is not None and pos_now["avg_price"] > 0:
                 log.info(
                     f"[AVG CHECK] calc_avg_full={self.avg_full:.6f} "
@@ -1248,13 +4029,56 @@ class RangeShortEngine:
                 )
             self._reset_sl_order(new_qty=pos_now["amt"])
 
+        # 2~N단 지정가: batchOrders 로 묶어 ENTRY 레인에 제출 → 결정 스레드는 바로 가격 감시 복귀
+        # 결과 대기 중에도 1단 체결분은 LADDER_ACTIVE 에서 관리 (0개 성공이면 완료 시 WATCHING 복귀)
+        self.no_fill_bars = 0
+        self.state        = "LADDER_ACTIVE"
+        ladder_id, limits = self.ladder_id, plan["limits"]
+        if not limits:
+            self._on_ladder_placed(ladder_id, limits, success, count, [])
+            return
+
+        batch = [{**params, "newClientOrderId": self._next_cid("L", stage, price)}
+                 for stage, price, _, params in limits]
+        on_done = lambda results: self._on_ladder_placed(ladder_id, limits, success, count, results)
+        if not self.exec_lane.submit("ENTRY", submit_order_batch, on_done, batch):
+            on_done(None)
+
+    def _on_ladder_placed(self, ladder_id: str, limits: list, success: int, count: int,
+                          results: list | None):
+        results = results or [None] * len(limits)
+        stale   = ladder_id != self.ladder_id or self.state not in ("LADDER_ACTIVE", "POSITION_HOLD")
+        for (stage, price, qty, params), order in zip(limits, results):
+            if not order:
+                continue
+            if stale:
+                # 결과 대기 중 거미줄 종료 / 교체 → 늦게 접수된 진입 주문은 즉시 취소
+                journal.order(ladder_id, order)
+                log.warning(f"[EXEC] 종료된 거미줄({ladder_id}) 진입 주문 접수 → 취소 | orderId={order['orderId']}")
+                self.exec_lane.submit("EXIT", cancel_order, lambda ok: None,
+                                      order.get("symbol", self.symbol), int(order["orderId"]))
+                continue
+            self._track(order)
+            log.info(f"[ENTRY LADDER] SELL LIMIT price={params['price']} qty={params['quantity']}")
+            self.book.add(stage, int(order["orderId"]), price, qty)
+            success += 1
+
+        if stale:
+            return
+        if success == 0:
+            log.error("거미줄 주문 0개 성공 → WATCHING 복귀")
+            self.state = "WATCHING"
+            return
+        log.info(f"거미줄 배치 완료: {success}/{count}개 → {self.state}")
+
     # --------------------------------------------------------
     # 거미줄 무효화 (비활성화됨 — 참조용 유지)
     # --------------------------------------------------------
     def _is_ladder_invalid(self, current_price: float) -> bool:
-        if not self.entry_price_base or not self.ladder_orders:
+        stages = self.book.stages()
+        if not self.entry_price_base or not stages:
             return False
-        top_price  = self.ladder_orders[-1]["price"]
+        top_price  = self.book.price[stages[-1]]
         buffer_pct = CFG["LADDER_GAP_PCT"] * CFG["LADDER_INVALIDATION_MULT"]
         return current_price > top_price * (1 + buffer_pct)
 
@@ -1267,17 +4091,17 @@ class RangeShortEngine:
         filled_now = self._count_filled_stages()
         if filled_now > self.max_filled_stage:
             log.info(f"[EXIT SYNC] stage 강제 갱신: {self.max_filled_stage} → {filled_now}")
-            self.max_filled_stage = filled_now
+            self._set_stage(filled_now)
 
         # v8.9: 8단 이상 → deep trail 전용, LIMIT EXIT 차단
         if self.max_filled_stage >= CFG["STAGE_TRAILING_FROM"]:
-            if self.exit_order_ids:
+            if self.book.exit_ids:
                 log.info(
                     f"[EXIT SYNC] stage={self.max_filled_stage} >= {CFG['STAGE_TRAILING_FROM']} "
                     f"→ LIMIT EXIT 취소, deep trail 전환"
                 )
-                self.cancel_buy_exit_orders(self.exit_order_ids)
-                self.exit_order_ids = []
+                self.cancel_buy_exit_orders(self.book.exit_ids)
+                self.book.exit_ids = []
             return
 
         stage      = max(self.max_filled_stage, 1)
@@ -1286,7 +4110,7 @@ class RangeShortEngine:
         threshold  = CFG["EXIT_REPRICE_THRESHOLD_PCT"]
 
         need_replace = (
-            not self.exit_order_ids
+            not self.book.exit_ids
             or stage != self.last_stage
             or (self.last_exit_price > 0
                 and abs(exit_price - self.last_exit_price) > self.last_exit_price * threshold)
@@ -1294,16 +4118,74 @@ class RangeShortEngine:
                 and abs(exit_qty - self.last_exit_qty) > self.last_exit_qty * 0.05)
         )
 
-        if not need_replace:
+        if not need_replace or self.exec_lane.busy("REPRICE"):
+            return   # 직전 정정 결과 대기 중 → 다음 tick 에 재평가
+
+        # 단일 EXIT LIMIT 이 살아 있으면 정정 1회 왕복으로 처리 (무보호 구간 없음)
+        ladder_id = self.ladder_id
+        if len(self.book.exit_ids) == 1 and \
+                self.ledger.status(self.book.exit_ids[0]) not in FINAL_ORDER_STATUSES:
+            # 정정 수량 = 주문 총수량 → 부분 체결분 + 잔여 포지션 (체결분 + 포지션 합은 체결이 진행돼도 불변)
+            exit_oid   = self.book.exit_ids[0]
+            amend_qty  = self.ledger.executed_qty(exit_oid) + exit_qty
+            on_done    = lambda order: self._on_exit_amended(ladder_id, order, stage, exit_price, exit_qty)
+            self.exec_lane.submit("REPRICE", amend_limit_order, on_done,
+                                  symbol, exit_oid, "BUY", exit_price, amend_qty)
             return
 
-        self.cancel_buy_exit_orders(self.exit_order_ids)
-        self.exit_order_ids = []
-        self.last_stage     = -1
+        self._replace_exit(stage, exit_price, exit_qty)
+
+    def _on_exit_amended(self, ladder_id: str, order: dict | None, stage: int,
+                         exit_price: float, exit_qty: float):
+        noop = bool(order and order.get("noop"))   # -5027: 실제 주문 응답 아님 → 기록 생략
+        if ladder_id != self.ladder_id or self.state != "POSITION_HOLD":
+            if not noop:
+                self._track(order)   # 청산 중 취소된 주문 → 기록만
+            return
+        if not order:
+            self._replace_exit(stage, exit_price, exit_qty)
+            return
+        if not noop:
+            self._track(order)
+        self.last_exit_price = exit_price
+        self.last_exit_qty   = exit_qty
+        self.last_stage      = stage
+        log.info(
+            f"[EXIT/SL] BUY EXIT LIMIT 정정 | stage={stage} | "
+            f"청산가={exit_price:.4f} | qty={exit_qty:.4f}"
+        )
 
-        order = place_limit_exit(symbol, exit_price, exit_qty)
+    def _replace_exit(self, stage: int, exit_price: float, exit_qty: float):
+        # 기존 EXIT orderId 는 취소 확인(_on_exit_replaced)까지 유지 → 결과 대기 중 청산도 취소 대상에 포함
+        old_ids = [oid for oid in self.book.exit_ids if not self.book.is_done(oid)]
+        self.last_stage = -1
+
+        self._decide("LIMIT_EXIT", exit_price)
+        cid       = self._next_cid("X", stage, exit_price)
+        ladder_id = self.ladder_id
+        on_done   = lambda res: self._on_exit_replaced(ladder_id, res, stage, exit_price, exit_qty)
+        self.exec_lane.submit("REPRICE", replace_exit_order, on_done,
+                              self.symbol, old_ids, exit_price, exit_qty, cid)
+
+    def _on_exit_replaced(self, ladder_id: str, res: tuple | None, stage: int,
+                          exit_price: float, exit_qty: float):
+        canceled, order = res or ([], None)
+        if ladder_id != self.ladder_id or self.state != "POSITION_HOLD":
+            if order:
+                # 결과 대기 중 청산 완료 → 늦게 접수된 EXIT 는 즉시 취소
+                journal.order(ladder_id, order)
+                log.warning(f"[EXEC] 종료된 거미줄({ladder_id}) EXIT 접수 → 취소 | orderId={order['orderId']}")
+                self.exec_lane.submit("EXIT", cancel_order, lambda ok: None,
+                                      order.get("symbol", self.symbol), int(order["orderId"]))
+            return
+        for oid in canceled:
+            self.book.mark_canceled(oid)
+        # 취소 확인된 주문만 제거 (취소 실패분은 체결 판정 / 재취소 대상으로 남김)
+        self.book.exit_ids = [oid for oid in self.book.exit_ids
+                              if self.book.is_filled(oid) or not self.book.is_done(oid)]
+        self._track(order)
         if order:
-            self.exit_order_ids  = [int(order["orderId"])]
+            self.book.exit_ids.append(int(order["orderId"]))
             self.last_exit_price = exit_price
             self.last_exit_qty   = exit_qty
             self.last_stage      = stage
@@ -1316,19 +4198,17 @@ class RangeShortEngine:
     # 내부 리셋
     # --------------------------------------------------------
     def _reset_ladder(self):
-        self.ladder_orders          = []
+        self.book.reset(CFG["LADDER_COUNT"])
         self.entry_price_base       = None
         self.max_filled_stage       = 0
-        self.exit_order_ids         = []
         self.last_exit_qty          = 0.0
         self.last_exit_price        = 0.0
         self.bars_after_deep        = 0
         self.no_fill_bars           = 0
         self.last_stage             = 0
-        self._filled_order_ids      = set()
-        self._canceled_order_ids    = set()
         self._last_position_amt     = 0.0
         self._closing_in_progress   = False
+        self._sl_dirty              = False
         self._last_filled_check_ts  = 0
         self.tp1_done               = False
         self.trail_low              = None
@@ -1339,14 +4219,846 @@ class RangeShortEngine:
 
     def _start_cooldown(self):
         self._reset_ladder()
+        self.ledger.clear_watch()
+        self.ledger.dirty = True   # 청산 직후 1회 거래소 대조
         self.state         = "COOLDOWN"
         self.cooldown_bars = CFG["REENTRY_COOLDOWN_BARS"]
         log.info(f"쿨다운 시작: {self.cooldown_bars}봉 (5m 기준)")
 
 
+# ============================================================
+# 공유메모리 시장 데이터 버스 (멀티 프로세스)
+#   publisher 1개가 거래소 조회 → 슬롯 링버퍼에 기록
+#   엔진 프로세스는 BusMarketFeed 로 읽기만 (REST 조회 없음)
+#
+#   헤더: magic | slots | max_bars | slot_size | write_count
+#   슬롯: seq | price | price_ts_ms | closed_bar_ts | htf_ok | triggered
+#         | trigger_bar_ts | n_bars | closes[max_bars] | highs[max_bars]
+#   seqlock: 기록 중 seq 홀수 → 리더는 짝수 + 전후 동일할 때만 채택
+# ============================================================
+_BUS_MAGIC = 0x56383942   # "V89B"
+_BUS_HDR   = struct.Struct("<IIIIQ")
+_BUS_SLOT  = struct.Struct("<QdqqbbqI")
+
+
+_owned_shm: set[str] = set()   # 이 프로세스의 writer 가 소유(등록)한 세그먼트
+
+
+def _attach_shm(name: str) -> shared_memory.SharedMemory:
+    # 기존 세그먼트 연결. 3.12 이하는 연결만 해도 이 프로세스의 resource_tracker 에 등록되어
+    # 프로세스 종료 시 unlink 됨 → 다른 프로세스가 쓰는 버스가 사라지므로 등록 해제
+    # (같은 프로세스의 writer 세그먼트면 등록이 writer 것과 같으므로 유지)
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    if name not in _owned_shm:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class MarketBusWriter:
+    def __init__(self, name: str, slots: int = 0, max_bars: int = 0):
+        self.slots     = slots or CFG["MARKET_BUS_SLOTS"]
+        self.max_bars  = max_bars or CFG["MARKET_BUS_MAX_BARS"]
+        self.slot_size = _BUS_SLOT.size + 16 * self.max_bars
+        size = _BUS_HDR.size + self.slots * self.slot_size
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # 이전 publisher 가 남긴 세그먼트 재사용 → 크기 / 배치가 다르면 리더가 잘못 읽으므로 거부
+            shm = _attach_shm(name)
+            magic, slots, max_bars, slot_size, _ = _BUS_HDR.unpack_from(shm.buf, 0)
+            if shm.size < size or (magic == _BUS_MAGIC
+                                   and (slots, max_bars, slot_size) != (self.slots, self.max_bars, self.slot_size)):
+                found = shm.size
+                shm.close()
+                raise RuntimeError(
+                    f"[MARKET BUS] 기존 세그먼트 {name} 크기/배치 불일치 "
+                    f"(size={found} slots={slots} max_bars={max_bars}, 필요 size={size} "
+                    f"slots={self.slots} max_bars={self.max_bars}) → 세그먼트 삭제 후 재기동"
+                )
+            if sys.version_info < (3, 13):
+                resource_tracker.register(shm._name, "shared_memory")   # 소유권 인수 → close() 에서 unlink
+            self._shm = shm
+        self.name   = name
+        _owned_shm.add(name)
+        self._buf   = self._shm.buf
+        self._count = 0
+        _BUS_HDR.pack_into(self._buf, 0, _BUS_MAGIC, self.slots, self.max_bars, self.slot_size, 0)
+        log.info(f"[MARKET BUS] 생성 name={name} slots={self.slots} max_bars={self.max_bars}")
+
+    def publish(self, price: float, closed_bar_ts: int, htf_ok: bool,
+                triggered: bool, trigger_bar_ts: int, closes: list, highs: list):
+        n    = min(len(closes), len(highs), self.max_bars)
+        off  = _BUS_HDR.size + (self._count % self.slots) * self.slot_size
+        seq  = struct.unpack_from("<Q", self._buf, off)[0]
+        arr  = off + _BUS_SLOT.size
+
+        struct.pack_into("<Q", self._buf, off, seq + 1)
+        _BUS_SLOT.pack_into(
+            self._buf, off, seq + 1, price, int(_clock.time() * 1000), closed_bar_ts,
+            int(htf_ok), int(triggered), trigger_bar_ts, n,
+        )
+        struct.pack_into(f"<{n}d", self._buf, arr, *(closes[-n:] if n else ()))
+        struct.pack_into(f"<{n}d", self._buf, arr + 8 * self.max_bars, *(highs[-n:] if n else ()))
+        struct.pack_into("<Q", self._buf, off, seq + 2)
+
+        self._count += 1
+        struct.pack_into("<Q", self._buf, _BUS_HDR.size - 8, self._count)
+
+    def close(self):
+        self._buf = None
+        self._shm.close()
+        self._shm.unlink()
+        _owned_shm.discard(self.name)
+
+
+class MarketBusReader:
+    def __init__(self, name: str):
+        self._shm = _attach_shm(name)
+        self._buf = self._shm.buf
+        magic, self.slots, self.max_bars, self.slot_size, _ = _BUS_HDR.unpack_from(self._buf, 0)
+        if magic != _BUS_MAGIC:
+            raise RuntimeError(f"[MARKET BUS] magic 불일치: {magic:#x}")
+
+    def read(self, retries: int = 100) -> dict | None:
+        for _ in range(retries):
+            count = struct.unpack_from("<Q", self._buf, _BUS_HDR.size - 8)[0]
+            if count == 0:
+                return None
+            off = _BUS_HDR.size + ((count - 1) % self.slots) * self.slot_size
+            (seq1, price, price_ts_ms, closed_bar_ts,
+             htf_ok, triggered, trigger_bar_ts, n) = _BUS_SLOT.unpack_from(self._buf, off)
+            if seq1 & 1 or n > self.max_bars:   # 기록 중 / 찢어진 슬롯
+                continue
+            arr    = off + _BUS_SLOT.size
+            closes = list(struct.unpack_from(f"<{n}d", self._buf, arr))
+            highs  = list(struct.unpack_from(f"<{n}d", self._buf, arr + 8 * self.max_bars))
+            if struct.unpack_from("<Q", self._buf, off)[0] != seq1:
+                continue
+            return {
+                "price":          price,
+                "price_ts_ms":    price_ts_ms,
+                "closed_bar_ts":  closed_bar_ts,
+                "htf_ok":         bool(htf_ok),
+                "triggered":      bool(triggered),
+                "trigger_bar_ts": trigger_bar_ts,
+                "closes":         closes,
+                "highs":          highs,
+            }
+        log.warning("[MARKET BUS] seqlock 재시도 초과")
+        return None
+
+    def close(self):
+        self._buf = None
+        self._shm.close()
+
+
+class BusMarketFeed(MarketFeed):
+    """MarketFeed 와 동일 인터페이스. 입력은 공유메모리 버스에서만 읽는다."""
+
+    def __init__(self, symbol: str, reader: MarketBusReader):
+        super().__init__(symbol)
+        self._reader = reader
+        self.snapshot: dict | None = None
+
+    def poll(self):
+        snap = self._reader.read()
+        if snap is None:
+            raise RuntimeError("[MARKET BUS] 스냅샷 없음 (publisher 미기동?)")
+        age_sec = _clock.time() - snap["price_ts_ms"] / 1000
+        if age_sec > CFG["MARKET_BUS_STALE_SEC"]:
+            raise RuntimeError(f"[MARKET BUS] 스냅샷 지연 {age_sec:.1f}s → tick 생략")
+        self.snapshot      = snap
+        self.current_price = snap["price"]
+        self.new_bar       = self.bar_tracker.observe(snap["closed_bar_ts"])
+        self._htf_ok       = snap["htf_ok"]
+        self._trigger      = (snap["triggered"], snap["trigger_bar_ts"])
+
+    def htf_ok(self) -> bool:
+        if self._htf_ok is None:
+            self.poll()
+        return self._htf_ok
+
+    def trigger(self) -> tuple[bool, int]:
+        if self._trigger is None:
+            self.poll()
+        return self._trigger
+
+
+def publish_market_snapshot(feed: MarketFeed, writer: MarketBusWriter):
+    feed.poll()
+    htf_ok             = feed.htf_ok()
+    triggered, trig_ts = feed.trigger()
+    # 트리거 캐시 원본 = calc_ema15_trigger.fetch 의 (closes, highs, ts)
+    closes, highs, _   = feed._trigger_cache.last_data or ([], [], 0)
+    writer.publish(
+        feed.current_price, feed.bar_tracker.last_ts or 0,
+        htf_ok, triggered, trig_ts, closes, highs,
+    )
+
+
+def run_market_publisher(name: str):
+    feed   = MarketFeed(CFG["SYMBOL"])
+    writer = MarketBusWriter(name)
+    log.info(f"[MARKET BUS] publisher 시작 | {CFG['SYMBOL']} → {name}")
+    try:
+        while True:
+            try:
+                client.maintain()
+                publish_market_snapshot(feed, writer)
+            except Exception as e:
+                log.error(f"[MARKET BUS] publish 오류: {e}", exc_info=True)
+            _clock.sleep(feed.sleep_hint())
+    finally:
+        writer.close()
+
+
+def run_replay_publisher(name: str, klines_path: str, step_sec: float = 0.0):
+    """5m kline JSON(거래소 원본 형식 리스트) 또는 백필 .vkl 을 봉 단위로 버스에 재생 — 로컬 테스트용."""
+    if klines_path.endswith(".vkl"):
+        store = KlineStore(klines_path)
+        cols  = store.columns()
+        rows  = list(zip(*(cols[f] for f in VKL_FIELDS)))
+        store.close()
+    else:
+        with open(klines_path, encoding="utf-8") as f:
+            rows = json.load(f)
+    window = CFG["EMA_TRIGGER_LEN"] + 10
+    writer = MarketBusWriter(name)
+    log.info(f"[MARKET BUS] replay 시작 | {klines_path} ({len(rows)}봉) → {name}")
+    try:
+        for i in range(window, len(rows)):
+            closed = rows[i - window:i]
+            closes = [float(k[4]) for k in closed]
+            highs  = [float(k[2]) for k in closed]
+            ts     = int(closed[-1][0])
+            writer.publish(
+                float(rows[i][4]), ts, True,
+                _compute_5m_trigger(closes, highs), ts, closes, highs,
+            )
+            _clock.sleep(step_sec)
+    finally:
+        writer.close()
+
+# ============================================================
+# 과거 kline 백필 (연구 / 시뮬레이션용)
+#   [start, end] 를 BACKFILL_PAGE_BARS 봉 단위 startTime/endTime 페이지로 분할
+#   → 워커 풀에서 병렬 조회, kline 가중치 토큰 버킷으로 요청 가중치 예산 유지
+#   .vkl: 헤더 512B + 고정폭 레코드 (ts, open, high, low, close, volume — float64 × 6)
+#     레코드 위치 = (ts - start_ms) / interval_ms → 페이지 완료 순서와 무관하게 제자리 pwrite
+#     ts 가 기대값이고 close != 0 인 레코드 = 완료 → 파일 자체가 체크포인트
+#     재실행 시 미완료 레코드가 있는 페이지만 다시 조회
+#   거래소 공백(점검 등): 응답에 없는 봉은 ts 만 기록하고 OHLC = NaN
+#     → 마지막 연속성 점검에서 직전 종가 평탄봉(volume 0)으로 채움
+# ============================================================
+VKL_MAGIC  = b"VKL1\n"
+VKL_HEADER = 512
+VKL_FIELDS = ("ts", "open", "high", "low", "close", "volume")
+_VKL_REC   = 8 * len(VKL_FIELDS)
+
+
+def parse_utc_date(text: str) -> int:
+    return int(datetime.strptime(text, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+class KlineStore:
+    def __init__(self, path: str, symbol: str = "", interval: str = "", start_ms: int = 0):
+        exists = os.path.exists(path) and os.path.getsize(path) >= VKL_HEADER
+        if not exists and not symbol:
+            raise FileNotFoundError(path)
+        self.path = path
+        self.fd   = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        if exists:
+            head = os.pread(self.fd, VKL_HEADER, 0)
+            if head[:len(VKL_MAGIC)] != VKL_MAGIC:
+                raise ValueError(f"{path}: VKL 파일 아님")
+            (hlen,) = struct.unpack_from("<I", head, len(VKL_MAGIC))
+            meta    = json.loads(head[len(VKL_MAGIC) + 4:len(VKL_MAGIC) + 4 + hlen])
+            if symbol and (meta["symbol"], meta["interval"]) != (symbol, interval):
+                raise ValueError(f"{path}: {meta['symbol']} {meta['interval']} 파일 (요청 {symbol} {interval})")
+        else:
+            meta = {"symbol": symbol, "interval": interval, "start_ms": start_ms,
+                    "interval_ms": INTERVAL_SEC[interval] * 1000, "fields": list(VKL_FIELDS)}
+            raw  = json.dumps(meta).encode("utf-8")
+            os.pwrite(self.fd, (VKL_MAGIC + struct.pack("<I", len(raw)) + raw).ljust(VKL_HEADER, b"\0"), 0)
+        self.symbol      = meta["symbol"]
+        self.interval    = meta["interval"]
+        self.start_ms    = meta["start_ms"]
+        self.interval_ms = meta["interval_ms"]
+
+    def __len__(self) -> int:
+        return (os.fstat(self.fd).st_size - VKL_HEADER) // _VKL_REC
+
+    def index(self, ts: int) -> int:
+        return (ts - self.start_ms) // self.interval_ms
+
+    def write(self, first: int, recs: array):
+        os.pwrite(self.fd, recs.tobytes(), VKL_HEADER + first * _VKL_REC)
+
+    def read(self, first: int = 0, count: int | None = None) -> array:
+        count = len(self) - first if count is None else count
+        data  = os.pread(self.fd, max(0, count) * _VKL_REC, VKL_HEADER + first * _VKL_REC)
+        arr   = array("d")
+        arr.frombytes(data[:len(data) - len(data) % _VKL_REC])   # 기록 중 끊긴 꼬리 레코드 제외
+        return arr
+
+    def columns(self) -> dict[str, array]:
+        arr = self.read()
+        return {f: arr[i::len(VKL_FIELDS)] for i, f in enumerate(VKL_FIELDS)}
+
+    def invalid(self, count: int) -> list[int]:
+        # 앞 count 봉 중 미완료 레코드 인덱스 (ts 불일치 / close 0 = 미기록 또는 끊긴 기록)
+        arr   = self.read(0, count)
+        start = self.start_ms
+        step  = self.interval_ms
+        bad   = [i for i, (t, c) in enumerate(zip(arr[0::6], arr[4::6]))
+                 if t != start + i * step or c == 0.0]
+        bad.extend(range(len(arr) // 6, count))
+        return bad
+
+    def fill_gaps(self, count: int) -> tuple[int, int]:
+        # NaN(거래소 공백) → 직전 종가 평탄봉. 반환: (채운 봉, 직전 종가 없어 남은 봉)
+        arr    = self.read(0, count)
+        filled = left = 0
+        prev   = None
+        for i in range(0, len(arr), 6):
+            close = arr[i + 4]
+            if close != close:
+                if prev is None:
+                    left += 1
+                    continue
+                arr[i + 1:i + 6] = array("d", (prev, prev, prev, prev, 0.0))
+                self.write(i // 6, arr[i:i + 6])
+                filled += 1
+            elif close:
+                prev = close
+        return filled, left
+
+    def sync(self):
+        os.fsync(self.fd)
+
+    def close(self):
+        os.close(self.fd)
+
+
+def _backfill_page(store: KlineStore, budget: WeightBudget, first: int, count: int) -> int:
+    # 페이지 1개 조회 → 레코드 배열로 변환해 제자리 기록. 반환: 응답에 없던(거래소 공백) 봉 수
+    step  = store.interval_ms
+    start = store.start_ms + first * step
+    budget.acquire(kline_weight(count))
+    raw   = client.klines(store.symbol, store.interval, limit=count,
+                          start_time=start, end_time=start + (count - 1) * step)
+    recs  = array("d", [float("nan")]) * (count * 6)
+    recs[0::6] = array("d", (start + i * step for i in range(count)))
+    got = 0
+    for k in raw:
+        i = (int(k[0]) - start) // step
+        if 0 <= i < count and int(k[0]) == start + i * step:
+            recs[i * 6 + 1:i * 6 + 6] = array("d", map(float, k[1:6]))
+            got += 1
+    store.write(first, recs)
+    return count - got
+
+
+def run_backfill(symbol: str, interval: str, start_ms: int, end_ms: int | None = None) -> str:
+    step   = INTERVAL_SEC[interval] * 1000
+    last   = BarClock(interval).last_closed_open_ms()
+    end_ms = last if end_ms is None else min(end_ms // step * step, last)
+    path   = os.path.join(CFG["BACKFILL_DIR"], f"{symbol}_{interval}.vkl")
+    os.makedirs(CFG["BACKFILL_DIR"], exist_ok=True)
+
+    start_ms -= start_ms % step
+    if not os.path.exists(path):
+        first = client.klines(symbol, interval, limit=1, start_time=start_ms)   # 상장 이전 구간 제외
+        if first:
+            start_ms = max(start_ms, int(first[0][0]))
+    store = KlineStore(path, symbol, interval, start_ms)
+    if start_ms < store.start_ms:
+        log.info(f"[BACKFILL] {path} 시작 {store.start_ms} 이전 구간은 제외 (필요 시 새 파일로 백필)")
+    total = store.index(end_ms) + 1
+    page  = CFG["BACKFILL_PAGE_BARS"]
+    if total <= 0:
+        log.warning(f"[BACKFILL] {symbol} {interval} 범위 없음")
+        store.close()
+        return path
+
+    budget = WeightBudget(CFG["BACKFILL_WEIGHT_PER_MIN"])
+    pool   = ThreadPoolExecutor(max_workers=CFG["BACKFILL_WORKERS"], thread_name_prefix="backfill")
+    t0     = _clock.time()
+    try:
+        for rnd in range(1, CFG["BACKFILL_RETRY_ROUNDS"] + 1):
+            bad = store.invalid(total)
+            if not bad:
+                break
+            pages = sorted({i // page for i in bad})
+            log.info(
+                f"[BACKFILL] {symbol} {interval} {rnd}회차 | 미완료 {len(bad)}/{total}봉 "
+                f"→ {len(pages)}페이지 (workers={CFG['BACKFILL_WORKERS']})"
+            )
+            futures = [pool.submit(_backfill_page, store, budget, p * page, min(page, total - p * page))
+                       for p in pages]
+            done = gaps = failed = 0
+            for fut in as_completed(futures):
+                try:
+                    gaps += fut.result()
+                except Exception as e:
+                    failed += 1
+                    log.warning(f"[BACKFILL] 페이지 조회 실패 → 다음 회차 재조회: {e}")
+                done += 1
+                if done % CFG["BACKFILL_FSYNC_PAGES"] == 0:
+                    store.sync()
+                    log.info(f"[BACKFILL] {symbol} {interval} {done}/{len(pages)}페이지 | {_clock.time() - t0:.0f}s")
+            store.sync()
+            if gaps or failed:
+                log.info(f"[BACKFILL] {rnd}회차 완료 | 거래소 공백 {gaps}봉 | 실패 {failed}페이지")
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)   # 중단 시 완료된 페이지까지 기록 후 종료
+        store.sync()
+
+    filled, left = store.fill_gaps(total)
+    bad          = store.invalid(total)
+    store.sync()
+    store.close()
+    level = log.warning if bad else log.info
+    level(
+        f"[BACKFILL] {symbol} {interval} 완료 | {total}봉 → {path} | "
+        f"공백 채움 {filled}봉 | 미채움 {left}봉 | 미완료 {len(bad)}봉 | {_clock.time() - t0:.0f}s"
+    )
+    return path
+
+# ============================================================
+# Shadow 모드: 페이퍼 거래소 + 변형 엔진
+#   live tick 종료 후 스냅샷만 넘기고 즉시 복귀 (최신값만 유지, 밀리면 건너뜀)
+#   dispatcher 스레드가 워커 풀에서 변형 엔진들을 1 tick 씩 구동
+#   체결 모델: tick 가격 기준 — LIMIT 은 가격 도달 시 지정가 체결,
+#   MARKET 은 현재가 ± SHADOW_SLIPPAGE_BPS, STOP 은 트리거 후 지정가 이내면 체결
+#   (tick 사이 고저는 관측 불가 → 실체결보다 낙관적일 수 있음)
+# ============================================================
+
+class PaperAPIError(BinanceAPIException):
+    def __init__(self, code: int, message: str):
+        Exception.__init__(self, message)
+        self.code, self.message, self.status_code = code, message, 400
+
+    def __str__(self):
+        return f"APIError(code={self.code}): {self.message}"
+
+
+class PaperExchange:
+    """BinanceFuturesCompat 와 동일 인터페이스의 인메모리 단일 심볼 거래소."""
+
+    can_batch  = True
+    can_modify = True
+
+    def __init__(self, symbol: str, time_offset_ms: float = 0.0):
+        self.symbol         = symbol
+        self.price          = 0.0
+        self.amt            = 0.0
+        self.avg_price      = 0.0
+        self.realized_pnl   = 0.0
+        self.fees           = 0.0
+        self.time_offset_ms = time_offset_ms
+        self.stats: dict    = {}
+        self.hedges: dict   = {}
+        self._orders: dict[int, dict] = {}
+        self._next_id = 1
+
+    # ── 체결 ──
+    def _fill(self, o: dict, price: float):
+        qty = float(o["origQty"])
+        if o["side"] == "SELL":
+            short = -self.amt
+            self.avg_price = (short * self.avg_price + qty * price) / (short + qty)
+            self.amt      -= qty
+        else:
+            qty = min(qty, -self.amt)
+            self.realized_pnl += (self.avg_price - price) * qty
+            self.amt          += qty
+            if abs(self.amt) < 1e-9:
+                self.amt, self.avg_price = 0.0, 0.0
+        self.fees += qty * price * CFG["FEE_PCT_ONEWAY"]
+        o.update(status="FILLED", executedQty=str(qty), avgPrice=str(price),
+                 updateTime=int(self.server_time_ms()))
+
+    def on_price(self, price: float):
+        self.price = price
+        for o in list(self._orders.values()):
+            if o["status"] != "NEW":
+                continue
+            if o["side"] == "BUY" and self.amt == 0.0:
+                o["status"] = "EXPIRED"   # reduceOnly: 포지션 소멸 시 거래소가 만료 처리
+                continue
+            limit = float(o["price"])
+            if o["type"] == "LIMIT":
+                if (o["side"] == "SELL" and price >= limit) or (o["side"] == "BUY" and price <= limit):
+                    self._fill(o, limit)
+            elif o["type"] == "STOP" and float(o["stopPrice"]) <= price <= limit:
+                self._fill(o, price)
+
+    # ── BinanceFuturesCompat 인터페이스 ──
+    def server_time_ms(self) -> float:
+        return _clock.time() * 1000 + self.time_offset_ms
+
+    def maintain(self):
+        pass
+
+    def sync_time(self):
+        pass
+
+    def exchange_info(self):
+        return client._default.exchange_info()
+
+    def klines(self, symbol: str, interval: str, limit: int = 500, start_time: int | None = None,
+               end_time: int | None = None):
+        return client._default.klines(symbol, interval, limit=limit, start_time=start_time, end_time=end_time)
+
+    def ticker_price(self, symbol: str):
+        return {"symbol": symbol, "price": str(self.price)}
+
+    def get_position_risk(self, symbol: str):
+        return [{"symbol": symbol, "positionAmt": str(self.amt), "entryPrice": str(self.avg_price)}]
+
+    def get_orders(self, symbol: str):
+        return [dict(o) for o in self._orders.values() if o["status"] == "NEW"]
+
+    def _find(self, orderId: int | None, origClientOrderId: str | None) -> dict:
+        if orderId is not None and orderId in self._orders:
+            return self._orders[orderId]
+        for o in self._orders.values():
+            if origClientOrderId is not None and o["clientOrderId"] == origClientOrderId:
+                return o
+        raise PaperAPIError(-2013, "Order does not exist.")
+
+    def query_order(self, symbol: str, orderId: int | None = None,
+                    origClientOrderId: str | None = None):
+        return dict(self._find(orderId, origClientOrderId))
+
+    def cancel_order(self, symbol: str, orderId: int):
+        o = self._find(orderId, None)
+        if o["status"] != "NEW":
+            raise PaperAPIError(-2011, "Unknown order sent.")
+        o["status"] = "CANCELED"
+        return dict(o)
+
+    def cancel_open_orders(self, symbol: str):
+        for o in self._orders.values():
+            if o["status"] == "NEW":
+                o["status"] = "CANCELED"
+        return {"code": 200, "msg": "The operation of cancel all open order is done."}
+
+    def new_order(self, **kwargs):
+        if kwargs["side"] == "BUY" and self.amt == 0.0:
+            raise PaperAPIError(-2022, "ReduceOnly Order is rejected.")
+        cid = kwargs.get("newClientOrderId")
+        if cid and any(o["clientOrderId"] == cid for o in self._orders.values()):
+            raise PaperAPIError(-4116, "ClientOrderId is duplicated.")
+        oid = self._next_id
+        self._next_id += 1
+        o = {
+            "orderId": oid, "symbol": kwargs["symbol"], "side": kwargs["side"],
+            "type": kwargs["type"], "clientOrderId": cid or f"paper-{oid}",
+            "price": str(kwargs.get("price", "0")), "stopPrice": str(kwargs.get("stopPrice", "0")),
+            "origQty": str(kwargs["quantity"]), "executedQty": "0", "avgPrice": "0",
+            "status": "NEW",
+        }
+        self._orders[oid] = o
+        if o["type"] == "MARKET":
+            slip = CFG["SHADOW_SLIPPAGE_BPS"] / 10000
+            self._fill(o, self.price * (1 - slip if o["side"] == "SELL" else 1 + slip))
+        else:
+            self.on_price(self.price)
+        return dict(o)
+
+    def new_orders_batch(self, orders: list[dict]):
+        results = []
+        for params in orders:
+            try:
+                results.append(self.new_order(**params))
+            except PaperAPIError as e:
+                results.append({"code": e.code, "msg": e.message})
+        return results
+
+    def modify_order(self, symbol: str, orderId: int, side: str, quantity: str, price: str):
+        o = self._find(orderId, None)
+        if o["status"] != "NEW" or o["type"] != "LIMIT":
+            raise PaperAPIError(-2013, "Order does not exist.")
+        o.update(price=str(price), origQty=str(quantity))
+        self.on_price(self.price)
+        return dict(o)
+
+    def change_leverage(self, symbol: str, leverage: int):
+        return {"symbol": symbol, "leverage": leverage}
+
+    def change_margin_type(self, symbol: str, marginType: str):
+        raise PaperAPIError(-4046, "No need to change margin type.")
+
+
+class ShadowFeed(MarketFeed):
+    """live feed 판단 결과를 복사받는 수동 feed (거래소 조회 없음)."""
+
+    def __init__(self, symbol: str):
+        super().__init__(symbol)
+        self.resamplers = {}
+
+    def update(self, price: float, closed_bar_ts: int | None, htf_ok, trigger):
+        self.current_price = price
+        self.new_bar       = self.bar_tracker.observe(closed_bar_ts)
+        self._htf_ok       = bool(htf_ok)
+        self._trigger      = trigger or (False, 0)
+
+    def poll(self):
+        pass
+
+
+class ShadowRunner:
+    """live 엔진과 같은 가격/봉 스트림으로 CFG 변형 엔진들을 페이퍼 구동."""
+
+    def __init__(self, live_engines: dict, variants: dict[str, dict]):
+        self.symbol    = CFG["SYMBOL"]
+        self.overrides: dict[str, dict] = {}
+        self.papers:  dict[str, PaperExchange]    = {}
+        self.feeds:   dict[str, ShadowFeed]       = {}
+        self.engines: dict[str, RangeShortEngine] = {}
+        self.stats:   dict[str, dict]             = {}
+
+        for name, eng in live_engines.items():
+            eng.on_ladder_close = self._recorder(f"live:{name}")
+        for name, overrides in variants.items():
+            errors = validate_cfg(overrides)
+            errors += [f"{k}: shadow 변형에서 변경 불가" for k in overrides
+                       if k in RELOAD_RESTART_KEYS or k.startswith("SHADOW_")]
+            if errors:
+                raise RuntimeError(f"[SHADOW] 변형 {name} 설정 오류: {errors}")
+            paper = PaperExchange(self.symbol, client.time_offset_ms)
+            feed  = ShadowFeed(self.symbol)
+            # 페이퍼 거래소는 단일 스레드 전제 → 실행 레인 동기 모드
+            self.overrides[name] = {**overrides, "EXEC_ASYNC": False}
+            with use_account(f"shadow:{name}", paper, self.overrides[name]):
+                eng = RangeShortEngine(feed=feed, poll_feed=False)
+            eng.on_ladder_close = self._recorder(name)
+            self.papers[name], self.feeds[name], self.engines[name] = paper, feed, eng
+
+        self._latest: tuple | None = None
+        self._wake    = threading.Event()
+        self._bars    = 0
+        self._pool    = ThreadPoolExecutor(max_workers=CFG["SHADOW_WORKERS"], thread_name_prefix="shadow")
+        self._thread  = threading.Thread(target=self._dispatch, name="shadow-dispatch", daemon=True)
+        self._thread.start()
+        log.info(f"[SHADOW] 변형 {len(variants)}개: {list(variants)}")
+
+    def _recorder(self, name: str):
+        st = self.stats.setdefault(name, {
+            "ladders": 0, "wins": 0, "pnl": 0.0, "by_reason": {}, "by_stage": {},
+        })
+
+        def record(reason: str, max_stage: int, pnl: float):
+            st["ladders"]  += 1
+            st["wins"]     += pnl > 0
+            st["pnl"]      += pnl
+            st["by_reason"][reason]   = st["by_reason"].get(reason, 0) + 1
+            st["by_stage"][max_stage] = st["by_stage"].get(max_stage, 0) + 1
+        return record
+
+    def submit(self, feed: MarketFeed):
+        # live tick 직후 호출. shadow 가 WATCHING 이면 판단 확정 (봉당 캐시 → 추가 조회 최대 1회)
+        if any(eng.state == "WATCHING" for eng in self.engines.values()):
+            feed.prepare_decision()
+        self._latest = (feed.current_price, feed.bar_tracker.last_ts, feed._htf_ok, feed._trigger)
+        self._wake.set()
+
+    def _step(self, name: str, snap: tuple) -> bool:
+        price, bar_ts, htf_ok, trigger = snap
+        paper, feed, eng = self.papers[name], self.feeds[name], self.engines[name]
+        with use_account(f"shadow:{name}", paper, self.overrides[name]):
+            paper.on_price(price)
+            feed.update(price, bar_ts, htf_ok, trigger)
+            if eng._tick_count == 0:
+                eng._startup()
+            eng._timed_tick()
+        return feed.new_bar
+
+    def _dispatch(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            snap    = self._latest
+            futures = {name: self._pool.submit(self._step, name, snap) for name in self.engines}
+            new_bar = False
+            for name, fut in futures.items():
+                try:
+                    new_bar |= fut.result()
+                except Exception as e:
+                    log.error(f"[SHADOW] {name} tick 오류: {e}", exc_info=True)
+            status_board.publish("shadow", {"ts": _clock.time(), "variants": self.summary()})
+            if new_bar:
+                self._bars += 1
+                if self._bars % CFG["SHADOW_REPORT_BARS"] == 0:
+                    self.report()
+
+    def summary(self) -> dict:
+        out = {}
+        for name, st in self.stats.items():
+            paper = self.papers.get(name)
+            out[name] = {**st, "by_reason": dict(st["by_reason"]), "by_stage": dict(st["by_stage"])}
+            if paper is not None:
+                out[name].update(
+                    fees=round(paper.fees, 4),
+                    open_amt=paper.amt,
+                    unrealized=round((paper.avg_price - paper.price) * -paper.amt, 4),
+                    state=self.engines[name].state,
+                )
+        return out
+
+    def report(self):
+        for name, st in self.summary().items():
+            log.info(
+                f"[SHADOW] {name:<16} 거미줄={st['ladders']} 승={st['wins']} pnl={st['pnl']:.2f} "
+                f"fees={st.get('fees', '-')} state={st.get('state', '-')} "
+                f"사유={st['by_reason']} 단계={st['by_stage']}"
+            )
+
+# ============================================================
+# 멀티 계정 팬아웃
+# ============================================================
+
+class MultiAccountRunner:
+    """공용 MarketFeed 1개 → 계정별 RangeShortEngine 을 병렬 tick."""
+
+    def __init__(self, accounts: dict[str, BinanceFuturesCompat], feed: MarketFeed | None = None):
+        self.symbol   = CFG["SYMBOL"]
+        self.accounts = accounts
+        self.feed     = feed or MarketFeed(self.symbol)
+        self.engines: dict[str, RangeShortEngine] = {}
+        for name, cli in accounts.items():
+            with use_account(name, cli):
+                self.engines[name] = RangeShortEngine(feed=self.feed, poll_feed=False)
+        self._pool = ThreadPoolExecutor(max_workers=len(accounts), thread_name_prefix="acct")
+
+    def _fan_out(self, fn):
+        futures = {
+            name: self._pool.submit(self._in_account, name, fn)
+            for name in self.engines
+        }
+        for name, fut in futures.items():
+            try:
+                fut.result()
+            except Exception as e:
+                with use_account(name, self.accounts[name]):
+                    log.error(f"루프 오류: {e}", exc_info=True)
+
+    def _in_account(self, name: str, fn):
+        with use_account(name, self.accounts[name]) as cli:
+            fn(cli, self.engines[name])
+
+    def run(self):
+        log.info("=" * 60)
+        log.info(f"VELLA RANGE SHORT LADDER v8.9 (SOL) 멀티 계정 시작 | 계정: {list(self.engines)}")
+        log.info("=" * 60)
+        profiler = SamplingProfiler()
+        profiler.install_signal()
+        start_status_server()
+        if CFG["SCREENER_ENABLE"]:
+            log.warning("[SCREENER] 멀티 계정은 공용 feed 고정 → 스크리너 비활성")
+        self._fan_out(lambda cli, eng: eng._startup())
+        shadow = ShadowRunner(self.engines, CFG["SHADOW_VARIANTS"]) if CFG["SHADOW_VARIANTS"] else None
+        while True:
+            try:
+                profiler.poll_control()
+                changed = config_reloader.poll(
+                    idle=all(eng._is_idle() for eng in self.engines.values())
+                )
+                if changed:
+                    self._fan_out(lambda cli, eng: eng._on_config_change(changed))
+                client.maintain()
+                self.feed.poll()
+                if any(eng.state == "WATCHING" for eng in self.engines.values()):
+                    self.feed.prepare_decision()
+                self._fan_out(lambda cli, eng: (cli.maintain(), eng._timed_tick()))
+                if shadow is not None:
+                    shadow.submit(self.feed)
+            except Exception as e:
+                log.error(f"루프 오류: {e}", exc_info=True)
+            _clock.sleep(self.feed.sleep_hint())
+
+
+def build_accounts(names: list) -> dict[str, BinanceFuturesCompat]:
+    accounts = {}
+    for name in names:
+        key    = os.environ.get(f"BINANCE_API_KEY_{name}", "")
+        secret = os.environ.get(f"BINANCE_API_SECRET_{name}", "")
+        if not key or not secret:
+            raise RuntimeError(f"계정 {name} API 키 없음")
+        accounts[name] = BinanceFuturesCompat(key, secret)
+    return accounts
+
+# ============================================================
+# 거래소 호출 재생 (회귀 / 성능 테스트)
+#   기록 시점 CFG 로 엔진 1개를 가상 시계 위에서 기록 소진까지 구동
+#   실행 레인은 동기 모드, 상태 서버 / 핫 리로드 / shadow 없음
+#   저널은 별도 DB 지정 시에만 기록 (운영 저널 오염 방지)
+# ============================================================
+def run_call_replay(rc: ReplayClient, journal_db: str = ""):
+    journal.path = journal_db
+    overrides = {k: v for k, v in rc.cfg.items() if k in CFG}
+    overrides["EXEC_ASYNC"] = False
+
+    t_wall = time.perf_counter()
+    ticks  = 0
+    with _clock.use(VirtualClock(time, rc.start_ts or time.time())) as vclock, \
+            use_account(None, rc, overrides):
+        rc.clock = vclock
+        engine   = RangeShortEngine()
+        try:
+            engine._startup()
+            while True:
+                try:
+                    client.maintain()
+                    engine._timed_tick()
+                    ticks += 1
+                except Exception as e:
+                    log.error(f"루프 오류: {e}", exc_info=True)
+                _clock.sleep(engine.feed.sleep_hint())
+        except ReplayExhausted as e:
+            log.info(f"[REPLAY] 기록 소진 ({e})")
+        finally:
+            wall = time.perf_counter() - t_wall
+            span = _clock.time() - (rc.start_ts or _clock.time())
+            log.info(
+                f"[REPLAY] tick={ticks} | 호출 {rc.served}/{rc.total} (미사용 {rc.remaining()}) | "
+                f"불일치 {rc.mismatches} | 가상 {span / 3600:.2f}h → 실제 {wall:.2f}s | "
+                f"tick avg={engine._tick_ms_sum / max(1, engine._tick_count):.3f}ms "
+                f"max={engine._tick_ms_max:.3f}ms | 최종 state={engine.state}"
+            )
+            rc.clock = None
+
 # ============================================================
 # 엔트리포인트
 # ============================================================
 if __name__ == "__main__":
-    engine = RangeShortEngine()
-    engine.run()
\ No newline at end of file
+    # python app.py publish               → 공유메모리 버스 publisher
+    # python app.py replay <klines.json>  → 로컬 replay publisher
+    # python app.py replay-calls <기록> [journal.db] → 거래소 호출 기록 재생
+    # python app.py backfill <심볼> <5m,4h> <시작일> [종료일] → 과거 kline 백필 (.vkl)
+    flight.install()
+    cmd = sys.argv[1] if len(sys.argv) > 1 else ""
+    bus_name = CFG["MARKET_BUS_NAME"]
+
+    if cmd == "publish":
+        run_market_publisher(bus_name or "vella_bus")
+    elif cmd == "backfill":
+        end = parse_utc_date(sys.argv[5]) if len(sys.argv) > 5 else None
+        for iv in sys.argv[3].split(","):
+            run_backfill(sys.argv[2].upper(), iv, parse_utc_date(sys.argv[4]), end)
+    elif cmd == "replay-calls":
+        run_call_replay(client.install(ReplayClient(sys.argv[2])), sys.argv[3] if len(sys.argv) > 3 else "")
+    elif cmd == "replay":
+        step = float(sys.argv[3]) if len(sys.argv) > 3 else CFG["POLL_INTERVAL_SEC"]
+        run_replay_publisher(bus_name or "vella_bus", sys.argv[2], step)
+    else:
+        feed = BusMarketFeed(CFG["SYMBOL"], MarketBusReader(bus_name)) if bus_name else None
+        if CFG["ACCOUNTS"]:
+            MultiAccountRunner(build_accounts(CFG["ACCOUNTS"]), feed=feed).run()
+        else:
+            engine = RangeShortEngine(feed=feed)
+            engine.run()
\ No newline at end of file
@@ -0,0 +1,317 @@
+"""
+============================================================
+VELLA 로그 인덱서 — vella_range_short_v8_9.log 오프라인 색인
+============================================================
+
+엔진 로그를 mmap 으로 열어 태그 라인만 정규식 스트리밍으로 추출하고,
+거미줄 단위 에피소드로 재구성해 컬럼 파일(.vidx)에 저장한다.
+파일별 처리 오프셋과 미완료 에피소드를 함께 저장 → 로그가 늘어나면
+새로 붙은 부분만 파싱해 이어서 색인.
+
+추출 태그:
+  [5M TRIGGER V8.2] [HTF FILTER PASS/BLOCK] [CAPITAL CHECK]
+  [EXPECTED FULL AVG] [DEEP TRAIL INIT] [DEEP TRAIL EXIT]
+  [FINAL CLOSE] [SYNC] + 체결 단계 갱신 / 포지션 청산 감지
+
+사용:
+  python log_indexer.py build vella_range_short_v8_9.log [...] -o vella_log.vidx
+  python log_indexer.py stats -i vella_log.vidx
+
+.vidx 형식:
+  b"VIDX1\\n" | u32 헤더 길이 | 헤더 JSON | 컬럼 바이트 (array.tobytes)
+  헤더: rows / columns[{name, type, offset, length}] / reasons / accounts / files / open
+============================================================
+"""
+
+import argparse
+import json
+import mmap
+import os
+import re
+import struct
+from array import array
+from datetime import datetime
+
+MAGIC = b"VIDX1\n"
+
+# (컬럼명, array 타입코드)
+COLUMNS = [
+    ("start_ts",      "d"),
+    ("end_ts",        "d"),
+    ("trigger_close", "d"),
+    ("capital_ratio", "d"),
+    ("avg_full",      "d"),
+    ("sl_price",      "d"),
+    ("deep_drop_pct", "d"),
+    ("max_stage",     "i"),
+    ("deep_trail",    "b"),
+    ("htf_pass",      "b"),
+    ("sync_count",    "i"),
+    ("reason",        "i"),    # header["reasons"] 인덱스
+    ("account",       "i"),    # header["accounts"] 인덱스
+    ("file_id",       "i"),    # header["files"] 인덱스
+    ("offset",        "q"),    # 트리거 라인 바이트 오프셋
+]
+
+TAGS = (
+    r"5M TRIGGER V8\.2|HTF FILTER (?:PASS|BLOCK)|CAPITAL CHECK|EXPECTED FULL AVG"
+    r"|DEEP TRAIL INIT|DEEP TRAIL EXIT|FINAL CLOSE|SYNC"
+)
+LINE_RE = re.compile(
+    (
+        r"^(?P<ts>\d{4}-\d\d-\d\d \d\d:\d\d:\d\d,\d{3}) \[\w+\] (?:\[(?P<acct>[^\]]+)\] )??"
+        r"(?:\[(?P<tag>" + TAGS + r")\](?P<rest>[^\n]*)"
+        r"|(?:\[EXIT SYNC\] stage 강제 갱신|체결 단계 갱신): \d+ → (?P<stage>\d+)"
+        r"|(?P<gone>포지션 청산 감지))"
+    ).encode("utf-8"),
+    re.M,
+)
+NUM = {
+    "close":    re.compile(r"close=([\d.]+)<"),
+    "ratio":    re.compile(r"ratio=([\d.]+)"),
+    "avg_full": re.compile(r"avg_full=([\d.]+)"),
+    "sl_price": re.compile(r"sl_price=([\d.]+)"),
+    "drop":     re.compile(r"drop=([\d.]+)%"),
+    "reason":   re.compile(r"^ 사유=(\w+)"),
+}
+
+
+def _parse_ts(raw: bytes) -> float:
+    s = raw.decode("ascii")
+    return datetime(
+        int(s[0:4]), int(s[5:7]), int(s[8:10]),
+        int(s[11:13]), int(s[14:16]), int(s[17:19]), int(s[20:23]) * 1000,
+    ).timestamp()
+
+
+def _num(key: str, text: str) -> float:
+    m = NUM[key].search(text)
+    return float(m.group(1)) if m else float("nan")
+
+
+# ============================================================
+# 인덱스 입출력
+# ============================================================
+
+def new_index() -> dict:
+    return {
+        "columns":  {name: array(code) for name, code in COLUMNS},
+        "reasons":  [],
+        "accounts": [],
+        "files":    [],      # [{path, head, offset}]
+        "open":     {},      # account → 미완료 에피소드
+        "last_htf": {},      # account → 마지막 HTF 결과
+    }
+
+
+def load_index(path: str) -> dict:
+    idx = new_index()
+    if not os.path.exists(path):
+        return idx
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path}: VIDX 파일 아님")
+        (hlen,) = struct.unpack_from("<I", mm, len(MAGIC))
+        base    = len(MAGIC) + 4
+        header  = json.loads(mm[base:base + hlen])
+        data    = base + hlen
+        for col in header["columns"]:
+            arr = array(col["type"])
+            arr.frombytes(mm[data + col["offset"]:data + col["offset"] + col["length"]])
+            idx["columns"][col["name"]] = arr
+    for key in ("reasons", "accounts", "files", "open", "last_htf"):
+        idx[key] = header[key]
+    return idx
+
+
+def save_index(idx: dict, path: str):
+    cols, offset = [], 0
+    for name, code in COLUMNS:
+        length = len(idx["columns"][name]) * idx["columns"][name].itemsize
+        cols.append({"name": name, "type": code, "offset": offset, "length": length})
+        offset += length
+    header = json.dumps({
+        "rows":     len(idx["columns"]["start_ts"]),
+        "columns":  cols,
+        **{k: idx[k] for k in ("reasons", "accounts", "files", "open", "last_htf")},
+    }, ensure_ascii=False).encode("utf-8")
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for name, _ in COLUMNS:
+            f.write(idx["columns"][name].tobytes())
+    os.replace(tmp, path)
+
+
+def _intern(table: list, value: str) -> int:
+    try:
+        return table.index(value)
+    except ValueError:
+        table.append(value)
+        return len(table) - 1
+
+
+# ============================================================
+# 스트리밍 파싱
+# ============================================================
+
+def _emit(idx: dict, ep: dict, end_ts: float, reason: str):
+    cols = idx["columns"]
+    cols["start_ts"].append(ep["start_ts"])
+    cols["end_ts"].append(end_ts)
+    cols["trigger_close"].append(ep["trigger_close"])
+    cols["capital_ratio"].append(ep["capital_ratio"])
+    cols["avg_full"].append(ep["avg_full"])
+    cols["sl_price"].append(ep["sl_price"])
+    cols["deep_drop_pct"].append(ep["deep_drop_pct"])
+    cols["max_stage"].append(ep["max_stage"])
+    cols["deep_trail"].append(ep["deep_trail"])
+    cols["htf_pass"].append(ep["htf_pass"])
+    cols["sync_count"].append(ep["sync_count"])
+    cols["reason"].append(_intern(idx["reasons"], reason))
+    cols["account"].append(_intern(idx["accounts"], ep["account"]))
+    cols["file_id"].append(ep["file_id"])
+    cols["offset"].append(ep["offset"])
+
+
+def _drop_file(idx: dict, file_id: int):
+    # 교체된 파일에서 나온 에피소드(완료 / 미완료) 제거
+    cols = idx["columns"]
+    keep = [i for i, fid in enumerate(cols["file_id"]) if fid != file_id]
+    for name, code in COLUMNS:
+        cols[name] = array(code, (cols[name][i] for i in keep))
+    for acct in [a for a, ep in idx["open"].items() if ep["file_id"] == file_id]:
+        idx["open"].pop(acct)
+
+
+def index_file(idx: dict, path: str) -> int:
+    size = os.path.getsize(path)
+    if size == 0:
+        return 0
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        head  = mm[:128].hex()
+        entry = next((e for e in reversed(idx["files"]) if e["path"] == os.path.abspath(path)), None)
+        if entry is None:
+            entry = {"path": os.path.abspath(path), "head": head, "offset": 0}
+            idx["files"].append(entry)
+        elif not head.startswith(entry["head"]) or entry["offset"] > size:
+            # 같은 경로의 항목을 그대로 재사용 (file_id 유지) → 이전 내용 에피소드만 제거
+            print(f"[INDEX] {path}: 파일 교체 감지 → 처음부터 색인")
+            _drop_file(idx, idx["files"].index(entry))
+            entry["offset"] = 0
+        entry["head"] = head   # 128 바이트 미만 파일이 자라면 앞부분 비교 기준도 확장
+        file_id = idx["files"].index(entry)
+
+        endpos = mm.rfind(b"\n") + 1   # 기록 중인 마지막 줄 제외
+        opened = idx["open"]
+        count  = 0
+        for m in LINE_RE.finditer(mm, entry["offset"], endpos):
+            acct = (m.group("acct") or b"main").decode("utf-8")
+            ts   = _parse_ts(m.group("ts"))
+            ep   = opened.get(acct)
+
+            if m.group("stage"):
+                if ep:
+                    ep["max_stage"] = max(ep["max_stage"], int(m.group("stage")))
+                continue
+            if m.group("gone"):
+                if ep:
+                    _emit(idx, ep, ts, "POSITION_GONE")
+                    opened.pop(acct)
+                    count += 1
+                continue
+
+            tag  = m.group("tag").decode("utf-8")
+            rest = m.group("rest").decode("utf-8", "replace")
+
+            if tag.startswith("HTF FILTER"):
+                idx["last_htf"][acct] = tag.endswith("PASS")
+            elif tag == "5M TRIGGER V8.2":
+                if ep:
+                    _emit(idx, ep, ts, "UNTRACKED")
+                    count += 1
+                opened[acct] = {
+                    "start_ts": ts, "trigger_close": _num("close", rest),
+                    "capital_ratio": float("nan"), "avg_full": float("nan"),
+                    "sl_price": float("nan"), "deep_drop_pct": float("nan"),
+                    "max_stage": 0, "deep_trail": 0,
+                    "htf_pass": int(idx["last_htf"].get(acct, False)),
+                    "sync_count": 0, "account": acct,
+                    "file_id": file_id, "offset": m.start(),
+                }
+            elif ep is None:
+                continue
+            elif tag == "CAPITAL CHECK":
+                ep["capital_ratio"] = _num("ratio", rest)
+            elif tag == "EXPECTED FULL AVG":
+                ep["avg_full"]  = _num("avg_full", rest)
+                ep["sl_price"]  = _num("sl_price", rest)
+                ep["max_stage"] = max(ep["max_stage"], 1)   # 배치 직후 1단 시장가 진입
+            elif tag == "DEEP TRAIL INIT":
+                ep["deep_trail"] = 1
+            elif tag == "DEEP TRAIL EXIT":
+                ep["deep_drop_pct"] = _num("drop", rest)
+            elif tag == "SYNC":
+                ep["sync_count"] += 1
+            elif tag == "FINAL CLOSE":
+                reason = NUM["reason"].search(rest)
+                if reason:   # "청산 실패" 라인은 사유 위치가 달라 제외
+                    _emit(idx, ep, ts, reason.group(1))
+                    opened.pop(acct)
+                    count += 1
+
+        entry["offset"] = endpos
+    return count
+
+
+# ============================================================
+# 조회
+# ============================================================
+
+def stats(idx: dict):
+    cols = idx["columns"]
+    n    = len(cols["start_ts"])
+    print(f"에피소드 {n}개 | 미완료 {len(idx['open'])}개")
+
+    by_reason: dict = {}
+    for r in cols["reason"]:
+        by_reason[idx["reasons"][r]] = by_reason.get(idx["reasons"][r], 0) + 1
+    print("\n[사유별]")
+    for reason, cnt in sorted(by_reason.items(), key=lambda x: -x[1]):
+        print(f"  {reason:<14} {cnt:6d}")
+
+    by_stage: dict = {}
+    for st, dur in zip(cols["max_stage"], (e - s for s, e in zip(cols["start_ts"], cols["end_ts"]))):
+        c, total = by_stage.get(st, (0, 0.0))
+        by_stage[st] = (c + 1, total + dur)
+    print("\n[max_stage별] 개수 / 평균 보유(분)")
+    for st in sorted(by_stage):
+        c, total = by_stage[st]
+        print(f"  stage={st:<3} {c:6d}  {total / c / 60:8.1f}")
+
+
+def main():
+    ap  = argparse.ArgumentParser(description="VELLA 엔진 로그 색인")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b   = sub.add_parser("build")
+    b.add_argument("logs", nargs="+")
+    b.add_argument("-o", "--out", default="vella_log.vidx")
+    st  = sub.add_parser("stats")
+    st.add_argument("-i", "--index", default="vella_log.vidx")
+    args = ap.parse_args()
+
+    if args.cmd == "build":
+        idx = load_index(args.out)
+        for path in args.logs:
+            added = index_file(idx, path)
+            print(f"[INDEX] {path}: 에피소드 +{added}")
+        save_index(idx, args.out)
+    else:
+        stats(load_index(args.index))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import time
+
+import pytest
+
+pytest.importorskip("binance")
+import app
+
+START = app.parse_utc_date("2024-01-01")
+STEP  = 3600_000
+BARS  = 48
+
+
+def _kline(t: int) -> list:
+    p = 100.0 + (t - START) // STEP
+    return [t, str(p), str(p + 1), str(p - 1), str(p + 0.5), "10", t + STEP - 1]
+
+
+class FakeKlines:
+    def __init__(self, fail_starts=()):
+        self.fail_starts = set(fail_starts)
+        self.starts: list[int] = []
+
+    def server_time_ms(self) -> float:
+        return time.time() * 1000
+
+    def klines(self, symbol, interval, limit=500, start_time=None, end_time=None):
+        self.starts.append(start_time)
+        if start_time in self.fail_starts:
+            raise ConnectionError("reset")
+        end_time = start_time + (limit - 1) * STEP if end_time is None else end_time
+        return [_kline(t) for t in range(start_time, end_time + 1, STEP)][:limit]
+
+
+@pytest.fixture
+def backfill_cfg(tmp_path, monkeypatch):
+    monkeypatch.setitem(app.CFG, "BACKFILL_DIR", str(tmp_path))
+    monkeypatch.setitem(app.CFG, "BACKFILL_PAGE_BARS", 12)
+    monkeypatch.setitem(app.CFG, "BACKFILL_WORKERS", 2)
+    monkeypatch.setitem(app.CFG, "BACKFILL_RETRY_ROUNDS", 1)
+    monkeypatch.setitem(app.CFG, "BACKFILL_WEIGHT_PER_MIN", 10**6)
+    return tmp_path
+
+
+def test_resume_refetches_only_the_failed_page(backfill_cfg, monkeypatch):
+    end      = START + (BARS - 1) * STEP
+    bad_page = START + 12 * STEP
+
+    monkeypatch.setattr(app, "client", FakeKlines(fail_starts=[bad_page]))
+    path  = app.run_backfill("SOLUSDT", "1h", START, end)
+    store = app.KlineStore(path)
+    assert store.invalid(BARS) == list(range(12, 24))
+    store.close()
+
+    retry = FakeKlines()
+    monkeypatch.setattr(app, "client", retry)
+    app.run_backfill("SOLUSDT", "1h", START, end)
+
+    assert retry.starts == [bad_page]
+    store = app.KlineStore(path)
+    cols  = store.columns()
+    assert store.invalid(BARS) == []
+    assert list(cols["ts"]) == [START + i * STEP for i in range(BARS)]
+    assert list(cols["close"]) == [100.5 + i for i in range(BARS)]
+    store.close()
@@ -0,0 +1,149 @@
+import pytest
+
+pytest.importorskip("binance")
+import app
+
+HOUR = 3600_000
+BASE = 300_000
+T0   = 1_700_000_000_000 - 1_700_000_000_000 % HOUR
+
+
+def _base_rows(bucket_ts: int, skip=()):
+    # 1h 버킷 안의 5m 봉 12개: o=100+i, h=o+2, l=o-1, c=o+1
+    return [[bucket_ts + i * BASE, 100.0 + i, 102.0 + i, 99.0 + i, 101.0 + i]
+            for i in range(12) if i not in skip]
+
+
+def _hour_bar(bucket_ts: int) -> list:
+    return [bucket_ts, 100.0, 113.0, 99.0, 112.0]
+
+
+class FakeWindow:
+    def __init__(self, exchange):
+        self.exchange = exchange
+
+    def refresh(self):
+        self.exchange.refreshes += 1
+
+    def rows(self, n: int) -> list:
+        return [list(b) for b in self.exchange.bars[-n:]]
+
+
+class FakeKlineFeed:
+    # 거래소 1h 봉 목록 (bars) 을 그대로 돌려주는 kline_feed 대역
+    def __init__(self, bars):
+        self.bars      = [list(b) for b in bars]
+        self.refreshes = 0
+
+    def window(self, symbol, interval, size):
+        assert interval == "1h"
+        return FakeWindow(self)
+
+
+@pytest.fixture
+def exchange(monkeypatch):
+    feed = FakeKlineFeed([_hour_bar(T0 + i * HOUR) for i in range(3)])
+    monkeypatch.setattr(app, "kline_feed", feed)
+    return feed
+
+
+def _seeded(exchange) -> app.BarResampler:
+    r = app.BarResampler("SOLUSDT", "1h", "5m", keep=10)
+    closes, ts = r.closes_with_ts(10)
+    assert ts == T0 + 2 * HOUR and len(closes) == 3
+    exchange.refreshes = 0
+    return r
+
+
+def test_full_bucket_closes_on_last_base_bar(exchange, monkeypatch):
+    monkeypatch.setitem(app.CFG, "HTF_RESAMPLE_VERIFY", False)
+    r      = _seeded(exchange)
+    bucket = T0 + 3 * HOUR
+    rows   = _base_rows(bucket)
+
+    for row in rows[:-1]:
+        r.add_base_bar(row)
+    assert r.last_ts == T0 + 2 * HOUR
+
+    r.add_base_bar(rows[-1])
+    assert list(r.bars[-1]) == _hour_bar(bucket)
+    assert exchange.refreshes == 0   # 검증 off → 거래소 조회 없음
+
+
+def test_verify_prefers_exchange_bar_on_mismatch(exchange, monkeypatch):
+    monkeypatch.setitem(app.CFG, "HTF_RESAMPLE_VERIFY", True)
+    r      = _seeded(exchange)
+    bucket = T0 + 3 * HOUR
+    exchange.bars.append([bucket, 100.0, 114.0, 99.0, 112.0])
+
+    for row in _base_rows(bucket):
+        r.add_base_bar(row)
+    assert list(r.bars[-1]) == [bucket, 100.0, 114.0, 99.0, 112.0]
+
+
+def test_verify_uses_local_bar_when_exchange_lags(exchange, monkeypatch):
+    monkeypatch.setitem(app.CFG, "HTF_RESAMPLE_VERIFY", True)
+    r      = _seeded(exchange)
+    bucket = T0 + 3 * HOUR
+
+    for row in _base_rows(bucket):
+        r.add_base_bar(row)
+    assert list(r.bars[-1]) == _hour_bar(bucket)
+    assert r._pending_ts == 0
+
+
+def test_missing_base_bar_falls_back_to_exchange_bar(exchange, monkeypatch):
+    monkeypatch.setitem(app.CFG, "HTF_RESAMPLE_VERIFY", False)
+    r      = _seeded(exchange)
+    bucket = T0 + 3 * HOUR
+
+    for row in _base_rows(bucket, skip={5}):
+        r.add_base_bar(row)
+    # 미완성 버킷 + 거래소 미반영 → 로컬 봉을 쓰지 않고 대기
+    assert r.last_ts == T0 + 2 * HOUR and r._pending_ts == bucket
+
+    remote = [bucket, 100.0, 113.0, 98.5, 112.0]
+    exchange.bars.append(remote)
+    closes, ts = r.closes_with_ts(10)
+    assert ts == bucket and closes[-1] == 112.0
+    assert list(r.bars[-1]) == remote
+
+
+def test_missing_last_base_bar_finalizes_on_next_bucket(exchange, monkeypatch):
+    monkeypatch.setitem(app.CFG, "HTF_RESAMPLE_VERIFY", False)
+    r      = _seeded(exchange)
+    bucket = T0 + 3 * HOUR
+    remote = [bucket, 100.0, 113.0, 99.0, 111.5]
+    exchange.bars.append(remote)
+
+    for row in _base_rows(bucket, skip={11}):
+        r.add_base_bar(row)
+    assert r.last_ts == T0 + 2 * HOUR
+
+    r.add_base_bar(_base_rows(bucket + HOUR)[0])
+    assert list(r.bars[-1]) == remote
+
+
+def test_seed_boundary(exchange, monkeypatch):
+    monkeypatch.setitem(app.CFG, "HTF_RESAMPLE_VERIFY", False)
+    r = app.BarResampler("SOLUSDT", "1h", "5m", keep=10)
+
+    # seed 전 하위봉은 버림 (seed 가 거래소 봉으로 채움)
+    for row in _base_rows(T0 + 2 * HOUR):
+        r.add_base_bar(row)
+    assert not r.bars
+    closes, ts = r.closes_with_ts(10)
+    assert ts == T0 + 2 * HOUR and len(closes) == 3
+
+    # 이미 seed 에 있는 버킷은 다시 붙이지 않음
+    for row in _base_rows(T0 + 2 * HOUR):
+        r.add_base_bar(row)
+    assert len(r.bars) == 3
+
+    # seed 직후 버킷 중간부터 받은 경우 → 미완성 → 거래소 봉
+    bucket = T0 + 3 * HOUR
+    remote = [bucket, 99.5, 113.0, 98.0, 112.0]
+    exchange.bars.append(remote)
+    for row in _base_rows(bucket, skip={0, 1}):
+        r.add_base_bar(row)
+    assert list(r.bars[-1]) == remote
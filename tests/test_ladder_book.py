@@ -0,0 +1,105 @@
+import pytest
+
+pytest.importorskip("binance")
+import app
+
+
+def _book() -> app.LadderBook:
+    book = app.LadderBook(4)
+    book.add(1, 101, 100.0, 1.0, filled=True)
+    book.add(2, 102, 106.0, 2.0)
+    book.add(3, 103, 112.0, 3.0)
+    book.add(4, 104, 118.0, 4.0)
+    book.exit_ids = [201]
+    return book
+
+
+def test_mark_canceled_never_overrides_filled():
+    book = _book()
+    book.mark_filled(102)
+    book.mark_canceled(102)
+    book.mark_canceled(103)
+
+    assert book.is_filled(102)
+    assert book.filled_count() == 2
+    assert book.pending_ids() == [104]
+    assert book.unfilled_ids() == [103, 104]
+    assert book.filled_qty() == pytest.approx(3.0)
+
+
+def test_mark_before_add_is_applied_on_add():
+    # 체결 통지가 배치 결과보다 먼저 도착한 경우
+    book = app.LadderBook(2)
+    book.mark_filled(502)
+    book.add(2, 502, 106.0, 2.0)
+
+    assert book.stage_of(502) == 2
+    assert book.filled_count() == 1
+    assert book.pending_ids() == []
+
+
+def test_clear_ladder_keeps_only_cancel_marks():
+    book = _book()
+    book.mark_canceled(103)
+    book.mark_filled(201)
+    book.clear_ladder()
+
+    assert book.stages() == []
+    assert len(book) == 0
+    assert book.is_done(103) and not book.is_filled(103)
+    assert not book.is_done(101)
+    assert not book.is_done(201)
+    assert book.exit_ids == [201]
+
+
+def test_reset_drops_marks_and_exit_ids():
+    book = _book()
+    book.mark_canceled(103)
+    book.reset(6)
+
+    assert book.stages() == []
+    assert book.exit_ids == []
+    assert not book.is_done(103)
+    assert book.price_of(6) is None
+
+
+def test_bytes_round_trip():
+    book = _book()
+    book.mark_filled(102)
+    book.mark_canceled(104)
+    book.mark_filled(201)
+
+    copy = app.LadderBook.from_bytes(book.to_bytes())
+
+    assert copy.snapshot() == book.snapshot()
+    assert copy.pending_ids() == book.pending_ids() == [103]
+    assert copy.stage_of(103) == 3
+    assert copy.is_filled(201) and copy.is_done(104) and not copy.is_filled(104)
+    assert copy.expected_avg() == pytest.approx(book.expected_avg())
+
+
+def test_from_bytes_rejects_foreign_data():
+    with pytest.raises(ValueError):
+        app.LadderBook.from_bytes(b"XXXX" + bytes(12))
+
+
+def test_aggregates_match_without_numpy(monkeypatch):
+    book = _book()
+    book.mark_filled(102)
+    book.mark_canceled(103)
+    vectorized = (book.filled_qty(), book.pending_notional(), book.expected_avg())
+
+    monkeypatch.setattr(app, "np", None)
+    looped = (book.filled_qty(), book.pending_notional(), book.expected_avg())
+
+    assert vectorized == pytest.approx(looped)
+    assert looped == pytest.approx((3.0, 472.0, (100.0 + 212.0 + 472.0) / 7.0))
+
+
+def test_book_grows_after_aggregates():
+    # 집계 view 가 버퍼를 붙잡고 있지 않아야 array 확장 가능
+    book = _book()
+    book.expected_avg()
+    book.add(6, 106, 130.0, 1.0)
+    assert book.price_of(6) == 130.0
+    assert book.pending_notional() == pytest.approx(106.0 * 2 + 112.0 * 3 + 118.0 * 4 + 130.0)
@@ -0,0 +1,100 @@
+import log_indexer
+
+
+def _episode(ts: str, close: float, reason: str) -> str:
+    return (
+        f"{ts},000 [INFO] [5M TRIGGER V8.2] EMA 이탈 | close={close:.4f}<ema=101.0000 | x\n"
+        f"{ts},500 [INFO] [FINAL CLOSE] 사유={reason} | qty=1.0000\n"
+    )
+
+
+def _build(log_path, idx_path) -> dict:
+    idx = log_indexer.load_index(str(idx_path))
+    log_indexer.index_file(idx, str(log_path))
+    log_indexer.save_index(idx, str(idx_path))
+    return log_indexer.load_index(str(idx_path))
+
+
+def test_rerun_is_idempotent(tmp_path):
+    log_path, idx_path = tmp_path / "engine.log", tmp_path / "engine.vidx"
+    log_path.write_text(_episode("2024-01-01 00:00:00", 100.0, "LIMIT_EXIT"), encoding="utf-8")
+
+    for _ in range(3):
+        idx = _build(log_path, idx_path)
+    assert len(idx["columns"]["start_ts"]) == 1
+    assert len(idx["files"]) == 1
+
+
+def test_appended_lines_are_indexed_once(tmp_path):
+    log_path, idx_path = tmp_path / "engine.log", tmp_path / "engine.vidx"
+    log_path.write_text(_episode("2024-01-01 00:00:00", 100.0, "LIMIT_EXIT"), encoding="utf-8")
+    _build(log_path, idx_path)
+
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write(_episode("2024-01-01 01:00:00", 102.0, "DEEP_TRAIL"))
+    idx = _build(log_path, idx_path)
+    idx = _build(log_path, idx_path)
+
+    assert list(idx["columns"]["trigger_close"]) == [100.0, 102.0]
+    assert [idx["reasons"][r] for r in idx["columns"]["reason"]] == ["LIMIT_EXIT", "DEEP_TRAIL"]
+
+
+def test_rotation_replaces_old_episodes(tmp_path):
+    log_path, idx_path = tmp_path / "engine.log", tmp_path / "engine.vidx"
+    log_path.write_text(
+        _episode("2024-01-01 00:00:00", 100.0, "LIMIT_EXIT")
+        + _episode("2024-01-01 01:00:00", 101.0, "LIMIT_EXIT"),
+        encoding="utf-8",
+    )
+    _build(log_path, idx_path)
+
+    # 같은 경로에 새 로그 (로테이션) → 이전 내용 에피소드 제거 후 새 내용만 색인
+    log_path.write_text(_episode("2024-02-01 00:00:00", 90.0, "EXCHANGE_SL"), encoding="utf-8")
+    for _ in range(3):
+        idx = _build(log_path, idx_path)
+
+    assert list(idx["columns"]["trigger_close"]) == [90.0]
+    assert len(idx["files"]) == 1
+    assert list(idx["columns"]["file_id"]) == [0]
+
+
+def test_rotation_keeps_other_files(tmp_path):
+    a, b, idx_path = tmp_path / "a.log", tmp_path / "b.log", tmp_path / "engine.vidx"
+    a.write_text(_episode("2024-01-01 00:00:00", 100.0, "LIMIT_EXIT"), encoding="utf-8")
+    b.write_text(_episode("2024-01-01 00:00:00", 200.0, "LIMIT_EXIT"), encoding="utf-8")
+    _build(a, idx_path)
+    _build(b, idx_path)
+
+    a.write_text(_episode("2024-03-01 00:00:00", 110.0, "LIMIT_EXIT"), encoding="utf-8")
+    idx = _build(a, idx_path)
+
+    assert sorted(idx["columns"]["trigger_close"]) == [110.0, 200.0]
+
+
+def test_small_file_growth_is_not_rotation(tmp_path, capsys):
+    log_path, idx_path = tmp_path / "engine.log", tmp_path / "engine.vidx"
+    log_path.write_text("2024-01-01 00:00:00,000 [INFO] boot\n", encoding="utf-8")   # 128 바이트 미만
+    _build(log_path, idx_path)
+
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write(_episode("2024-01-01 00:05:00", 100.0, "LIMIT_EXIT"))
+    idx = _build(log_path, idx_path)
+    idx = _build(log_path, idx_path)
+
+    assert "파일 교체 감지" not in capsys.readouterr().out
+    assert len(idx["columns"]["start_ts"]) == 1
+
+
+def test_open_episode_of_rotated_file_is_dropped(tmp_path):
+    log_path, idx_path = tmp_path / "engine.log", tmp_path / "engine.vidx"
+    log_path.write_text(
+        "2024-01-01 00:00:00,000 [INFO] [5M TRIGGER V8.2] close=100.0000<ema=101.0000\n",
+        encoding="utf-8",
+    )
+    assert _build(log_path, idx_path)["open"]
+
+    log_path.write_text(_episode("2024-02-01 00:00:00", 90.0, "EXCHANGE_SL"), encoding="utf-8")
+    idx = _build(log_path, idx_path)
+
+    assert list(idx["columns"]["trigger_close"]) == [90.0]
+    assert idx["open"] == {}
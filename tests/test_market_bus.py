@@ -0,0 +1,68 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("binance")
+import app
+
+BAR_TS = 1_700_000_100_000
+
+
+class FakeFeed:
+    # MarketFeed 와 같은 경로로 트리거 캐시를 채우는 최소 feed (거래소 조회 없음)
+    def __init__(self):
+        self.current_price  = 0.0
+        self.bar_tracker    = SimpleNamespace(last_ts=None)
+        self._trigger_cache = app.BarCache()
+
+    def poll(self):
+        self.current_price       = 101.25
+        self.bar_tracker.last_ts = BAR_TS
+
+    def htf_ok(self) -> bool:
+        return True
+
+    def trigger(self) -> tuple[bool, int]:
+        return app.calc_ema15_trigger("SOLUSDT", self._trigger_cache)
+
+
+@pytest.fixture
+def bus_name(monkeypatch):
+    closes = [100.0 + 0.1 * i for i in range(app.trigger_window_len())]
+    highs  = [c + 0.5 for c in closes]
+    monkeypatch.setattr(app, "_fetch_5m_trigger_inputs", lambda symbol, limit: (closes, highs, BAR_TS))
+    return f"vtest_bus_{os.getpid()}", closes, highs
+
+
+def test_publisher_snapshot_reaches_bus_feed(bus_name):
+    name, closes, highs = bus_name
+    writer = app.MarketBusWriter(name, slots=4, max_bars=64)
+    reader = app.MarketBusReader(name)
+    try:
+        app.publish_market_snapshot(FakeFeed(), writer)
+
+        feed = app.BusMarketFeed("SOLUSDT", reader)
+        feed.poll()
+
+        assert feed.current_price == 101.25
+        assert feed.htf_ok() is True
+        assert feed.trigger() == (False, BAR_TS)
+        assert feed.bar_tracker.last_ts == BAR_TS
+        assert feed.snapshot["closes"] == closes
+        assert feed.snapshot["highs"] == highs
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_bus_feed_without_snapshot_fails(bus_name):
+    name, _, _ = bus_name
+    writer = app.MarketBusWriter(name, slots=4, max_bars=64)
+    reader = app.MarketBusReader(name)
+    try:
+        with pytest.raises(RuntimeError):
+            app.BusMarketFeed("SOLUSDT", reader).poll()
+    finally:
+        reader.close()
+        writer.close()
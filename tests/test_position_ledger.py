@@ -0,0 +1,89 @@
+import pytest
+
+pytest.importorskip("binance")
+import app
+
+
+def _order(oid, side, status, executed, avg=0.0, price=0.0):
+    return {"orderId": oid, "side": side, "status": status,
+            "executedQty": str(executed), "avgPrice": str(avg), "price": str(price)}
+
+
+def test_partial_then_filled_applies_only_the_increment():
+    ledger = app.PositionLedger()
+    fills  = []
+    ledger.on_fill = lambda *a: fills.append(a)
+
+    ledger.apply_order(_order(11, "SELL", "NEW", 0, price=100.0))
+    assert ledger.is_open(11) and ledger.amt == 0.0
+
+    ledger.apply_order(_order(11, "SELL", "PARTIALLY_FILLED", 1.0, avg=100.0))
+    ledger.apply_order(_order(11, "SELL", "PARTIALLY_FILLED", 1.0, avg=100.0))   # 같은 통지 재수신
+    assert ledger.amt == pytest.approx(-1.0)
+    assert ledger.is_open(11)
+
+    # 누적 avgPrice 101 → 추가 2.0 체결분의 가격은 (3*101 - 100) / 2
+    ledger.apply_order(_order(11, "SELL", "FILLED", 3.0, avg=101.0))
+    assert ledger.amt == pytest.approx(-3.0)
+    assert ledger.avg_price == pytest.approx(101.0)
+    assert ledger.executed_qty(11) == pytest.approx(3.0)
+    assert not ledger.is_open(11) and 11 not in ledger.watching
+    assert [(f[0], f[1]) for f in fills] == [(11, "SELL"), (11, "SELL")]
+    assert fills[1][2:] == pytest.approx((2.0, 101.5))
+
+
+def test_avg_price_falls_back_to_limit_price():
+    ledger = app.PositionLedger()
+    ledger.apply_order(_order(21, "SELL", "FILLED", 2.0, avg=0.0, price=50.0))
+    assert ledger.position() == pytest.approx({"amt": -2.0, "avg_price": 50.0})
+
+    ledger.apply_order({"orderId": 22, "side": "BUY", "status": "FILLED",
+                        "executedQty": "2", "price": "45"})   # avgPrice 키 없음
+    assert ledger.position() == {"amt": 0.0, "avg_price": 0.0}
+    assert ledger.realized_pnl == pytest.approx(10.0)
+
+
+def test_cancel_keeps_the_partial_fill_and_stops_watching():
+    ledger = app.PositionLedger()
+    ledger.apply_order(_order(31, "SELL", "PARTIALLY_FILLED", 0.5, avg=80.0))
+    ledger.apply_order(_order(31, "SELL", "CANCELED", 0.5, avg=80.0))
+
+    assert ledger.amt == pytest.approx(-0.5)
+    assert ledger.status(31) == "CANCELED"
+    assert not ledger.is_open(31)
+    assert 31 not in ledger.watching
+
+
+def test_baseline_registers_without_moving_the_position():
+    ledger = app.PositionLedger()
+    ledger.apply_order(_order(41, "SELL", "PARTIALLY_FILLED", 1.0, avg=90.0), baseline=True)
+    assert ledger.amt == 0.0 and ledger.is_open(41)
+
+    ledger.apply_order(_order(41, "SELL", "FILLED", 1.5, avg=90.0))
+    assert ledger.amt == pytest.approx(-0.5)
+
+
+def test_reconcile_overrides_drift():
+    ledger = app.PositionLedger()
+    ledger.apply_order(_order(51, "SELL", "FILLED", 2.0, avg=100.0))
+    assert ledger.dirty
+
+    ledger.reconcile({"amt": -3.0, "avg_price": 98.0})
+    assert ledger.position() == {"amt": -3.0, "avg_price": 98.0}
+    assert not ledger.dirty and ledger.verified_at > 0
+
+    # 이후 체결은 보정된 값 위에 누적
+    ledger.apply_order(_order(52, "BUY", "FILLED", 1.0, avg=96.0))
+    assert ledger.amt == pytest.approx(-2.0)
+    assert ledger.realized_pnl == pytest.approx(2.0)
+
+
+def test_clear_watch_forgets_orders():
+    ledger = app.PositionLedger()
+    ledger.apply_order(_order(61, "SELL", "NEW", 0, price=100.0))
+    ledger.apply_order(_order(62, "SELL", "PARTIALLY_FILLED", 1.0, avg=100.0))
+    ledger.clear_watch()
+
+    assert not ledger.is_open(61) and not ledger.is_open(62)
+    assert ledger.status(62) is None and ledger.executed_qty(62) == 0.0
+    assert ledger.amt == pytest.approx(-1.0)   # 포지션 자체는 유지
@@ -0,0 +1,114 @@
+import random
+
+import pytest
+
+pytest.importorskip("binance")
+import app
+
+STEP = 300_000
+BASE = 1_700_000_100_000
+
+
+def _series(rng: random.Random, n: int):
+    # 완만한 상승 뒤 출렁임 → 직전봉 high 가 EMA 위에 걸리는 경우가 자주 나오게
+    closes, highs, c = [], [], 100.0
+    for i in range(n):
+        c *= 1 + rng.uniform(-0.004, 0.006 if i < n - 3 else 0.002)
+        closes.append(c)
+        highs.append(c * (1 + rng.uniform(0.0, 0.008)))
+    return closes, highs
+
+
+def _next_bar(rng: random.Random, closes: list):
+    c = closes[-1] * (1 + rng.uniform(-0.012, 0.004))
+    if rng.random() < 0.5:
+        return c, c * (1 + rng.uniform(0.0, 0.004))
+    # 절반은 high 를 ema*1.003 경계 바로 근처에 → EMA 1스텝 연산이 어긋나면 결과가 갈림
+    ema = app.calc_ema(closes[1:] + [c], app.CFG["EMA_TRIGGER_LEN"])[-1]
+    return c, max(c, ema * 1.003 * (1 + rng.uniform(-1e-5, 1e-5)))
+
+
+def _calc(monkeypatch, arm, closes, highs, ts):
+    monkeypatch.setattr(app, "_fetch_5m_trigger_inputs", lambda symbol, limit: (closes, highs, ts))
+    return app.calc_ema15_trigger("SOLUSDT", app.BarCache(), arm)[0]
+
+
+def test_evaluate_matches_full_recompute():
+    rng   = random.Random(7)
+    limit = app.trigger_window_len()
+    seen  = set()
+    for _ in range(3000):
+        closes, highs = _series(rng, limit)
+        close, high   = _next_bar(rng, closes)
+
+        arm = app.TriggerArm()
+        arm.arm(closes, highs, BASE)
+        expected = app._compute_5m_trigger(closes[1:] + [close], highs[1:] + [high])
+
+        assert arm.evaluate(close, high) is expected
+        seen.add(expected)
+    assert seen == {True, False}
+
+
+def test_calc_uses_arm_only_when_ready(monkeypatch):
+    rng   = random.Random(11)
+    limit = app.trigger_window_len()
+    for _ in range(300):
+        closes, highs = _series(rng, limit + 1)
+        arm = app.TriggerArm()
+        arm.arm(closes[:-1], highs[:-1], BASE)
+        expected = app._compute_5m_trigger(closes[1:], highs[1:])
+
+        assert _calc(monkeypatch, arm, closes[1:], highs[1:], BASE + STEP) is expected
+
+
+def test_short_window_is_not_armed():
+    closes, highs = _series(random.Random(3), app.trigger_window_len() - 1)
+    arm = app.TriggerArm()
+    arm.arm(closes, highs, BASE)
+
+    assert arm.armed is False
+    assert arm.evaluate(closes[-1] * 0.9, closes[-1] * 0.9) is False
+
+
+def _poisoned_arm(closes, highs) -> app.TriggerArm:
+    # 무장은 되어 있지만 evaluate 가 항상 True 를 내도록 조작된 arm → 폴백 여부 판별용
+    arm = app.TriggerArm()
+    arm.arm(closes, highs, BASE)
+    arm.armed, arm.ema_prev, arm.close_prev = True, 1e9, 1e9
+    return arm
+
+
+def _steady_window():
+    limit  = app.trigger_window_len()
+    closes = [100.0 + 0.1 * i for i in range(limit)]
+    highs  = [c + 0.05 for c in closes]
+    assert app._compute_5m_trigger(closes, highs) is False
+    return closes, highs
+
+
+@pytest.mark.parametrize("ts", [BASE, BASE + 2 * STEP])
+def test_fallback_when_bar_is_not_the_next_one(monkeypatch, ts):
+    closes, highs = _steady_window()
+    assert _calc(monkeypatch, _poisoned_arm(closes, highs), closes, highs, ts) is False
+
+
+def test_fallback_when_window_length_differs(monkeypatch):
+    closes, highs = _steady_window()
+    arm = _poisoned_arm(closes, highs)
+    assert _calc(monkeypatch, arm, closes[1:], highs[1:], BASE + STEP) is False
+    assert _calc(monkeypatch, arm, closes, highs, BASE + STEP) is True   # 조작된 arm 이 실제로 쓰이는 경로
+
+
+@pytest.mark.parametrize("period", [10, 21])
+def test_fallback_when_period_changed_after_arming(monkeypatch, period):
+    closes, highs = _steady_window()
+    arm = _poisoned_arm(closes, highs)
+    monkeypatch.setitem(app.CFG, "EMA_TRIGGER_LEN", period)
+    # limit 도 함께 바뀌므로 새 길이의 윈도우로 조회
+    limit = app.trigger_window_len()
+    closes = [100.0 + 0.1 * i for i in range(limit)]
+    highs  = [c + 0.05 for c in closes]
+
+    assert arm.ready_for(BASE + STEP, STEP) is False
+    assert _calc(monkeypatch, arm, closes, highs, BASE + STEP) is app._compute_5m_trigger(closes, highs)